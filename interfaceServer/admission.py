@@ -0,0 +1,213 @@
+"""/classify 요청의 승인 제어(admission control)와 부하 차단(load shedding).
+
+경로마다 동시 실행 수와 대기열 길이가 제한된 AdmissionPool을 둔다 (Firestore 조회 / 스크래핑).
+ASGI 모드는 대기 중에 스레드를 잡지 않는 AsyncAdmissionPool을 따로 쓴다.
+느린 스크래핑 요청이 스레드를 모두 차지해 캐시로 끝나는 요청까지 밀리지 않도록,
+자리가 없으면 오래 기다리지 않고 OverloadedError로 바로 거절한다 (응답은 429/503 + Retry-After).
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+import metrics
+
+ADMISSION_REJECTED_TOTAL = metrics.counter(
+    "admission_rejected_total",
+    "Requests shed by admission control.",
+    ["pool", "reason"],
+)
+ADMISSION_QUEUE_SECONDS = metrics.histogram(
+    "admission_queue_seconds",
+    "Time admitted requests waited for a slot in an admission pool.",
+    ["pool"],
+)
+
+
+class OverloadedError(RuntimeError):
+    """대기열이 가득 찼거나 대기 시간 안에 자리가 나지 않아 요청을 거절했다."""
+
+    def __init__(self, pool: str, status: int, retry_after: int) -> None:
+        super().__init__(f"The '{pool}' pool is overloaded. Retry after {retry_after}s.")
+        self.pool = pool
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionPool:
+    """동시 실행 수(limit)와 대기열 길이(max_queue)가 제한된 승인 풀 (스레드 안전).
+
+    - 자리가 있으면 바로 승인한다.
+    - 자리가 없으면 최대 max_queue개 요청까지 queue_timeout초(요청 마감 시각이 더 이르면 그때까지) 기다린다.
+    - 대기열이 가득 찼거나 기다려도 자리가 나지 않으면 OverloadedError(status, retry_after)를 던진다.
+
+    limit <= 0 이면 제한하지 않는다 (비활성화).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        max_queue: int = 0,
+        queue_timeout: float = 1.0,
+        status: int = 503,
+        retry_after: int = 1,
+    ) -> None:
+        self.name = name
+        self.limit = limit
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.status = status
+        self.retry_after = max(1, retry_after)
+        self._cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+
+    def acquire(self, deadline: Optional[float] = None) -> None:
+        """자리를 얻을 때까지 기다린다. deadline은 time.monotonic() 기준 요청 마감 시각."""
+        if not self.enabled:
+            return
+        started_at = time.monotonic()
+        with self._cond:
+            if self.active >= self.limit:
+                if self.waiting >= self.max_queue:
+                    self._reject("queue_full")
+                timeout = self.queue_timeout
+                if deadline is not None:
+                    timeout = min(timeout, deadline - started_at)
+                self.waiting += 1
+                try:
+                    admitted = self._cond.wait_for(lambda: self.active < self.limit, timeout=max(0.0, timeout))
+                finally:
+                    self.waiting -= 1
+                if not admitted:
+                    self._reject("timeout")
+            self.active += 1
+            self.admitted += 1
+        ADMISSION_QUEUE_SECONDS.observe(time.monotonic() - started_at, pool=self.name)
+
+    def release(self) -> None:
+        if not self.enabled:
+            return
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def admit(self, deadline: Optional[float] = None) -> Iterator[None]:
+        self.acquire(deadline)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _reject(self, reason: str) -> None:
+        self.rejected += 1
+        ADMISSION_REJECTED_TOTAL.inc(pool=self.name, reason=reason)
+        raise OverloadedError(self.name, self.status, self.retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "max_queue": self.max_queue,
+                "active": self.active,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+            }
+
+
+class AsyncAdmissionPool:
+    """이벤트 루프(ASGI)용 승인 풀 (asyncio.Semaphore 기반).
+
+    규칙은 AdmissionPool과 같지만, 자리를 기다리는 요청이 스레드를 잡지 않는다.
+    한 이벤트 루프 안에서만 쓴다 (스레드 안전하지 않음).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        max_queue: int = 0,
+        queue_timeout: float = 1.0,
+        status: int = 503,
+        retry_after: int = 1,
+    ) -> None:
+        self.name = name
+        self.limit = limit
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.status = status
+        self.retry_after = max(1, retry_after)
+        self._semaphore = asyncio.Semaphore(max(1, limit))
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+
+    async def acquire(self, deadline: Optional[float] = None) -> None:
+        """자리를 얻을 때까지 기다린다. deadline은 time.monotonic() 기준 요청 마감 시각."""
+        if not self.enabled:
+            return
+        started_at = time.monotonic()
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                self._reject("queue_full")
+            timeout = self.queue_timeout
+            if deadline is not None:
+                timeout = min(timeout, deadline - started_at)
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=max(0.0, timeout))
+            except asyncio.TimeoutError:
+                self._reject("timeout")
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self.active += 1
+        self.admitted += 1
+        ADMISSION_QUEUE_SECONDS.observe(time.monotonic() - started_at, pool=self.name)
+
+    def release(self) -> None:
+        if not self.enabled:
+            return
+        self.active -= 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def admit(self, deadline: Optional[float] = None) -> AsyncIterator[None]:
+        await self.acquire(deadline)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _reject(self, reason: str) -> None:
+        self.rejected += 1
+        ADMISSION_REJECTED_TOTAL.inc(pool=self.name, reason=reason)
+        raise OverloadedError(self.name, self.status, self.retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,438 @@
+"""/classify 를 위한 ASGI(비동기) 서빙 모드.
+
+Flask(WSGI) 버전은 요청마다 스레드 하나가 Firestore 조회와 스크래핑을 기다리며 묶여 있다.
+이 모듈은 같은 파이프라인을 이벤트 루프 위에서 돌린다.
+
+- Firestore 배치 조회는 Firestore 비동기 클라이언트(firestore_async)로 기다린다.
+- 스크래핑은 블로킹 라이브러리이므로 스레드로 넘긴다. 조회/스크래핑 단계의 동시 실행 수는 이 모듈의
+  비동기 승인 풀(asgi_lookup, asgi_scrape)로 제한한다. WSGI 풀(워커 스레드 수에 맞춘 크기)과 달리
+  대기하는 요청이 스레드를 잡지 않으므로 한도를 더 크게 둔다.
+  조회 풀이 가득 차면 503 + Retry-After로 거절하고, 스크래핑 풀이 가득 차면 스크래핑할 패키지만 pending으로 응답한다.
+- /classify 와 /health 외의 경로(작업 API, 통계, 메트릭 등)는 main.py의 Flask 앱에 그대로 위임한다.
+
+실행 (interfaceServer 디렉터리에서):
+    uvicorn asgi:app --host 0.0.0.0 --port 8080
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+import encoding
+import main
+import profiling
+from admission import AsyncAdmissionPool
+from main import (
+    CLASSIFY_BATCH_SIZE,
+    CLASSIFY_IN_FLIGHT,
+    CLASSIFY_REQUEST_SECONDS,
+    CLASSIFY_RESPONSE_BYTES,
+    CLASSIFY_RESULTS_TOTAL,
+    AppRecord,
+    CachedResponse,
+    classify_stage,
+)
+
+logger = logging.getLogger(__name__)
+
+# 비동기 승인 풀 한도 (워커 프로세스별). 대기열 대기 시간과 Retry-After는 main의 ADMISSION_* 설정을 따른다.
+ASGI_LOOKUP_CONCURRENCY = int(os.getenv("ASGI_LOOKUP_CONCURRENCY", "64"))
+ASGI_LOOKUP_QUEUE = int(os.getenv("ASGI_LOOKUP_QUEUE", "256"))
+ASGI_SCRAPE_CONCURRENCY = int(os.getenv("ASGI_SCRAPE_CONCURRENCY", "8"))
+ASGI_SCRAPE_QUEUE = int(os.getenv("ASGI_SCRAPE_QUEUE", "16"))
+
+lookup_pool = AsyncAdmissionPool(
+    "asgi_lookup",
+    ASGI_LOOKUP_CONCURRENCY,
+    max_queue=ASGI_LOOKUP_QUEUE,
+    queue_timeout=main.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    status=503,
+    retry_after=main.ADMISSION_RETRY_AFTER_SECONDS,
+)
+scrape_pool = AsyncAdmissionPool(
+    "asgi_scrape",
+    ASGI_SCRAPE_CONCURRENCY,
+    max_queue=ASGI_SCRAPE_QUEUE,
+    queue_timeout=main.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    status=429,
+    retry_after=main.ADMISSION_RETRY_AFTER_SECONDS,
+)
+main.admission_pools.extend([lookup_pool, scrape_pool])
+
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_JSON_HEADERS = [
+    (b"content-type", b"application/json"),
+    (b"access-control-allow-origin", b"*"),
+]
+
+
+class _State:
+    """lifespan 동안 유지되는 이벤트 루프 전용 자원."""
+
+    db: Any = None
+
+
+state = _State()
+
+
+def _ensure_state() -> None:
+    """비동기 Firestore 클라이언트 등은 첫 /classify 요청 때 만든다 (WARMUP_ON_START면 lifespan 시작 시)."""
+    if state.db is None:
+        state.db = init_async_firestore_client()
+
+
+def init_async_firestore_client() -> Any:
+    """Firebase 앱을 (아직이면) 초기화하고 비동기 Firestore 클라이언트를 만든다."""
+    from firebase_admin import firestore_async
+
+    started_at = time.perf_counter()
+    main.init_firebase_app()
+    client = firestore_async.client()
+    main._record_startup_phase("firestore_async_init", started_at)  # pylint: disable=protected-access
+    return client
+
+
+async def _get_app_records_chunk_async(
+    db: Any,
+    package_names: List[str],
+    field_paths: List[str],
+) -> Dict[str, AppRecord]:
+    doc_refs = [db.collection(main.FIRESTORE_COLLECTION).document(pkg) for pkg in package_names]
+    records_map: Dict[str, AppRecord] = {}
+
+    with profiling.span("firestore.get_all", docs=len(doc_refs)):
+        async for snap in db.get_all(doc_refs, field_paths=field_paths):
+            if not snap.exists:
+                continue
+            record = main.record_from_row(snap.id, snap.to_dict() or {})
+            records_map[record.id] = record
+
+    return records_map
+
+
+async def get_app_records_batch_async(
+    db: Any,
+    package_names: List[str],
+    fields: Optional[Tuple[str, ...]] = None,
+) -> Dict[str, AppRecord]:
+    """main.get_app_records_batch 의 비동기 버전 (같은 청크 크기와 병렬도를 쓴다)."""
+    unique_names = list(dict.fromkeys(package_names))
+    if not unique_names:
+        return {}
+
+    try:
+        chunks = main.chunked(unique_names, main.FIRESTORE_READ_CHUNK_SIZE)
+        field_paths = main.firestore_field_paths(fields)
+        semaphore = asyncio.Semaphore(main.FIRESTORE_READ_PARALLELISM)
+
+        async def fetch(chunk: List[str]) -> Dict[str, AppRecord]:
+            async with semaphore:
+                return await _get_app_records_chunk_async(db, chunk, field_paths)
+
+        records_map: Dict[str, AppRecord] = {}
+        for chunk_records in await asyncio.gather(*(fetch(chunk) for chunk in chunks)):
+            records_map.update(chunk_records)
+
+        logger.info(
+            "Fetched %d app records from Firestore (requested %d in %d chunk(s)).",
+            len(records_map),
+            len(unique_names),
+            len(chunks),
+        )
+        return records_map
+
+    except Exception as exc:
+        logger.exception("Error during batch lookup")
+        raise RuntimeError(f"Failed to fetch app records from Firestore: {exc}") from exc
+
+
+async def lookup_app_records_async(
+    package_names: List[str],
+    fields: Optional[Tuple[str, ...]] = None,
+) -> Dict[str, AppRecord]:
+    """main.lookup_app_records 와 같은 순서(스냅샷 -> 캐시 -> Firestore)로 조회한다."""
+    records_map, misses = main.lookup_local_records(package_names)
+    if not misses:
+        return records_map
+
+    with classify_stage("firestore_batch_get"):
+        fetched = await get_app_records_batch_async(state.db, misses, fields=fields)
+    main.remember_lookup(misses, fetched, fields)
+    for package_name in misses:
+        if package_name in fetched:
+            records_map[package_name] = fetched[package_name]
+    return records_map
+
+
+async def classify_package_names_async(
+    package_names: List[str],
+    fields: Optional[Tuple[str, ...]] = None,
+    deadline: Optional[float] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """main.classify_package_names(admit=True) 의 비동기 버전 (결과 형식 동일, 조회 풀에 자리가 없으면 OverloadedError)."""
+    temp_results: Dict[str, Dict[str, Any]] = {}
+
+    def set_result(package_name: str, result: Dict[str, Any]) -> None:
+        temp_results[package_name] = result
+        CLASSIFY_RESULTS_TOTAL.inc(source=result["source"])
+
+    await lookup_pool.acquire(deadline)
+    try:
+        with classify_stage("lookup"):
+            existing_records_map = await lookup_app_records_async(package_names, fields=fields)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.exception("Error during batch Firestore lookup")
+        for package_name in dict.fromkeys(package_names):
+            set_result(package_name, main._error_result(package_name, f"Firestore lookup failed: {str(exc)}"))
+        return temp_results
+    finally:
+        lookup_pool.release()
+
+    package_names_to_scrape = main._apply_lookup(package_names, existing_records_map, set_result)
+
+    if package_names_to_scrape:
+        try:
+            await scrape_pool.acquire(deadline)
+        except main.OverloadedError as exc:
+            profiling.annotate(rejected=exc.pool)
+            for package_name in package_names_to_scrape:
+                set_result(package_name, main._pending_result(package_name, str(exc)))
+            return temp_results
+        try:
+            await asyncio.to_thread(main._scrape_missing, package_names_to_scrape, set_result, deadline)
+        finally:
+            scrape_pool.release()
+
+    return temp_results
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+async def _send_json(
+    send: Send,
+    status: int,
+    payload: Dict[str, Any],
+    headers: Optional[List[Tuple[bytes, bytes]]] = None,
+) -> None:
+    await send({"type": "http.response.start", "status": status, "headers": _JSON_HEADERS + (headers or [])})
+    await send({"type": "http.response.body", "body": encoding.dumps_json(payload)})
+
+
+def _header(scope: Dict[str, Any], name: bytes) -> str:
+    return dict(scope.get("headers", [])).get(name, b"").decode("latin-1")
+
+
+async def _send_etag_response(
+    send: Send,
+    scope: Dict[str, Any],
+    cached: CachedResponse,
+    retry_after: Optional[int] = None,
+) -> None:
+    """main._etag_response 와 같은 규칙으로 200 또는 304를 보낸다. retry_after가 있으면 Retry-After도 붙인다."""
+    body, coding, etag = main.negotiated_body(cached, _header(scope, b"accept-encoding"))
+    headers = [
+        (b"content-type", cached.media_type.encode("latin-1")),
+        (b"access-control-allow-origin", b"*"),
+        (b"etag", f'"{etag}"'.encode("latin-1")),
+        (b"cache-control", b"private, no-cache"),
+        (b"vary", b"Accept, Accept-Encoding"),
+    ]
+    if retry_after is not None:
+        headers.append((b"retry-after", str(retry_after).encode("latin-1")))
+    if main.etag_matches(_header(scope, b"if-none-match"), etag):
+        main.CLASSIFY_RESPONSE_CACHE_TOTAL.inc(outcome="not_modified")
+        await send({"type": "http.response.start", "status": 304, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
+        return
+    if coding is not None:
+        headers.append((b"content-encoding", coding.encode("latin-1")))
+    CLASSIFY_RESPONSE_BYTES.observe(len(body), media_type=cached.media_type, coding=coding or "identity")
+    await send({"type": "http.response.start", "status": 200, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def classify(scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+    with CLASSIFY_IN_FLIGHT.track_inprogress(), CLASSIFY_REQUEST_SECONDS.time(), profiling.trace("classify"):
+        deadline = main.request_deadline()
+        with classify_stage("parse"):
+            try:
+                payload = json.loads(await _read_body(receive) or b"{}")
+            except ValueError:
+                payload = {}
+            if not isinstance(payload, dict):
+                payload = {}
+            valid_package_names, results = main._parse_apps_payload(payload)
+
+        if valid_package_names is None:
+            await _send_json(send, 400, {"error": main._INVALID_APPS_ERROR})
+            return
+
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        fields, fields_error = main.parse_result_fields(
+            payload["fields"] if "fields" in payload else query.get("fields", [None])[0]
+        )
+        if fields_error:
+            await _send_json(send, 400, {"error": fields_error})
+            return
+
+        too_many = main._too_many_apps_error(len(valid_package_names) + len(results))
+        if too_many:
+            await _send_json(send, 413, {"error": too_many})
+            return
+
+        CLASSIFY_BATCH_SIZE.observe(len(valid_package_names) + len(results))
+        profiling.annotate(apps=len(valid_package_names) + len(results))
+        media_type = encoding.negotiate_media_type(_header(scope, b"accept"))
+
+        if not valid_package_names:
+            results = [main.project_result(result, fields) for result in results]
+            body = main.encode_results(results, media_type)
+            cached = CachedResponse(signature=(), body=body, etag=main.response_etag(body), media_type=media_type)
+            await _send_etag_response(send, scope, cached)
+            return
+
+        fingerprint = main.response_fingerprint(valid_package_names, fields, media_type)
+        signature = (len(results), tuple(valid_package_names))
+        cached = main.get_cached_response(fingerprint, signature) if main.response_cache.enabled else None
+        if cached is not None:
+            profiling.annotate(response_cache="hit")
+            await _send_etag_response(send, scope, cached)
+            return
+
+        try:
+            temp_results = await classify_package_names_async(valid_package_names, fields=fields, deadline=deadline)
+        except main.OverloadedError as exc:
+            profiling.annotate(rejected=exc.pool)
+            await _send_json(send, exc.status, {"error": str(exc)}, [(b"retry-after", str(exc.retry_after).encode("latin-1"))])
+            return
+        results.extend(main._order_results(valid_package_names, temp_results))
+        results = [main.project_result(result, fields) for result in results]
+        profiling.annotate(sources=main.count_sources(results))
+
+        body = main.encode_results(results, media_type)
+        retry_after = main.ADMISSION_RETRY_AFTER_SECONDS if main.has_pending_results(results) else None
+        cached = main.store_response(fingerprint, signature, results, body, media_type)
+        await _send_etag_response(send, scope, cached, retry_after)
+
+
+def _wsgi_environ(scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ: Dict[str, Any] = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", ""),
+        "PATH_INFO": scope["path"],
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = scope["client"][0]
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+        elif name != "CONTENT_LENGTH":
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def delegate_to_flask(scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+    """나머지 경로는 Flask 앱을 스레드에서 호출한다. 응답 본문은 청크 단위로 흘려보낸다 (NDJSON 스트림 유지)."""
+    environ = _wsgi_environ(scope, await _read_body(receive))
+    started: Dict[str, Any] = {}
+
+    def start_response(status: str, headers: List[Tuple[str, str]], exc_info: Any = None) -> None:
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+
+    iterable = await asyncio.to_thread(main.app.wsgi_app, environ, start_response)
+    iterator = iter(iterable)
+    try:
+        await send({"type": "http.response.start", "status": started["status"], "headers": started["headers"]})
+        while True:
+            chunk = await asyncio.to_thread(next, iterator, None)
+            if chunk is None:
+                break
+            if chunk:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        close = getattr(iterable, "close", None)
+        if close is not None:
+            await asyncio.to_thread(close)
+
+
+def _wants_stream(scope: Dict[str, Any]) -> bool:
+    """스트리밍(NDJSON) 요청은 Flask 앱의 스트리밍 응답으로 넘긴다."""
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    if query.get("stream", [""])[0].lower() in ("1", "true", "yes"):
+        return True
+    accept = dict(scope.get("headers", [])).get(b"accept", b"")
+    return accept.split(b",")[0].split(b";")[0].strip() == b"application/x-ndjson"
+
+
+async def lifespan(receive: Receive, send: Send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                if main.WARMUP_ON_START:
+                    _ensure_state()
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.exception("ASGI startup failed")
+                await send({"type": "lifespan.startup.failed", "message": str(exc)})
+                return
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            # 남은 write-behind 쓰기를 커밋한다 (atexit 훅도 있지만 close는 중복 호출해도 안전하다).
+            if main.write_buffer is not None:
+                await asyncio.to_thread(main.write_buffer.close)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope: Dict[str, Any], receive: Receive, send: Send) -> None:
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    method, path = scope["method"], scope["path"]
+    if path == "/classify" and method == "POST" and not _wants_stream(scope):
+        _ensure_state()
+        await classify(scope, receive, send)
+    elif path == "/health" and method == "GET":
+        await _send_json(send, 200, {"status": "ok"})
+    else:
+        await delegate_to_flask(scope, receive, send)
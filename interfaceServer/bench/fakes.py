@@ -0,0 +1,7 @@
+"""벤치마크용 대역(fake). 구현은 테스트와 함께 쓰는 tests/fakes.py에 있다."""
+from tests.fakes import (  # noqa: F401
+    GENRES,
+    FakeFirestoreClient,
+    FakePlayStore,
+    install,
+)
@@ -0,0 +1,193 @@
+"""/classify 오프라인 부하/벤치마크 실행기.
+
+main.py의 Flask app을 인프로세스 Firestore / Play Store 대역과 함께 띄우고,
+배치 크기·Firestore 적중률·중복 비율을 조절한 요청을 동시에 보내 처리량과 지연 시간 분위수를 보고한다.
+
+사용법 (interfaceServer 디렉터리에서):
+    python -m bench.run_bench --requests 500 --concurrency 8 --batch-sizes 10,50,200 --hit-ratio 0.9
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="/classify 오프라인 벤치마크")
+    parser.add_argument("--requests", type=int, default=300, help="측정할 요청 수")
+    parser.add_argument("--warmup", type=int, default=20, help="측정 전에 보낼 워밍업 요청 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 클라이언트 수 (gunicorn workers x threads에 해당)")
+    parser.add_argument("--batch-sizes", default="1,10,50,200", help="요청당 앱 개수 후보 (쉼표 구분, 무작위 선택)")
+    parser.add_argument("--hit-ratio", type=float, default=0.9, help="Firestore에 이미 있는 패키지 비율")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.5,
+                        help="인기 패키지 집합(--hot-set)에서 뽑는 비율 (요청 간 중복이 많은 트래픽)")
+    parser.add_argument("--hot-set", type=int, default=200, help="인기 패키지 수")
+    parser.add_argument("--catalog-size", type=int, default=50000, help="Firestore 대역에 미리 넣을 앱 수")
+    parser.add_argument("--firestore-latency-ms", type=float, default=8.0)
+    parser.add_argument("--firestore-error-rate", type=float, default=0.0)
+    parser.add_argument("--scraper-latency-ms", type=float, default=300.0)
+    parser.add_argument("--scraper-error-rate", type=float, default=0.0)
+    parser.add_argument("--scraper-not-found-rate", type=float, default=0.05)
+    parser.add_argument("--scraper-rate", type=float, default=0.0,
+                        help="SCRAPER_RATE_PER_SEC 값 (0이면 속도 제한 없음)")
+    parser.add_argument("--admission", action="store_true",
+                        help="승인 제어(ADMISSION_*)를 켠다 (기본값: 꺼서 파이프라인 처리량만 측정)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 한 줄로 출력")
+    return parser.parse_args(argv)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class WorkloadGenerator:
+    """배치 크기, 적중률, 중복 비율에 맞춰 /classify 요청 본문을 만든다."""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self._random = random.Random(args.seed)
+        self._lock = threading.Lock()
+        self.batch_sizes = [int(size) for size in args.batch_sizes.split(",") if size.strip()]
+        self.hit_ratio = args.hit_ratio
+        self.duplicate_ratio = args.duplicate_ratio
+        self.catalog = [f"com.catalog.app{i}" for i in range(args.catalog_size)]
+        self.hot_known = self.catalog[: max(1, args.hot_set)]
+        self.hot_unknown = [f"com.unknown.hot{i}" for i in range(max(1, args.hot_set // 4))]
+        self._unknown_seq = 0
+
+    def _package(self) -> str:
+        known = self._random.random() < self.hit_ratio
+        hot = self._random.random() < self.duplicate_ratio
+        if known:
+            return self._random.choice(self.hot_known if hot else self.catalog)
+        if hot:
+            return self._random.choice(self.hot_unknown)
+        self._unknown_seq += 1
+        return f"com.unknown.app{self._unknown_seq}"
+
+    def next_payload(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self._random.choice(self.batch_sizes)
+            return {"apps": [{"package_name": self._package()} for _ in range(size)]}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    # main/scraper import 전에 환경을 맞춘다 (영구 스크래핑 캐시는 측정을 왜곡하므로 끈다).
+    os.environ.setdefault("SCRAPE_CACHE_PATH", "")
+    os.environ["SCRAPER_RATE_PER_SEC"] = str(args.scraper_rate)
+    if not args.admission:
+        os.environ.setdefault("ADMISSION_LOOKUP_CONCURRENCY", "0")
+        os.environ.setdefault("ADMISSION_SCRAPE_CONCURRENCY", "0")
+
+    from tests.fakes import FakeFirestoreClient, FakePlayStore, install
+
+    db = FakeFirestoreClient(latency_ms=args.firestore_latency_ms, error_rate=args.firestore_error_rate, seed=args.seed)
+    play_store = FakePlayStore(
+        latency_ms=args.scraper_latency_ms,
+        error_rate=args.scraper_error_rate,
+        not_found_rate=args.scraper_not_found_rate,
+        seed=args.seed,
+    )
+    install(db, play_store)
+
+    import main
+
+    # 주입한 오류/미존재 앱에 대한 경고 로그가 측정에 섞이지 않도록 끈다.
+    logging.disable(logging.WARNING)
+    workload = WorkloadGenerator(args)
+    db.seed(main.FIRESTORE_COLLECTION, {
+        package_name: {
+            "id": package_name,
+            "app_name": package_name,
+            "description": "Seeded benchmark record. " * 20,
+            "category": "TOOLS",
+            "category_ko": "도구",
+        }
+        for package_name in workload.catalog
+    })
+
+    local = threading.local()
+
+    def send(payload: Dict[str, Any]) -> Any:
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = main.app.test_client()
+        started_at = time.perf_counter()
+        response = client.post("/classify", json=payload)
+        elapsed = time.perf_counter() - started_at
+        body = response.get_json(silent=True) or {}
+        sources = Counter(result.get("source") for result in body.get("results", []))
+        return elapsed, response.status_code, len(payload["apps"]), sources
+
+    payloads = [workload.next_payload() for _ in range(args.warmup + args.requests)]
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(send, payloads[: args.warmup]))
+        firestore_calls_before = dict(db.calls)
+        scraper_calls_before = play_store.calls
+
+        started_at = time.perf_counter()
+        samples = list(executor.map(send, payloads[args.warmup:]))
+        wall = time.perf_counter() - started_at
+
+    latencies = sorted(sample[0] for sample in samples)
+    statuses = Counter(sample[1] for sample in samples)
+    apps_total = sum(sample[2] for sample in samples)
+    sources: Counter = Counter()
+    for sample in samples:
+        sources.update(sample[3])
+
+    return {
+        "requests": len(samples),
+        "concurrency": args.concurrency,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(samples) / wall, 1) if wall else 0.0,
+        "apps_per_second": round(apps_total / wall, 1) if wall else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        },
+        "status_codes": dict(statuses),
+        "sources": dict(sources),
+        "upstream_calls": {
+            "firestore": {
+                name: count - firestore_calls_before.get(name, 0) for name, count in db.calls.items()
+            },
+            "play_store_app": play_store.calls - scraper_calls_before,
+        },
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+        return
+
+    latency = report["latency_ms"]
+    print(f"requests       : {report['requests']} (concurrency {report['concurrency']})")
+    print(f"throughput     : {report['throughput_rps']} req/s, {report['apps_per_second']} apps/s")
+    print(f"latency (ms)   : p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}")
+    print(f"status codes   : {report['status_codes']}")
+    print(f"result sources : {report['sources']}")
+    print(f"upstream calls : {report['upstream_calls']}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+# 캐시에 "존재하지 않음"을 기록할 때 사용하는 표식 객체
+_MISSING = object()
+
+
+class TTLCache(Generic[V]):
+    """스레드 안전한 LRU + TTL 인메모리 캐시.
+
+    - max_size를 넘으면 가장 오래 사용되지 않은 항목부터 제거한다.
+    - 각 항목은 저장 시점 기준 ttl초가 지나면 만료된다.
+    - set_missing()으로 "조회했지만 없음" 상태를 negative_ttl 동안 기억할 수 있다.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300.0, negative_ttl: float = 30.0) -> None:
+        self.max_size = max(0, int(max_size))
+        self.ttl = float(ttl)
+        self.negative_ttl = float(negative_ttl)
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def _store(self, key: Hashable, value: Any, ttl: float) -> None:
+        if not self.enabled or ttl <= 0:
+            return
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def set(self, key: Hashable, value: V) -> None:
+        self._store(key, value, self.ttl)
+
+    def set_missing(self, key: Hashable) -> None:
+        self._store(key, _MISSING, self.negative_ttl)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def lookup(self, keys: Iterable[Hashable]) -> Tuple[Dict[Hashable, V], List[Hashable], List[Hashable]]:
+        """여러 키를 한 번에 조회한다.
+
+        Returns:
+            (hits, known_missing, misses) 튜플.
+            hits는 캐시된 값, known_missing은 negative 캐시에 걸린 키,
+            misses는 원본 저장소에서 조회해야 하는 키 목록이다.
+        """
+        hits: Dict[Hashable, V] = {}
+        known_missing: List[Hashable] = []
+        misses: List[Hashable] = []
+        now = time.monotonic()
+
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    self.misses += 1
+                    misses.append(key)
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self._data[key]
+                    self.expirations += 1
+                    self.misses += 1
+                    misses.append(key)
+                    continue
+                self._data.move_to_end(key)
+                if value is _MISSING:
+                    self.negative_hits += 1
+                    known_missing.append(key)
+                else:
+                    self.hits += 1
+                    hits[key] = value
+
+        return hits, known_missing, misses
+
+    def get(self, key: Hashable) -> Optional[V]:
+        hits, _, _ = self.lookup([key])
+        return hits.get(key)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "negative_ttl_seconds": self.negative_ttl,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,217 @@
+"""Google Play 장르 ID -> 한국어 카테고리명 매핑과 category_ko 일괄 보정(backfill) 작업.
+
+한국어 이름은 한국 Play Store 표기를 따른다. GAME_* 하위 장르는 일반 카테고리와 이름이 겹치지 않도록
+"액션 게임"처럼 "게임"을 붙인다 (예: SPORTS "스포츠" / GAME_SPORTS "스포츠 게임").
+
+사용법:
+    python categories.py backfill              # category_ko가 비어 있는 문서만 채운다
+    python categories.py backfill --dry-run    # 쓰지 않고 대상 수만 센다
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_KO: Dict[str, str] = {
+    # 앱
+    "APPLICATION": "애플리케이션",
+    "ANDROID_WEAR": "Wear OS",
+    "ART_AND_DESIGN": "예술/디자인",
+    "AUTO_AND_VEHICLES": "자동차",
+    "BEAUTY": "뷰티",
+    "BOOKS_AND_REFERENCE": "도서/참고자료",
+    "BUSINESS": "비즈니스",
+    "COMICS": "만화",
+    "COMMUNICATION": "커뮤니케이션",
+    "DATING": "데이트",
+    "EDUCATION": "교육",
+    "ENTERTAINMENT": "엔터테인먼트",
+    "EVENTS": "이벤트",
+    "FINANCE": "금융",
+    "FOOD_AND_DRINK": "식음료",
+    "HEALTH_AND_FITNESS": "건강/운동",
+    "HOUSE_AND_HOME": "부동산/홈 인테리어",
+    "LIBRARIES_AND_DEMO": "라이브러리/데모",
+    "LIFESTYLE": "라이프스타일",
+    "MAPS_AND_NAVIGATION": "지도/내비게이션",
+    "MEDICAL": "의료",
+    "MUSIC_AND_AUDIO": "음악/오디오",
+    "NEWS_AND_MAGAZINES": "뉴스/잡지",
+    "PARENTING": "출산/육아",
+    "PERSONALIZATION": "맞춤 설정",
+    "PHOTOGRAPHY": "사진",
+    "PRODUCTIVITY": "생산성",
+    "SHOPPING": "쇼핑",
+    "SOCIAL": "소셜",
+    "SPORTS": "스포츠",
+    "TOOLS": "도구",
+    "TRAVEL_AND_LOCAL": "여행 및 지역정보",
+    "VIDEO_PLAYERS": "동영상 플레이어/편집기",
+    "WATCH_FACE": "시계 화면",
+    "WEATHER": "날씨",
+    # 게임
+    "GAME": "게임",
+    "GAME_ACTION": "액션 게임",
+    "GAME_ADVENTURE": "어드벤처 게임",
+    "GAME_ARCADE": "아케이드 게임",
+    "GAME_BOARD": "보드 게임",
+    "GAME_CARD": "카드 게임",
+    "GAME_CASINO": "카지노 게임",
+    "GAME_CASUAL": "캐주얼 게임",
+    "GAME_EDUCATIONAL": "교육 게임",
+    "GAME_MUSIC": "음악 게임",
+    "GAME_PUZZLE": "퍼즐 게임",
+    "GAME_RACING": "레이싱 게임",
+    "GAME_ROLE_PLAYING": "롤플레잉 게임",
+    "GAME_SIMULATION": "시뮬레이션 게임",
+    "GAME_SPORTS": "스포츠 게임",
+    "GAME_STRATEGY": "전략 게임",
+    "GAME_TRIVIA": "퀴즈 게임",
+    "GAME_WORD": "단어 게임",
+    # 가족 (이전 스토어의 가족 카테고리, 오래된 레코드에 남아 있을 수 있음)
+    "FAMILY": "가족",
+    "FAMILY_ACTION": "가족 - 액션/어드벤처",
+    "FAMILY_BRAINGAMES": "가족 - 두뇌 게임",
+    "FAMILY_CREATE": "가족 - 창작",
+    "FAMILY_EDUCATION": "가족 - 교육",
+    "FAMILY_MUSICVIDEO": "가족 - 음악/동영상",
+    "FAMILY_PRETEND": "가족 - 역할놀이",
+}
+
+# 예전 코드/데이터에 남아 있는 잘못된 장르 ID
+_ALIASES = {
+    "MUSIC_AUDIO": "MUSIC_AND_AUDIO",
+}
+
+
+def canonical_category(category: Optional[str]) -> Optional[str]:
+    """장르 ID를 Play Store 장르 ID로 정규화한다 (잘못된 예전 ID는 바로잡는다). 모르는 ID면 None."""
+    if not category:
+        return None
+    key = category.strip().upper()
+    key = _ALIASES.get(key, key)
+    return key if key in CATEGORY_KO else None
+
+
+def category_ko_for(category: Optional[str]) -> Optional[str]:
+    """장르 ID의 한국어 카테고리명을 반환한다. 모르는 ID면 None."""
+    key = canonical_category(category)
+    return CATEGORY_KO[key] if key else None
+
+
+# -----------------------------------------------------------------
+# category_ko 일괄 보정
+# -----------------------------------------------------------------
+BACKFILL_BATCH_SIZE = 500            # Firestore 배치 커밋 한도
+BACKFILL_PARALLEL_COMMITS = 4        # 동시에 진행할 배치 커밋 수
+
+
+def backfill_category_ko(
+    db: Any,
+    collection: str,
+    batch_size: int = BACKFILL_BATCH_SIZE,
+    parallel: int = BACKFILL_PARALLEL_COMMITS,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """category가 있지만 category_ko가 비어 있는 문서에 한국어 카테고리명을 채운다.
+
+    category/category_ko 필드만 스트리밍으로 읽고, 최대 parallel개의 배치 커밋을 동시에 진행한다.
+
+    Returns:
+        {"scanned", "updated", "unmapped", "failed"} 건수
+    """
+    batch_size = max(1, min(batch_size, BACKFILL_BATCH_SIZE))
+    parallel = max(1, parallel)
+    counts = {"scanned": 0, "updated": 0, "unmapped": 0, "failed": 0}
+    counts_lock = threading.Lock()
+    in_flight = threading.BoundedSemaphore(parallel)
+    unmapped: Dict[str, int] = {}
+
+    def commit(updates: List[Tuple[str, str]]) -> None:
+        try:
+            if not dry_run:
+                batch = db.batch()
+                ref = db.collection(collection)
+                for doc_id, category_ko in updates:
+                    batch.set(ref.document(doc_id), {"category_ko": category_ko}, merge=True)
+                batch.commit()
+            with counts_lock:
+                counts["updated"] += len(updates)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("category_ko 배치 커밋 실패 (%d개 문서): %s", len(updates), exc)
+            with counts_lock:
+                counts["failed"] += len(updates)
+        finally:
+            in_flight.release()
+
+    started_at = time.monotonic()
+    with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="backfill-commit") as executor:
+        updates: List[Tuple[str, str]] = []
+        for snap in db.collection(collection).select(["category", "category_ko"]).stream():
+            counts["scanned"] += 1
+            row = snap.to_dict() or {}
+            category = row.get("category")
+            if not category or row.get("category_ko"):
+                continue
+            category_ko = category_ko_for(category)
+            if category_ko is None:
+                counts["unmapped"] += 1
+                unmapped[category] = unmapped.get(category, 0) + 1
+                continue
+
+            updates.append((snap.id, category_ko))
+            if len(updates) >= batch_size:
+                in_flight.acquire()  # 동시에 진행 중인 커밋이 parallel개를 넘지 않도록 대기
+                executor.submit(commit, updates)
+                updates = []
+
+        if updates:
+            in_flight.acquire()
+            executor.submit(commit, updates)
+
+    if unmapped:
+        logger.warning("매핑이 없는 카테고리: %s", unmapped)
+    logger.info(
+        "category_ko 보정 %s: %d개 문서 확인, %d개 %s, %d개 실패 (%.1fs)",
+        "(dry-run)" if dry_run else "완료",
+        counts["scanned"],
+        counts["updated"],
+        "대상" if dry_run else "갱신",
+        counts["failed"],
+        time.monotonic() - started_at,
+    )
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from firestore_csv_upload import FIRESTORE_COLLECTION, init_firestore
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Firestore apps 컬렉션의 category_ko를 채웁니다.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    backfill = sub.add_parser("backfill", help="category_ko가 비어 있는 문서를 채웁니다.")
+    backfill.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE, help="배치당 문서 수 (최대 500)")
+    backfill.add_argument("--parallel", type=int, default=BACKFILL_PARALLEL_COMMITS, help="동시에 진행할 배치 커밋 수")
+    backfill.add_argument("--dry-run", action="store_true", help="쓰지 않고 대상 수만 셉니다.")
+    args = parser.parse_args(argv)
+
+    counts = backfill_category_ko(
+        init_firestore(),
+        FIRESTORE_COLLECTION,
+        batch_size=args.batch_size,
+        parallel=args.parallel,
+        dry_run=args.dry_run,
+    )
+    if counts["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""스크래핑 실패 시 쓰는 로컬 카테고리 분류기.
+
+앱 이름, 설명, 패키지명을 해시된 문자 n-gram TF-IDF 벡터로 바꾸고, 카테고리별 중심 벡터(centroid)와의
+코사인 유사도가 가장 높은 카테고리를 고른다 (nearest centroid). 모델은 numpy .npz 파일 하나이다.
+
+추론은 요청 하나의 미분류 패키지를 한 번에 처리한다. 모든 문서의 (특징 인덱스, 가중치)를 이어 붙여
+centroids[:, 인덱스] * 가중치를 계산한 뒤 문서 경계별로 합산(np.add.reduceat)하므로, 패키지 수만큼 반복하지 않는다.
+
+사용법:
+    python classifier.py train --csv playstore_apps.csv --out category_model.npz
+    python classifier.py train --firestore --out category_model.npz
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODEL_VERSION = 1
+DEFAULT_FEATURES = 1 << 16
+# 설명은 앞부분만 사용한다 (긴 설명의 뒷부분은 대부분 공지/약관이라 분류에 도움이 되지 않는다).
+DESCRIPTION_CHARS = 1000
+# 배치 추론 한 번에 다루는 최대 특징 수 (중간 배열 크기 = 카테고리 수 x 이 값)
+PREDICT_CHUNK_FEATURES = 1 << 16
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def _package_text(package_name: str) -> str:
+    # com.kakao.talk -> "kakao talk" (흔한 접두어는 제외)
+    parts = [part for part in re.split(r"[._\-]+", package_name.lower()) if part not in ("com", "net", "org", "co", "kr", "android", "app")]
+    return " ".join(parts)
+
+
+def document_text(package_name: str, app_name: Optional[str], description: Optional[str]) -> str:
+    """분류에 쓰는 텍스트. 앱 이름과 패키지명이 설명보다 정보가 많으므로 두 번 넣어 가중치를 높인다."""
+    head = " ".join(part for part in (app_name or "", _package_text(package_name)) if part)
+    return f"{head} {head} {(description or '')[:DESCRIPTION_CHARS]}".lower()
+
+
+def hashed_features(text: str, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """단어와 단어 안의 문자 3-gram을 해시한 (인덱스, 개수) 배열을 반환한다."""
+    counts: Counter = Counter()
+    for token in _TOKEN_RE.findall(text):
+        counts[zlib.crc32(b"w:" + token.encode("utf-8")) % n_features] += 1
+        padded = f" {token} "
+        for start in range(len(padded) - 2):
+            counts[zlib.crc32(padded[start:start + 3].encode("utf-8")) % n_features] += 1
+    if not counts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    return indices, values
+
+
+def _tfidf(indices: np.ndarray, counts: np.ndarray, idf: np.ndarray) -> np.ndarray:
+    """sublinear TF x IDF 후 L2 정규화한 가중치."""
+    weights = (1.0 + np.log(counts)) * idf[indices]
+    norm = float(np.sqrt(np.dot(weights, weights)))
+    return weights / norm if norm > 0 else weights
+
+
+class CategoryModel:
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        idf: np.ndarray,
+        categories: List[str],
+        categories_ko: List[Optional[str]],
+    ) -> None:
+        self.centroids = centroids.astype(np.float32, copy=False)
+        self.idf = idf.astype(np.float32, copy=False)
+        self.categories = categories
+        self.categories_ko = categories_ko
+        self.n_features = int(idf.shape[0])
+
+    @classmethod
+    def train(
+        cls,
+        documents: Iterable[Tuple[str, str, Optional[str]]],
+        n_features: int = DEFAULT_FEATURES,
+    ) -> "CategoryModel":
+        """(텍스트, category, category_ko) 목록으로 학습한다."""
+        features: List[Tuple[np.ndarray, np.ndarray]] = []
+        labels: List[str] = []
+        korean_names: Dict[str, Counter] = defaultdict(Counter)
+        document_frequency = np.zeros(n_features, dtype=np.float64)
+
+        for text, category, category_ko in documents:
+            indices, counts = hashed_features(text, n_features)
+            if indices.size == 0:
+                continue
+            features.append((indices, counts))
+            labels.append(category)
+            if category_ko:
+                korean_names[category][category_ko] += 1
+            document_frequency[indices] += 1
+
+        if not features:
+            raise ValueError("학습할 문서가 없습니다.")
+
+        idf = (np.log((1.0 + len(features)) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+        categories = sorted(set(labels))
+        category_index = {category: i for i, category in enumerate(categories)}
+        centroids = np.zeros((len(categories), n_features), dtype=np.float32)
+
+        for (indices, counts), label in zip(features, labels):
+            np.add.at(centroids[category_index[label]], indices, _tfidf(indices, counts, idf))
+
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        centroids /= np.maximum(norms, 1e-12)
+        categories_ko = [
+            korean_names[category].most_common(1)[0][0] if korean_names[category] else None
+            for category in categories
+        ]
+        return cls(centroids, idf, categories, categories_ko)
+
+    def predict_texts(self, texts: List[str]) -> List[Tuple[str, Optional[str], float]]:
+        """텍스트 목록을 한 번에 분류해 (category, category_ko, score) 목록을 반환한다."""
+        documents = []
+        for text in texts:
+            indices, counts = hashed_features(text, self.n_features)
+            if indices.size == 0:
+                # reduceat이 빈 구간을 다룰 수 있도록 가중치 0인 특징 하나를 넣는다.
+                documents.append((np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.float32)))
+            else:
+                documents.append((indices, _tfidf(indices, counts, self.idf)))
+
+        # (카테고리 수 x 특징 수) 중간 배열이 너무 커지지 않도록 특징 수 기준으로 나눠 계산한다.
+        results: List[Tuple[str, Optional[str], float]] = []
+        start = 0
+        while start < len(documents):
+            end, total = start, 0
+            while end < len(documents) and (end == start or total + documents[end][0].size <= PREDICT_CHUNK_FEATURES):
+                total += documents[end][0].size
+                end += 1
+            results.extend(self._predict_chunk(documents[start:end]))
+            start = end
+        return results
+
+    def _predict_chunk(self, documents: List[Tuple[np.ndarray, np.ndarray]]) -> List[Tuple[str, Optional[str], float]]:
+        indices = np.concatenate([doc_indices for doc_indices, _ in documents])
+        weights = np.concatenate([doc_weights for _, doc_weights in documents])
+        offsets = np.cumsum([0] + [doc_indices.size for doc_indices, _ in documents[:-1]])
+        # (카테고리 수, 전체 특징 수) -> 문서 경계별 합 -> (카테고리 수, 문서 수)
+        scores = np.add.reduceat(self.centroids[:, indices] * weights, offsets, axis=1)
+        best = scores.argmax(axis=0)
+        best_scores = scores[best, np.arange(len(documents))]
+        return [(self.categories[k], self.categories_ko[k], float(best_scores[i])) for i, k in enumerate(best)]
+
+    def save(self, path: str) -> None:
+        """임시 파일에 쓴 뒤 원자적으로 교체한다."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                version=np.array(MODEL_VERSION),
+                centroids=self.centroids,
+                idf=self.idf,
+                categories=np.array(self.categories, dtype=str),
+                categories_ko=np.array([name or "" for name in self.categories_ko], dtype=str),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CategoryModel":
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["version"])
+            if version != MODEL_VERSION:
+                raise ValueError(f"지원하지 않는 모델 버전입니다: {version}")
+            return cls(
+                data["centroids"],
+                data["idf"],
+                [str(name) for name in data["categories"]],
+                [str(name) or None for name in data["categories_ko"]],
+            )
+
+
+class ModelHolder:
+    """모델 파일을 처음 쓸 때 한 번 읽어 둔다. 읽기에 실패하면 모델 없이 동작한다."""
+
+    def __init__(self, path: Optional[str], min_score: float) -> None:
+        self.path = path
+        self.min_score = min_score
+        self._model: Optional[CategoryModel] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.predictions = 0
+        self.accepted = 0
+
+    @property
+    def model(self) -> Optional[CategoryModel]:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._model = self._load()
+                    self._loaded = True
+        return self._model
+
+    def _load(self) -> Optional[CategoryModel]:
+        if not self.path:
+            return None
+        try:
+            model = CategoryModel.load(self.path)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Failed to load category model from %s", self.path)
+            return None
+        logger.info("Category model loaded from %s (%d categories).", self.path, len(model.categories))
+        return model
+
+    def predict(
+        self,
+        items: List[Tuple[str, Optional[str], Optional[str]]],
+    ) -> List[Optional[Tuple[str, Optional[str], float]]]:
+        """(package_name, app_name, description) 목록을 분류한다. min_score 미만이면 None."""
+        model = self.model
+        if model is None or not items:
+            return [None] * len(items)
+        predictions = model.predict_texts([document_text(*item) for item in items])
+        accepted = [prediction if prediction[2] >= self.min_score else None for prediction in predictions]
+        with self._lock:
+            self.predictions += len(items)
+            self.accepted += sum(1 for prediction in accepted if prediction is not None)
+        return accepted
+
+    def stats(self) -> Dict[str, Any]:
+        model = self._model
+        return {
+            "path": self.path,
+            "loaded": model is not None,
+            "categories": len(model.categories) if model is not None else 0,
+            "min_score": self.min_score,
+            "predictions": self.predictions,
+            "accepted": self.accepted,
+        }
+
+
+def _training_documents(rows: Iterable[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, str, Optional[str]]]:
+    documents = []
+    for doc_id, row in rows:
+        category = row.get("category")
+        if not category:
+            continue
+        text = document_text(doc_id, row.get("app_name"), row.get("description"))
+        documents.append((text, category, row.get("category_ko") or None))
+    return documents
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from snapshot import _iter_csv_rows, _iter_firestore_rows
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="로컬 카테고리 분류 모델을 학습합니다.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train = sub.add_parser("train", help="CSV 또는 Firestore apps 컬렉션으로 학습합니다.")
+    source = train.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="firestore_csv_upload.py가 사용하는 CSV 파일")
+    source.add_argument("--firestore", action="store_true", help="Firestore apps 컬렉션 전체로 학습합니다.")
+    train.add_argument("--out", required=True, help="출력 모델 파일 경로 (.npz)")
+    train.add_argument("--features", type=int, default=DEFAULT_FEATURES, help="해시 특징 차원 수")
+    train.add_argument("--holdout", type=float, default=0.1, help="정확도 측정용으로 떼어 둘 비율 (0이면 생략)")
+    args = parser.parse_args(argv)
+
+    started_at = time.monotonic()
+    documents = _training_documents(_iter_csv_rows(args.csv) if args.csv else _iter_firestore_rows())
+    random.Random(0).shuffle(documents)
+
+    if args.holdout > 0 and len(documents) >= 20:
+        split = int(len(documents) * (1 - args.holdout))
+        model = CategoryModel.train(documents[:split], args.features)
+        test = documents[split:]
+        predictions = model.predict_texts([text for text, _, _ in test])
+        correct = sum(1 for (_, category, _), (predicted, _, _) in zip(test, predictions) if predicted == category)
+        logger.info("홀드아웃 정확도: %.3f (%d/%d)", correct / len(test), correct, len(test))
+
+    model = CategoryModel.train(documents, args.features)
+    model.save(args.out)
+    logger.info(
+        "모델 '%s' 저장 완료: 문서 %d개, 카테고리 %d개 (%.1fs)",
+        args.out,
+        len(documents),
+        len(model.categories),
+        time.monotonic() - started_at,
+    )
+
+
+if __name__ == "__main__":
+    main()
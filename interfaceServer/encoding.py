@@ -0,0 +1,85 @@
+"""/classify 응답 직렬화(JSON/MessagePack)와 압축(gzip/zstd) 협상.
+
+orjson, msgpack, zstandard는 설치되어 있을 때만 쓴다.
+- orjson이 없으면 표준 json으로 직렬화한다 (출력 형식은 같다).
+- msgpack이 없으면 Accept에 MessagePack이 있어도 JSON으로 응답한다.
+- zstandard가 없으면 zstd를 협상하지 않는다 (gzip은 표준 라이브러리).
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from typing import Any, List, Optional
+
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None  # type: ignore[assignment]
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore[assignment]
+
+JSON_MEDIA_TYPE = "application/json"
+# application/msgpack이 등록된 이름이지만 예전 클라이언트는 x- 접두사를 쓴다.
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+# 이보다 작은 본문은 압축하지 않는다 (헤더/CPU 비용이 더 크다).
+COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+ZSTD_LEVEL = int(os.getenv("RESPONSE_ZSTD_LEVEL", "3"))
+
+
+def dumps_json(obj: Any) -> bytes:
+    """키를 정렬한 compact UTF-8 JSON (orjson이 있으면 orjson)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def is_msgpack(media_type: str) -> bool:
+    return media_type in MSGPACK_MEDIA_TYPES
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """Accept 헤더에 맞는 응답 형식. 명시하지 않았거나 고를 수 없으면 JSON."""
+    if not accept:
+        return JSON_MEDIA_TYPE
+    offers = [JSON_MEDIA_TYPE] + (list(MSGPACK_MEDIA_TYPES) if msgpack is not None else [])
+    return parse_accept_header(accept, MIMEAccept).best_match(offers, default=JSON_MEDIA_TYPE)
+
+
+def encode(obj: Any, media_type: str) -> bytes:
+    if is_msgpack(media_type):
+        return msgpack.packb(obj, use_bin_type=True)
+    return dumps_json(obj)
+
+
+def content_codings() -> List[str]:
+    """서버가 지원하는 content-coding (선호 순서)."""
+    return (["zstd"] if zstandard is not None else []) + ["gzip"]
+
+
+def negotiate_content_coding(accept_encoding: Optional[str], size: int) -> Optional[str]:
+    """Accept-Encoding에 맞는 압축 방식. 압축하지 않으면 None."""
+    if not accept_encoding or size < COMPRESS_MIN_BYTES:
+        return None
+    return parse_accept_header(accept_encoding).best_match(content_codings())
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    if coding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    if coding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported content-coding: {coding}")
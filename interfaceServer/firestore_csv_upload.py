@@ -1,8 +1,14 @@
 import os
 import logging
+import argparse
 import csv
+import hashlib
 import json
+import sqlite3
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import firebase_admin
 from firebase_admin import credentials, firestore
 
@@ -29,118 +35,484 @@ FIREBASE_PROJECT_ID = os.getenv("FIREBASE_PROJECT_ID")
 # -----------------------------------------------------------------
 # 3. CSV 파일 정보
 # -----------------------------------------------------------------
-CSV_FILE_PATH = 'playstore_apps.csv'  # 업로드할 CSV 파일
-DOCUMENT_ID_COLUMN = 'id'             # 문서 ID로 사용할 CSV 열 이름
+DEFAULT_CSV_FILE_PATH = 'playstore_apps.csv'  # 기본 업로드 CSV 파일
+DOCUMENT_ID_COLUMN = 'id'                     # 문서 ID로 사용할 CSV 열 이름
+BATCH_SIZE = 499                              # Firestore는 배치당 500개 쓰기를 권장합니다.
+DEFAULT_PARALLEL_COMMITS = 4                  # 동시에 진행할 배치 커밋 수
+DEFAULT_MANIFEST_PATH = f'{FIRESTORE_COLLECTION}.manifest.sqlite3'  # 델타 업로드용 행 해시 매니페스트
+
 
 # -----------------------------------------------------------------
 # 4. Firebase Admin SDK 초기화
 # -----------------------------------------------------------------
-try:
-    if not firebase_admin._apps:  # 앱이 아직 초기화되지 않았을 때만 초기화
-        cred = None
-        options = {}
-
-        if not FIREBASE_SERVICE_ACCOUNT:
-            # 환경 변수가 없으면 ADC(Application Default Credentials) 시도
-            logger.info("FIREBASE_SERVICE_ACCOUNT_JSON/GOOGLE_APPLICATION_CREDENTIALS 미설정. ADC로 초기화를 시도합니다.")
-            cred = credentials.ApplicationDefault()
-        elif os.path.exists(FIREBASE_SERVICE_ACCOUNT):
-            # 시나리오 1: 파일 경로일 경우
-            logger.info("파일 경로에서 서비스 계정을 로드합니다.")
-            cred = credentials.Certificate(FIREBASE_SERVICE_ACCOUNT)
-        else:
-            # 시나리오 2: JSON 문자열일 경우
-            logger.info("JSON 문자열에서 서비스 계정을 로드합니다.")
-            try:
-                service_account_dict = json.loads(FIREBASE_SERVICE_ACCOUNT)
-                cred = credentials.Certificate(service_account_dict)
-            except json.JSONDecodeError:
-                logger.critical("FIREBASE_SERVICE_ACCOUNT_JSON이 올바른 JSON 문자열이 아닙니다.")
-                sys.exit(1)
-        
-        if FIREBASE_PROJECT_ID:
-            options["projectId"] = FIREBASE_PROJECT_ID
-
-        firebase_admin.initialize_app(credential=cred, options=options or None)
-
-    db = firestore.client()
-    logger.info(f"Firestore 클라이언트가 성공적으로 초기화되었습니다. (Project ID: {db.project})")
-
-except Exception as e:
-    logger.critical(f"Firebase Admin SDK 초기화 실패: {e}")
-    logger.critical("서비스 계정 키(JSON)가 올바른지, 또는 파일 경로가 맞는지 확인하세요.")
-    sys.exit(1) # 스크립트 중지
+def init_firestore():
+    """Firebase Admin SDK를 초기화하고 Firestore 클라이언트를 반환한다. 실패하면 스크립트를 중지한다."""
+    try:
+        if not firebase_admin._apps:  # 앱이 아직 초기화되지 않았을 때만 초기화
+            cred = None
+            options = {}
+
+            if not FIREBASE_SERVICE_ACCOUNT:
+                # 환경 변수가 없으면 ADC(Application Default Credentials) 시도
+                logger.info("FIREBASE_SERVICE_ACCOUNT_JSON/GOOGLE_APPLICATION_CREDENTIALS 미설정. ADC로 초기화를 시도합니다.")
+                cred = credentials.ApplicationDefault()
+            elif os.path.exists(FIREBASE_SERVICE_ACCOUNT):
+                # 시나리오 1: 파일 경로일 경우
+                logger.info("파일 경로에서 서비스 계정을 로드합니다.")
+                cred = credentials.Certificate(FIREBASE_SERVICE_ACCOUNT)
+            else:
+                # 시나리오 2: JSON 문자열일 경우
+                logger.info("JSON 문자열에서 서비스 계정을 로드합니다.")
+                try:
+                    service_account_dict = json.loads(FIREBASE_SERVICE_ACCOUNT)
+                    cred = credentials.Certificate(service_account_dict)
+                except json.JSONDecodeError:
+                    logger.critical("FIREBASE_SERVICE_ACCOUNT_JSON이 올바른 JSON 문자열이 아닙니다.")
+                    sys.exit(1)
+
+            if FIREBASE_PROJECT_ID:
+                options["projectId"] = FIREBASE_PROJECT_ID
+
+            firebase_admin.initialize_app(credential=cred, options=options or None)
+
+        db = firestore.client()
+        logger.info(f"Firestore 클라이언트가 성공적으로 초기화되었습니다. (Project ID: {db.project})")
+        return db
+
+    except Exception as e:
+        logger.critical(f"Firebase Admin SDK 초기화 실패: {e}")
+        logger.critical("서비스 계정 키(JSON)가 올바른지, 또는 파일 경로가 맞는지 확인하세요.")
+        sys.exit(1) # 스크립트 중지
+
 
 # -----------------------------------------------------------------
-# 5. CSV 읽기 및 Firestore에 일괄 쓰기
+# 5. 행 전처리 및 체크포인트
 # -----------------------------------------------------------------
-def upload_csv_to_firestore():
+def parse_installs(installs_str, doc_id=None):
+    """'installs' 문자열을 숫자로 변환한다. ("1,000,000,000+" -> 1000000000)"""
+    installs_str = (installs_str or '').strip()
+    if not installs_str:
+        return 0
+    clean_installs_str = installs_str.replace(',', '').replace('+', '')
+    try:
+        return int(clean_installs_str)
+    except ValueError:
+        logger.warning(f"'{installs_str}'를 숫자로 변환할 수 없습니다. (ID: {doc_id})")
+        return 0
+
+
+def prepare_document(row):
+    """CSV 행을 Firestore 문서 데이터로 변환한다. 문서 ID가 없으면 (None, None)을 반환한다."""
+    doc_id = row.get(DOCUMENT_ID_COLUMN)
+    if not doc_id:
+        return None, None
+
+    # Firestore에 저장할 데이터 (row 딕셔너리 전체)
+    data = dict(row) # 원본 row 복사
+
+    # [데이터 전처리 예시] 'installs' 열을 숫자형으로 변환
+    installs_str = (data.get('installs') or '0').strip()
+    if installs_str:
+        # 새 필드 'installs_numeric'에 숫자형으로 저장
+        data['installs_numeric'] = parse_installs(installs_str, doc_id)
+    return doc_id, data
+
+
+def default_checkpoint_path(csv_path):
+    return f"{csv_path}.checkpoint.json"
+
+
+def csv_fingerprint(csv_path):
+    """CSV 파일의 지문 (크기 + 수정 시각). 같은 경로라도 내용이 바뀌었으면 체크포인트를 쓰지 않기 위해 쓴다."""
+    try:
+        stat = os.stat(csv_path)
+    except OSError:
+        return None
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def load_checkpoint(checkpoint_path, csv_path):
+    """체크포인트에서 마지막으로 커밋된 행 오프셋을 읽는다. 없거나 다른 CSV(또는 바뀐 CSV)의 체크포인트면 0."""
     try:
-        with open(CSV_FILE_PATH, mode='r', encoding='utf-8-sig') as file:
+        with open(checkpoint_path, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return 0
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"체크포인트 파일을 읽을 수 없어 처음부터 시작합니다: {e}")
+        return 0
+
+    if checkpoint.get('csv_path') != os.path.abspath(csv_path):
+        logger.warning(f"체크포인트가 다른 CSV 파일({checkpoint.get('csv_path')})의 것이므로 무시합니다.")
+        return 0
+    if checkpoint.get('fingerprint') != csv_fingerprint(csv_path):
+        logger.warning("체크포인트 이후 CSV 파일이 바뀌었으므로(크기/수정 시각 불일치) 무시하고 처음부터 업로드합니다.")
+        return 0
+    return int(checkpoint.get('row_offset', 0))
+
+
+def remove_checkpoint(checkpoint_path):
+    """모든 배치가 커밋된 뒤 체크포인트를 지운다. 남겨 두면 다음 업로드가 그 행들을 건너뛴다."""
+    try:
+        os.remove(checkpoint_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"체크포인트 파일을 지우지 못했습니다 ({checkpoint_path}): {e}")
+
+
+def save_checkpoint(checkpoint_path, csv_path, row_offset, total_doc_count, fingerprint=None):
+    """커밋이 끝난 행 오프셋을 원자적으로 기록한다 (임시 파일 작성 후 교체)."""
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'csv_path': os.path.abspath(csv_path),
+            'fingerprint': fingerprint,
+            'row_offset': row_offset,
+            'documents_committed': total_doc_count,
+            'updated_at': time.time(),
+        }, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+class CommitTracker:
+    """병렬로 끝나는 배치 커밋의 순서를 추적해, 앞에서부터 연속으로 커밋된 행 오프셋만 체크포인트에 기록한다."""
+
+    def __init__(self, csv_path, checkpoint_path, start_offset):
+        self.csv_path = csv_path
+        self.checkpoint_path = checkpoint_path
+        self.fingerprint = csv_fingerprint(csv_path)
+        self.committed_offset = start_offset
+        self.total_doc_count = 0
+        self.failed_batches = 0
+        self._next_seq = 0
+        self._done = {}  # seq -> (end_offset, doc_count, ok)
+        self._lock = threading.Lock()
+
+    def mark(self, seq, end_offset, doc_count, ok):
+        with self._lock:
+            self._done[seq] = (end_offset, doc_count, ok)
+            if ok:
+                self.total_doc_count += doc_count
+            else:
+                self.failed_batches += 1
+
+            advanced = False
+            while self._next_seq in self._done and self._done[self._next_seq][2]:
+                self.committed_offset = self._done.pop(self._next_seq)[0]
+                self._next_seq += 1
+                advanced = True
+
+            if advanced and self.checkpoint_path:
+                save_checkpoint(self.checkpoint_path, self.csv_path, self.committed_offset, self.total_doc_count,
+                                self.fingerprint)
+
+
+def row_hash(data):
+    """문서 데이터의 내용 해시 (열 순서와 무관)."""
+    encoded = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()
+
+
+class DeltaManifest:
+    """
+    마지막으로 업로드한 행의 내용 해시를 id별로 기록하는 로컬 매니페스트 (SQLite).
+
+    - 이번 실행에서 CSV에 나타난 id는 run_id로 표시해, 사라진 id를 찾을 수 있게 한다.
+    - 해시는 배치 커밋이 성공한 뒤에만 갱신한다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.run_id = int(time.time() * 1000)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rows (id TEXT PRIMARY KEY, hash TEXT NOT NULL, run_id INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._seen = []
+
+    def hashes_for(self, doc_ids):
+        """주어진 id들의 기록된 해시를 {id: hash}로 반환한다."""
+        if not doc_ids:
+            return {}
+        placeholders = ','.join('?' * len(doc_ids))
+        with self._lock:
+            rows = self._conn.execute(f"SELECT id, hash FROM rows WHERE id IN ({placeholders})", list(doc_ids))
+            return dict(rows.fetchall())
+
+    def mark_seen(self, doc_id):
+        self._seen.append(doc_id)
+        if len(self._seen) >= 5000:
+            self.flush_seen()
+
+    def flush_seen(self):
+        seen, self._seen = self._seen, []
+        if not seen:
+            return
+        with self._lock:
+            self._conn.executemany("UPDATE rows SET run_id = ? WHERE id = ?", [(self.run_id, i) for i in seen])
+            self._conn.commit()
+
+    def record(self, items):
+        """커밋된 (id, hash) 목록을 기록한다."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO rows (id, hash, run_id) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET hash = excluded.hash, run_id = excluded.run_id",
+                [(doc_id, digest, self.run_id) for doc_id, digest in items],
+            )
+            self._conn.commit()
+
+    def iter_missing(self, chunk_size):
+        """이번 실행에서 CSV에 나타나지 않은 id를 chunk_size개씩 반환한다."""
+        self.flush_seen()
+        with self._lock:
+            cursor = self._conn.execute("SELECT id FROM rows WHERE run_id != ?", (self.run_id,))
+            missing = [row[0] for row in cursor.fetchall()]
+        for start in range(0, len(missing), chunk_size):
+            yield missing[start:start + chunk_size]
+
+    def remove(self, doc_ids):
+        with self._lock:
+            self._conn.executemany("DELETE FROM rows WHERE id = ?", [(i,) for i in doc_ids])
+            self._conn.commit()
+
+    def close(self):
+        self.flush_seen()
+        with self._lock:
+            self._conn.close()
+
+
+def delete_missing_documents(db, manifest, batch_size, dry_run=False):
+    """매니페스트에는 있지만 이번 CSV에 없는 id의 문서를 Firestore에서 삭제한다."""
+    deleted = 0
+    for doc_ids in manifest.iter_missing(batch_size):
+        if not dry_run:
+            batch = db.batch()
+            collection = db.collection(FIRESTORE_COLLECTION)
+            for doc_id in doc_ids:
+                batch.delete(collection.document(doc_id))
+            batch.commit()
+            manifest.remove(doc_ids)
+        deleted += len(doc_ids)
+    return deleted
+
+
+# -----------------------------------------------------------------
+# 6. CSV 읽기 및 Firestore에 병렬 일괄 쓰기
+# -----------------------------------------------------------------
+def upload_csv_to_firestore(csv_path=DEFAULT_CSV_FILE_PATH, batch_size=BATCH_SIZE,
+                            parallel=DEFAULT_PARALLEL_COMMITS, checkpoint_path=None,
+                            resume=True, dry_run=False, db=None,
+                            delta=False, manifest_path=None, delete_missing=False):
+    """
+    CSV 파일을 스트리밍으로 읽어 Firestore에 배치 단위로 업로드한다.
+
+    - 최대 parallel개의 배치 커밋을 동시에 진행한다 (메모리에는 그만큼의 배치만 유지).
+    - 커밋이 끝난 행 오프셋을 체크포인트 파일에 기록하고, resume=True면 그 지점부터 이어서 올린다.
+      체크포인트에는 CSV 지문(크기 + 수정 시각)을 함께 남겨 파일이 바뀌었으면 무시하고,
+      실패한 배치 없이 끝나면 지운다.
+    - dry_run=True면 Firestore에 쓰지 않고 읽기/전처리 처리량만 측정한다.
+    - delta=True면 매니페스트의 행 해시와 비교해 새로 생겼거나 바뀐 행만 쓴다. 이때는 체크포인트로 재개하지 않고
+      항상 CSV 전체를 비교한다. delete_missing=True면 CSV에서 사라진 id의 문서도 삭제한다
+      (실패한 배치가 없이 전체를 훑은 실행에서만).
+
+    Returns:
+        성공 여부 (실패한 배치가 없으면 True)
+    """
+    batch_size = max(1, min(batch_size, BATCH_SIZE))
+    parallel = max(1, parallel)
+    if checkpoint_path is None:
+        checkpoint_path = default_checkpoint_path(csv_path)
+    if dry_run:
+        checkpoint_path = None  # 처리량 측정 모드는 체크포인트를 건드리지 않는다.
+
+    # 델타 모드는 매니페스트가 진행 기록 역할을 하므로 체크포인트로 행을 건너뛰지 않는다.
+    # 처음부터 다시 읽어도 이미 커밋된 행은 해시가 같아 쓰지 않고, 앞쪽에서 바뀐 행도 빠짐없이 비교된다.
+    # (건너뛴 행은 비교되지 않으므로, 재개한 실행의 결과로 delete_missing을 판단하면 안 된다.)
+    start_offset = 0
+    if resume and checkpoint_path and not delta:
+        start_offset = load_checkpoint(checkpoint_path, csv_path)
+    if start_offset:
+        logger.info(f"체크포인트에서 재개합니다: {start_offset}번째 행 이후부터 업로드합니다.")
+
+    if db is None and not dry_run:
+        db = init_firestore()
+
+    manifest = None
+    if delta:
+        manifest = DeltaManifest(manifest_path or DEFAULT_MANIFEST_PATH)
+        logger.info(f"델타 모드: 매니페스트 '{manifest.path}'와 비교해 바뀐 행만 업로드합니다.")
+    skipped_unchanged = 0
+
+    tracker = CommitTracker(csv_path, checkpoint_path, start_offset)
+    in_flight = threading.BoundedSemaphore(parallel)
+    started_at = time.monotonic()
+
+    def commit_batch(seq, docs, end_offset):
+        try:
+            if not dry_run:
+                batch = db.batch()
+                collection = db.collection(FIRESTORE_COLLECTION)
+                for doc_id, data, _ in docs:
+                    # merge=True: CSV에 없는 필드(스크래핑/갱신이 기록한 fetched_at 등)는 지우지 않는다.
+                    batch.set(collection.document(doc_id), data, merge=True)
+                batch.commit()
+                if manifest is not None:
+                    manifest.record([(doc_id, digest) for doc_id, _, digest in docs])
+            tracker.mark(seq, end_offset, len(docs), True)
+        except Exception as e:
+            logger.error(f"배치 #{seq} ({len(docs)}개 문서, 행 ~{end_offset}) 커밋 실패: {e}")
+            tracker.mark(seq, end_offset, len(docs), False)
+        finally:
+            in_flight.release()
+
+    try:
+        with open(csv_path, mode='r', encoding='utf-8-sig', newline='') as file, \
+                ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="csv-commit") as executor:
             # 'utf-8-sig'는 CSV 파일의 BOM(Byte Order Mark)을 처리합니다.
             csv_reader = csv.DictReader(file)
-            
-            logger.info(f"'{CSV_FILE_PATH}' 파일 읽기 시작... -> '{FIRESTORE_COLLECTION}' 컬렉션에 업로드합니다.")
-            
-            batch = db.batch()
-            doc_count = 0
-            total_doc_count = 0
+
+            mode = "DRY-RUN" if dry_run else f"'{FIRESTORE_COLLECTION}' 컬렉션에 업로드"
+            logger.info(f"'{csv_path}' 파일 읽기 시작... -> {mode} (배치 {batch_size}, 동시 커밋 {parallel})")
+
+            docs = []
+            seq = 0
+            row_offset = 0
+            last_report = started_at
+
+            candidates = []
+
+            def flush_candidates():
+                # 델타 모드: 후보 행의 해시를 매니페스트와 한 번에 비교해 바뀐 행만 남긴다.
+                nonlocal skipped_unchanged
+                known = manifest.hashes_for([doc_id for doc_id, _, _ in candidates])
+                for doc_id, data, digest in candidates:
+                    if known.get(doc_id) == digest:
+                        skipped_unchanged += 1
+                    else:
+                        docs.append((doc_id, data, digest))
+                candidates.clear()
 
             for row in csv_reader:
-                try:
-                    # CSV에서 문서 ID 가져오기
-                    doc_id = row.get(DOCUMENT_ID_COLUMN)
-                    if not doc_id:
-                        logger.warning(f"'{DOCUMENT_ID_COLUMN}' 열이 없는 행을 건너뜁니다: {row}")
-                        continue
-                    
-                    # Firestore에 저장할 데이터 (row 딕셔너리 전체)
-                    data = dict(row) # 원본 row 복사
-                    
-                    # [데이터 전처리 예시] 'installs' 열을 숫자형으로 변환
-                    installs_str = data.get('installs', '0').strip()
-                    if installs_str:
-                        # "1,000,000,000+" -> "1000000000"
-                        clean_installs_str = installs_str.replace(',', '').replace('+', '')
-                        try:
-                            # 새 필드 'installs_numeric'에 숫자형으로 저장
-                            data['installs_numeric'] = int(clean_installs_str)
-                        except ValueError:
-                            logger.warning(f"'{installs_str}'를 숫자로 변환할 수 없습니다. (ID: {doc_id})")
-                            data['installs_numeric'] = 0
-                    
-                    # 배치에 쓰기 작업 추가
-                    doc_ref = db.collection(FIRESTORE_COLLECTION).document(doc_id)
-                    batch.set(doc_ref, data) # .set()은 덮어쓰기 (없으면 생성)
-                    
-                    doc_count += 1
-                    total_doc_count += 1
-
-                    # Firestore는 배치당 500개 쓰기를 권장합니다.
-                    if doc_count >= 499:
-                        logger.info(f"{doc_count}개 문서를 커밋합니다...")
-                        batch.commit()
-                        batch = db.batch() # 새 배치 시작
-                        doc_count = 0
-
-                except Exception as e:
-                    logger.error(f"{doc_id} 처리 중 오류 발생: {e}")
+                row_offset += 1
+                if row_offset <= start_offset:
+                    continue
 
-            # 남은 배치 커밋
-            if doc_count > 0:
-                logger.info(f"남은 {doc_count}개 문서를 커밋합니다...")
-                batch.commit()
+                doc_id, data = prepare_document(row)
+                if not doc_id:
+                    logger.warning(f"'{DOCUMENT_ID_COLUMN}' 열이 없는 행을 건너뜁니다: {row}")
+                    continue
+
+                if manifest is None:
+                    docs.append((doc_id, data, None))
+                else:
+                    manifest.mark_seen(doc_id)
+                    candidates.append((doc_id, data, row_hash(data)))
+                    # 바뀐 행이 모두 들어가도 배치 한도를 넘지 않는 시점에 비교한다.
+                    if len(candidates) + len(docs) >= batch_size:
+                        flush_candidates()
 
-            logger.info(f"CSV 파일 처리 완료. 총 {total_doc_count}개 문서가 '{FIRESTORE_COLLECTION}' 컬렉션에 업로드되었습니다.")
+                if len(docs) >= batch_size:
+                    in_flight.acquire()  # 동시에 진행 중인 커밋이 parallel개를 넘지 않도록 대기
+                    executor.submit(commit_batch, seq, docs, row_offset)
+                    seq += 1
+                    docs = []
+
+                    now = time.monotonic()
+                    if now - last_report >= 5:
+                        processed = row_offset - start_offset
+                        logger.info(f"진행 상황: {processed}행 처리 ({processed / (now - started_at):.0f} rows/sec)")
+                        last_report = now
+
+            if candidates:
+                flush_candidates()
+
+            # 남은 배치 커밋
+            if docs:
+                in_flight.acquire()
+                executor.submit(commit_batch, seq, docs, row_offset)
 
     except FileNotFoundError:
-        logger.critical(f"[치명적 오류] CSV 파일을 찾을 수 없습니다: {CSV_FILE_PATH}")
+        logger.critical(f"[치명적 오류] CSV 파일을 찾을 수 없습니다: {csv_path}")
+        if manifest is not None:
+            manifest.close()
+        return False
     except Exception as e:
         logger.critical(f"[치명적 오류] 스크립트 실행 중 오류: {e}")
+        if manifest is not None:
+            manifest.close()
+        return False
+
+    if manifest is not None:
+        logger.info(f"델타 모드: 변경 없는 {skipped_unchanged}개 행을 건너뛰었습니다.")
+        if delete_missing:
+            if tracker.failed_batches:
+                logger.warning("실패한 배치가 있어 사라진 id 삭제를 건너뜁니다.")
+            else:
+                deleted = delete_missing_documents(db, manifest, batch_size, dry_run=dry_run)
+                logger.info(f"CSV에서 사라진 {deleted}개 문서를 {'삭제 예정 (dry-run)' if dry_run else '삭제했습니다'}.")
+        manifest.close()
+
+    elapsed = max(time.monotonic() - started_at, 1e-9)
+    processed = row_offset - start_offset
+    if dry_run:
+        logger.info(f"[DRY-RUN] CSV 파일 처리 완료. 총 {tracker.total_doc_count}개 문서 (쓰기 없음).")
+    else:
+        logger.info(f"CSV 파일 처리 완료. 총 {tracker.total_doc_count}개 문서가 '{FIRESTORE_COLLECTION}' 컬렉션에 업로드되었습니다.")
+    logger.info(f"처리량: {processed}행 / {elapsed:.1f}초 = {processed / elapsed:.0f} rows/sec")
+    if tracker.failed_batches:
+        logger.error(
+            f"{tracker.failed_batches}개 배치 커밋이 실패했습니다. 체크포인트는 {tracker.committed_offset}번째 행에 "
+            f"머물러 있으므로 다시 실행하면 그 지점부터 재시도합니다."
+        )
+        return False
+    if checkpoint_path:
+        remove_checkpoint(checkpoint_path)
+    return True
+
 
 # -----------------------------------------------------------------
-# 6. 스크립트 실행
+# 7. 스크립트 실행
 # -----------------------------------------------------------------
-if __name__ == "__main__":
-    upload_csv_to_firestore()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="CSV 파일을 Firestore apps 컬렉션에 업로드합니다.")
+    parser.add_argument('csv_path', nargs='?', default=DEFAULT_CSV_FILE_PATH,
+                        help=f"업로드할 CSV 파일 경로 (기본값: {DEFAULT_CSV_FILE_PATH})")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f"배치당 문서 수 (최대 {BATCH_SIZE})")
+    parser.add_argument('--parallel', type=int, default=DEFAULT_PARALLEL_COMMITS,
+                        help="동시에 진행할 배치 커밋 수")
+    parser.add_argument('--checkpoint', default=None,
+                        help="체크포인트 파일 경로 (기본값: <csv_path>.checkpoint.json)")
+    parser.add_argument('--no-resume', action='store_true',
+                        help="체크포인트를 무시하고 처음부터 업로드")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Firestore에 쓰지 않고 처리량(rows/sec)만 측정")
+    parser.add_argument('--delta', action='store_true',
+                        help="매니페스트의 행 해시와 비교해 새로 생겼거나 바뀐 행만 업로드")
+    parser.add_argument('--manifest', default=None,
+                        help=f"델타 매니페스트 경로 (기본값: {DEFAULT_MANIFEST_PATH})")
+    parser.add_argument('--delete-missing', action='store_true',
+                        help="델타 모드에서 CSV에 없는 id의 문서를 삭제")
+    return parser.parse_args(argv)
 
+
+if __name__ == "__main__":
+    args = parse_args()
+    ok = upload_csv_to_firestore(
+        csv_path=args.csv_path,
+        batch_size=args.batch_size,
+        parallel=args.parallel,
+        checkpoint_path=args.checkpoint,
+        resume=not args.no_resume,
+        dry_run=args.dry_run,
+        delta=args.delta,
+        manifest_path=args.manifest,
+        delete_missing=args.delete_missing,
+    )
+    sys.exit(0 if ok else 1)
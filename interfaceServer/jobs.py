@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from admission import ADMISSION_REJECTED_TOTAL, OverloadedError
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+_FINISHED = (JOB_DONE, JOB_FAILED)
+_WORKER_LOST_ERROR = "The worker running this job stopped before it finished."
+
+
+def package_set_key(package_names: List[str]) -> str:
+    """패키지 집합(순서/중복 무관)의 안정적인 지문을 만든다."""
+    digest = hashlib.sha1()
+    for package_name in sorted(set(package_names)):
+        digest.update(package_name.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class JobStore:
+    """
+    분류 작업의 상태와 결과를 보관하는 SQLite 저장소.
+
+    - gunicorn 워커 프로세스들이 같은 파일을 함께 쓰므로, 작업을 제출한 워커가 아니어도 조회/스트리밍할 수 있다.
+    - 대기/실행 중인 작업은 맡은 워커가 주기적으로(그리고 결과를 기록할 때마다) updated_at을 갱신한다.
+      stale_after초 넘게 갱신이 없으면 맡은 워커가 사라진 것으로 보고 failed로 바꾼다.
+    - 완료된 작업은 ttl초 동안 보관한 뒤 지운다.
+    - 파일(과 상위 디렉터리)은 처음 읽거나 쓸 때 만든다.
+    """
+
+    def __init__(self, path: str, ttl: float, stale_after: float) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.stale_after = stale_after
+        self._local = threading.local()
+        # 같은 프로세스 안의 스트리밍 응답을 바로 깨우기 위한 신호 (다른 프로세스의 기록은 폴링으로 본다)
+        self.changed = threading.Condition()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS classify_jobs ("
+            " id TEXT PRIMARY KEY, key TEXT NOT NULL, package_names TEXT NOT NULL,"
+            " status TEXT NOT NULL, error TEXT,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL, finished_at REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS classify_jobs_key ON classify_jobs (key, created_at)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS classify_job_results ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT NOT NULL, package_name TEXT NOT NULL,"
+            " failed INTEGER NOT NULL, payload TEXT NOT NULL,"
+            " UNIQUE (job_id, package_name))"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._schema_ready:
+                with self._schema_lock:
+                    if not self._schema_ready:
+                        self._create_schema(conn)
+                        self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    def _notify(self) -> None:
+        with self.changed:
+            self.changed.notify_all()
+
+    def create(self, job_id: str, key: str, package_names: List[str]) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO classify_jobs (id, key, package_names, status, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, key, json.dumps(package_names), JOB_QUEUED, now, now),
+        )
+        conn.commit()
+
+    def find_reusable(self, key: str) -> Optional[str]:
+        """같은 패키지 집합으로 진행 중이거나, 에러 없이 끝난 작업의 id를 반환한다."""
+        now = time.time()
+        row = self._conn().execute(
+            "SELECT id FROM classify_jobs j WHERE key = ? AND ("
+            "  (status IN (?, ?) AND updated_at >= ?)"
+            "  OR (status = ? AND finished_at >= ? AND NOT EXISTS ("
+            "    SELECT 1 FROM classify_job_results r WHERE r.job_id = j.id AND r.failed))"
+            ") ORDER BY created_at DESC LIMIT 1",
+            (key, JOB_QUEUED, JOB_RUNNING, now - self.stale_after, JOB_DONE, now - self.ttl),
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "UPDATE classify_jobs SET status = ?, error = ?, updated_at = ?, finished_at = ? WHERE id = ?",
+            (status, error, now, now if status in _FINISHED else None, job_id),
+        )
+        conn.commit()
+        self._notify()
+
+    def touch(self, job_ids: List[str]) -> None:
+        """맡은 워커가 살아 있음을 기록한다 (끝나지 않은 작업의 updated_at 갱신)."""
+        if not job_ids:
+            return
+        conn = self._conn()
+        conn.execute(
+            f"UPDATE classify_jobs SET updated_at = ? WHERE status IN (?, ?) AND id IN ({','.join('?' * len(job_ids))})",
+            (time.time(), JOB_QUEUED, JOB_RUNNING, *job_ids),
+        )
+        conn.commit()
+
+    def add_result(self, job_id: str, package_name: str, result: Dict[str, Any]) -> None:
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR IGNORE INTO classify_job_results (job_id, package_name, failed, payload) VALUES (?, ?, ?, ?)",
+            (job_id, package_name, 1 if result.get("error") else 0, json.dumps(result, ensure_ascii=False)),
+        )
+        conn.execute("UPDATE classify_jobs SET updated_at = ? WHERE id = ?", (time.time(), job_id))
+        conn.commit()
+        self._notify()
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 행을 읽는다. 만료된 작업은 None, 실행하던 워커가 사라진 작업은 failed로 바꿔 반환한다."""
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT key, package_names, status, error, created_at, updated_at, finished_at,"
+            " (SELECT COUNT(*) FROM classify_job_results WHERE job_id = ?)"
+            " FROM classify_jobs WHERE id = ?",
+            (job_id, job_id),
+        ).fetchone()
+        if row is None:
+            return None
+        key, package_names, status, error, created_at, updated_at, finished_at, completed = row
+        now = time.time()
+        if finished_at is not None and now - finished_at > self.ttl:
+            return None
+        if status not in _FINISHED and now - updated_at > self.stale_after:
+            status, error, finished_at = JOB_FAILED, _WORKER_LOST_ERROR, now
+            self.set_status(job_id, status, error)
+        return {
+            "key": key,
+            "package_names": json.loads(package_names),
+            "status": status,
+            "error": error,
+            "created_at": created_at,
+            "finished_at": finished_at,
+            "completed": completed,
+        }
+
+    def results(self, job_id: str, after_seq: int = 0) -> List[Tuple[int, str, Dict[str, Any]]]:
+        """after_seq 이후에 기록된 결과를 기록 순서대로 (seq, package_name, result)로 반환한다."""
+        rows = self._conn().execute(
+            "SELECT seq, package_name, payload FROM classify_job_results WHERE job_id = ? AND seq > ? ORDER BY seq",
+            (job_id, after_seq),
+        ).fetchall()
+        return [(seq, package_name, json.loads(payload)) for seq, package_name, payload in rows]
+
+    def purge_expired(self) -> None:
+        cutoff = time.time() - self.ttl
+        conn = self._conn()
+        conn.execute(
+            "DELETE FROM classify_job_results WHERE job_id IN (SELECT id FROM classify_jobs WHERE finished_at < ?)",
+            (cutoff,),
+        )
+        conn.execute("DELETE FROM classify_jobs WHERE finished_at < ?", (cutoff,))
+        conn.commit()
+
+
+class ClassifyJob:
+    """분류 작업 하나를 가리키는 핸들. 상태와 결과는 JobStore에서 읽고 쓴다."""
+
+    def __init__(self, store: JobStore, job_id: str, key: str, package_names: List[str]) -> None:
+        self._store = store
+        self.id = job_id
+        self.key = key
+        self.package_names = package_names
+
+    def add_result(self, package_name: str, result: Dict[str, Any]) -> None:
+        self._store.add_result(self.id, package_name, result)
+
+    def _set_status(self, status: str, error: Optional[str] = None) -> None:
+        self._store.set_status(self.id, status, error)
+
+    def _summary(self) -> Dict[str, Any]:
+        row = self._store.load(self.id)
+        if row is None:
+            return {"job_id": self.id, "status": JOB_FAILED, "total": len(self.package_names), "completed": 0,
+                    "error": "Job expired."}
+        body: Dict[str, Any] = {
+            "job_id": self.id,
+            "status": row["status"],
+            "total": len(self.package_names),
+            "completed": row["completed"],
+        }
+        if row["error"]:
+            body["error"] = row["error"]
+        return body
+
+    @property
+    def status(self) -> str:
+        return self._summary()["status"]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in _FINISHED
+
+    def to_dict(self, include_results: bool) -> Dict[str, Any]:
+        body = self._summary()
+        if include_results:
+            # 요청 순서대로, 완료된 항목만 포함
+            results = {package_name: result for _, package_name, result in self._store.results(self.id)}
+            body["results"] = [
+                results[package_name]
+                for package_name in self.package_names
+                if package_name in results
+            ]
+        return body
+
+    def iter_results(self, timeout: float, poll_interval: float = 0.5) -> Iterator[Dict[str, Any]]:
+        """결과가 완료되는 순서대로 반환한다. 작업이 끝나거나 timeout이 지나면 종료한다.
+
+        다른 워커 프로세스에서 실행 중인 작업은 poll_interval초마다 저장소를 다시 읽는다.
+        """
+        deadline = time.monotonic() + timeout
+        last_seq = 0
+        while True:
+            # 상태를 먼저 읽어야 "끝났다"고 본 뒤에 기록된 결과를 놓치지 않는다.
+            finished = self.finished
+            pending = self._store.results(self.id, last_seq)
+            for seq, _, result in pending:
+                last_seq = seq
+                yield result
+            if finished:
+                return
+            if pending:
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            with self._store.changed:
+                self._store.changed.wait(min(poll_interval, remaining))
+
+
+class JobManager:
+    """분류 작업을 워커 풀에서 실행하고, 같은 패키지 집합의 작업을 하나로 합친다.
+
+    작업 상태는 JobStore(SQLite 파일)에 저장되므로 같은 파일을 쓰는 어느 워커 프로세스에서든 조회할 수 있다.
+    이 프로세스가 맡은 작업은 stale_after의 1/3 간격으로 heartbeat를 남겨, 대기가 길어져도 failed로 바뀌지 않는다.
+    실행을 기다리는 작업이 max_queued개면 새 작업을 OverloadedError(429)로 거절한다 (0이면 제한 없음).
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[ClassifyJob], None],
+        store_path: str,
+        max_workers: int = 2,
+        ttl: float = 600.0,
+        stale_after: float = 600.0,
+        max_queued: int = 0,
+        retry_after: int = 1,
+    ) -> None:
+        self._runner = runner
+        self._store = JobStore(store_path, ttl, stale_after)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="classify-job")
+        self.max_queued = max_queued
+        self.retry_after = max(1, retry_after)
+        # 같은 프로세스 안에서 제출이 겹칠 때 중복 작업이 생기지 않도록 한다
+        # (프로세스 사이에서 동시에 겹친 제출은 드물고, 생겨도 작업이 하나 더 실행될 뿐이다).
+        self._lock = threading.Lock()
+        self._owned: Set[str] = set()  # 이 프로세스가 맡아 아직 끝나지 않은 작업 (대기 + 실행 중)
+        self.queued = 0
+        self.rejected = 0
+        self._stop = threading.Event()
+        self._heartbeat_interval = max(0.05, stale_after / 3)
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="classify-job-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def submit(self, package_names: List[str]) -> Tuple[ClassifyJob, bool]:
+        """작업을 제출한다.
+
+        진행 중이거나 에러 없이 끝난 같은 패키지 집합의 작업이 있으면 재사용한다.
+        실패했거나 에러 결과가 섞인 작업은 재사용하지 않는다.
+
+        Returns:
+            (job, created). 같은 패키지 집합의 작업을 재사용했다면 created는 False.
+
+        Raises:
+            OverloadedError: 새 작업이 필요한데 실행을 기다리는 작업이 이미 max_queued개일 때
+        """
+        key = package_set_key(package_names)
+        with self._lock:
+            self._store.purge_expired()
+            existing_id = self._store.find_reusable(key)
+            if existing_id is not None:
+                existing = self.get(existing_id)
+                if existing is not None:
+                    return existing, False
+
+            if self.max_queued > 0 and self.queued >= self.max_queued:
+                self.rejected += 1
+                ADMISSION_REJECTED_TOTAL.inc(pool="classify_jobs", reason="queue_full")
+                raise OverloadedError("classify_jobs", 429, self.retry_after)
+
+            job = ClassifyJob(self._store, uuid.uuid4().hex, key, list(dict.fromkeys(package_names)))
+            self._store.create(job.id, key, job.package_names)
+            self._owned.add(job.id)
+            self.queued += 1
+
+        self._executor.submit(self._run, job)
+        logger.info("Classify job %s queued (%d packages).", job.id, len(job.package_names))
+        return job, True
+
+    def get(self, job_id: str) -> Optional[ClassifyJob]:
+        row = self._store.load(job_id)
+        if row is None:
+            return None
+        return ClassifyJob(self._store, job_id, row["key"], row["package_names"])
+
+    def _run(self, job: ClassifyJob) -> None:
+        with self._lock:
+            self.queued -= 1
+        try:
+            if job.finished:
+                # 대기 중에 failed로 바뀌었거나 만료된 작업은 실행하지 않는다.
+                logger.warning("Classify job %s finished before it started; skipping.", job.id)
+                return
+            job._set_status(JOB_RUNNING)
+            try:
+                self._runner(job)
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.exception("Classify job %s failed", job.id)
+                job._set_status(JOB_FAILED, str(exc))
+                return
+            job._set_status(JOB_DONE)
+            logger.info("Classify job %s finished (%d packages).", job.id, len(job.package_names))
+        finally:
+            with self._lock:
+                self._owned.discard(job.id)
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(self._heartbeat_interval):
+            with self._lock:
+                owned = list(self._owned)
+            try:
+                self._store.touch(owned)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Classify job heartbeat failed")
+
+    def close(self) -> None:
+        """heartbeat를 멈추고 실행 중인 작업이 끝날 때까지 기다린다."""
+        self._stop.set()
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_queued": self.max_queued,
+                "queued": self.queued,
+                "owned": len(self._owned),
+                "rejected": self.rejected,
+            }
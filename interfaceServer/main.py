@@ -7,18 +7,43 @@
 # !pip install langchain-core
 from __future__ import annotations
 
+import atexit
+import hashlib
+import hmac
 import logging
 import os
 import json
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from flask import Flask, jsonify, request
+_IMPORT_STARTED_AT = time.perf_counter()
+
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
-import firebase_admin
-from firebase_admin import credentials, firestore
 
-from scraper import get_appnames_by_packageNames
+from admission import AdmissionPool, OverloadedError
+from cache import TTLCache
+from categories import category_ko_for
+import encoding
+from jobs import ClassifyJob, JobManager
+import metrics
+import profiling
+from refresher import RecordRefresher
+from resilience import CircuitOpenError
+from singleflight import SingleFlight
+from snapshot import SnapshotHolder
+from write_behind import WriteBehindBuffer
+
+if TYPE_CHECKING:
+    from firebase_admin import firestore
+
+# Firebase(google-cloud-firestore, grpc)와 google_play_scraper는 import 비용이 커서 처음 쓸 때 불러온다.
+# 콜드 스타트 때 /health가 이 비용을 기다리지 않는다.
+STARTUP_TIMINGS: Dict[str, float] = {"imports": round(time.perf_counter() - _IMPORT_STARTED_AT, 4)}
 
 # 전역 로거 설정: 서버 전반의 진단 로그를 출력한다.
 logger = logging.getLogger(__name__)
@@ -29,6 +54,144 @@ FIRESTORE_COLLECTION = os.getenv("FIRESTORE_APPS_COLLECTION", "apps")
 FIREBASE_SERVICE_ACCOUNT = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 FIREBASE_PROJECT_ID = os.getenv("FIREBASE_PROJECT_ID")
 
+# Firestore 배치 조회 설정: 큰 입력은 청크로 나눠 제한된 병렬도로 조회한다.
+FIRESTORE_READ_CHUNK_SIZE = max(1, int(os.getenv("FIRESTORE_READ_CHUNK_SIZE", "100")))
+FIRESTORE_READ_PARALLELISM = max(1, int(os.getenv("FIRESTORE_READ_PARALLELISM", "4")))
+
+# /classify 한 요청에서 받는 최대 앱 수 (0이면 제한 없음)
+CLASSIFY_MAX_APPS = int(os.getenv("CLASSIFY_MAX_APPS", "0"))
+
+# AppRecord 인메모리 캐시 설정 (APP_CACHE_MAX_SIZE=0 이면 비활성화)
+APP_CACHE_MAX_SIZE = int(os.getenv("APP_CACHE_MAX_SIZE", "20000"))
+APP_CACHE_TTL_SECONDS = float(os.getenv("APP_CACHE_TTL_SECONDS", "600"))
+APP_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("APP_CACHE_NEGATIVE_TTL_SECONDS", "30"))
+
+# /classify 응답 캐시 설정: 같은 패키지 목록의 직렬화된 응답을 짧게 재사용한다 (RESPONSE_CACHE_MAX_SIZE=0 이면 비활성화)
+RESPONSE_CACHE_MAX_SIZE = int(os.getenv("RESPONSE_CACHE_MAX_SIZE", "500"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60"))
+RESPONSE_CACHE_MAX_BODY_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BODY_BYTES", str(512 * 1024)))
+
+# 로컬 apps 스냅샷 설정 (APP_SNAPSHOT_PATH가 없으면 사용하지 않음)
+APP_SNAPSHOT_PATH = os.getenv("APP_SNAPSHOT_PATH")
+APP_SNAPSHOT_CHECK_SECONDS = float(os.getenv("APP_SNAPSHOT_CHECK_SECONDS", "30"))
+
+# 로컬 카테고리 분류 모델 (스크래핑 실패 시 대체, CLASSIFIER_MODEL_PATH가 없으면 사용하지 않음)
+CLASSIFIER_MODEL_PATH = os.getenv("CLASSIFIER_MODEL_PATH")
+CLASSIFIER_MIN_SCORE = float(os.getenv("CLASSIFIER_MIN_SCORE", "0.35"))
+
+# 오래된 레코드 백그라운드 갱신 (stale-while-revalidate)
+# fetched_at이 RECORD_MAX_AGE_SECONDS보다 오래되었거나 없는 레코드는 그대로 응답하고 백그라운드에서 다시 스크래핑한다
+# (fetched_at이 없는 기존 카탈로그 레코드는 낮은 우선순위).
+RECORD_MAX_AGE_SECONDS = float(os.getenv("RECORD_MAX_AGE_SECONDS", str(30 * 24 * 3600)))  # 0이면 비활성화
+REFRESH_RATE_PER_SEC = float(os.getenv("REFRESH_RATE_PER_SEC", "0.5"))  # 워커당 스크래핑 예산
+REFRESH_BATCH_SIZE = max(1, int(os.getenv("REFRESH_BATCH_SIZE", "20")))
+REFRESH_INTERVAL_SECONDS = float(os.getenv("REFRESH_INTERVAL_SECONDS", "5"))
+REFRESH_CONCURRENCY = max(1, int(os.getenv("REFRESH_CONCURRENCY", "2")))
+REFRESH_RETRY_SECONDS = float(os.getenv("REFRESH_RETRY_SECONDS", "3600"))
+REFRESH_MAX_PENDING = int(os.getenv("REFRESH_MAX_PENDING", "10000"))
+
+# 인기 앱 캐시 예열: installs_numeric 상위 N개를 주기적으로 이 워커의 AppRecord 캐시에 넣는다 (0이면 비활성화)
+CACHE_WARM_TOP_N = int(os.getenv("CACHE_WARM_TOP_N", "0"))
+CACHE_WARM_INTERVAL_SECONDS = float(os.getenv("CACHE_WARM_INTERVAL_SECONDS", str(max(60.0, APP_CACHE_TTL_SECONDS * 0.8))))
+
+# 워커 시작 직후 백그라운드에서 Firestore 클라이언트/스크래퍼/스냅샷/모델을 미리 준비할지 여부
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "false").lower() == "true"
+
+# 로컬 SQLite 파일(분류 작업 저장소, 스크래핑 캐시)의 기본 위치. 각 파일 경로 변수로 따로 지정할 수도 있다.
+DATA_DIR = os.getenv("DATA_DIR", "data")
+
+# 비동기 분류 작업(/classify/jobs) 설정
+CLASSIFY_JOB_WORKERS = int(os.getenv("CLASSIFY_JOB_WORKERS", "2"))
+CLASSIFY_JOB_CHUNK_SIZE = max(1, int(os.getenv("CLASSIFY_JOB_CHUNK_SIZE", "50")))
+CLASSIFY_JOB_TTL_SECONDS = float(os.getenv("CLASSIFY_JOB_TTL_SECONDS", "600"))
+CLASSIFY_JOB_STREAM_TIMEOUT_SECONDS = float(os.getenv("CLASSIFY_JOB_STREAM_TIMEOUT_SECONDS", "300"))
+# 작업 상태/결과를 워커 프로세스끼리 공유하는 SQLite 파일 (모든 워커가 같은 경로를 봐야 한다).
+# 파일은 첫 작업을 제출하거나 조회할 때 만든다.
+CLASSIFY_JOB_DB_PATH = os.getenv("CLASSIFY_JOB_DB_PATH", os.path.join(DATA_DIR, "classify_jobs.sqlite3"))
+# 대기/실행 중인 작업의 heartbeat가 이 시간(초) 넘게 없으면 맡은 워커가 사라진 것으로 보고 failed 처리한다.
+CLASSIFY_JOB_STALE_SECONDS = float(os.getenv("CLASSIFY_JOB_STALE_SECONDS", "600"))
+# 워커당 실행을 기다릴 수 있는 최대 작업 수. 넘으면 새 작업을 429로 거절한다 (0이면 제한 없음).
+CLASSIFY_JOB_MAX_QUEUED = int(os.getenv("CLASSIFY_JOB_MAX_QUEUED", "16"))
+
+# /classify 스트리밍(NDJSON) 응답에서 패키지별 스크래핑을 동시에 진행할 최대 수 (워커 프로세스 전체 공유)
+CLASSIFY_STREAM_CONCURRENCY = max(1, int(os.getenv("CLASSIFY_STREAM_CONCURRENCY", "8")))
+
+# 같은 패키지 스크래핑 합치기(single-flight) 설정
+# SCRAPE_LOCK_DIR를 지정하면 같은 호스트의 워커 프로세스끼리도 파일 잠금으로 스크래핑을 나눈다.
+SCRAPE_FLIGHT_WAIT_SECONDS = float(os.getenv("SCRAPE_FLIGHT_WAIT_SECONDS", "90"))
+SCRAPE_LOCK_DIR = os.getenv("SCRAPE_LOCK_DIR")
+
+# /classify 승인 제어 (워커 프로세스 단위, CONCURRENCY=0 이면 비활성화)
+# Firestore 조회만으로 끝나는 단계와 스크래핑 단계가 따로 자리를 다툰다. 스크래핑 동시 실행 수 + 대기열은
+# gunicorn 스레드 수보다 작게 두어 캐시로 끝나는 요청이 쓸 스레드를 남긴다.
+# WSGI 모드에서 워커가 동시에 처리하는 요청은 gunicorn 스레드 수(GUNICORN_THREADS, Dockerfile의 --threads)를
+# 넘지 않으므로, 조회 단계 기본값도 스레드 수에서 정한다 (한 스레드는 /classify 밖의 요청용으로 남긴다).
+# ASGI 모드의 /classify는 asgi.py의 ASGI_LOOKUP_* 풀을 쓴다.
+GUNICORN_THREADS = max(1, int(os.getenv("GUNICORN_THREADS", "4")))
+ADMISSION_LOOKUP_CONCURRENCY = int(os.getenv("ADMISSION_LOOKUP_CONCURRENCY", str(max(1, GUNICORN_THREADS - 1))))
+ADMISSION_LOOKUP_QUEUE = int(
+    os.getenv("ADMISSION_LOOKUP_QUEUE", str(max(0, GUNICORN_THREADS - ADMISSION_LOOKUP_CONCURRENCY)))
+)
+ADMISSION_SCRAPE_CONCURRENCY = int(os.getenv("ADMISSION_SCRAPE_CONCURRENCY", "2"))
+ADMISSION_SCRAPE_QUEUE = int(os.getenv("ADMISSION_SCRAPE_QUEUE", "1"))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "2"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "2"))
+# 요청 마감 시간: 이때까지 끝나지 않은 스크래핑은 source "pending"으로 응답한다 (0이면 비활성화)
+CLASSIFY_DEADLINE_SECONDS = float(os.getenv("CLASSIFY_DEADLINE_SECONDS", "20"))
+
+# 스크래핑 결과 Firestore 쓰기 지연(write-behind) 설정 (WRITE_BEHIND_ENABLED=false 이면 즉시 저장)
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "true").lower() == "true"
+WRITE_BEHIND_MAX_BATCH = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "500"))
+WRITE_BEHIND_FLUSH_SECONDS = float(os.getenv("WRITE_BEHIND_FLUSH_SECONDS", "1.0"))
+
+# /metrics 로 노출하는 메트릭 (워커 프로세스 단위)
+CLASSIFY_STAGE_SECONDS = metrics.histogram(
+    "classify_stage_seconds",
+    "Latency of each /classify pipeline stage.",
+    ["stage"],
+)
+CLASSIFY_REQUEST_SECONDS = metrics.histogram(
+    "classify_request_seconds",
+    "End-to-end /classify request latency.",
+)
+CLASSIFY_BATCH_SIZE = metrics.histogram(
+    "classify_batch_size",
+    "Number of apps per /classify request.",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+)
+CLASSIFY_RESULTS_TOTAL = metrics.counter(
+    "classify_results_total",
+    "Classification results by source.",
+    ["source"],
+)
+CLASSIFY_STREAM_FIRST_RESULT_SECONDS = metrics.histogram(
+    "classify_stream_first_result_seconds",
+    "Time until the first result line of a streaming /classify response.",
+)
+CLASSIFY_RESPONSE_CACHE_TOTAL = metrics.counter(
+    "classify_response_cache_total",
+    "/classify response cache outcomes.",
+    ["outcome"],
+)
+CLASSIFY_RESPONSE_BYTES = metrics.histogram(
+    "classify_response_bytes",
+    "Size of /classify response bodies as sent.",
+    ["media_type", "coding"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+CLASSIFY_IN_FLIGHT = metrics.gauge(
+    "classify_in_flight",
+    "Number of /classify requests currently being processed.",
+)
+
+
+@contextmanager
+def classify_stage(stage: str) -> Iterator[None]:
+    """단계 지연 시간을 classify_stage_seconds에 남기고, 요청을 추적 중이면 같은 이름의 구간도 기록한다."""
+    with CLASSIFY_STAGE_SECONDS.time(stage=stage), profiling.span(stage):
+        yield
+
+
 @dataclass
 class AppRecord:
     """Represents a row from the Firestore `apps` collection."""
@@ -38,11 +201,33 @@ class AppRecord:
     description: str
     category: Optional[str] = None
     category_ko:Optional[str]=None
+    fetched_at: Optional[float] = None  # Play Store에서 가져온 시각 (epoch 초). 없으면 오래된 것으로 본다.
 
 
 
-def init_firestore_client() -> firestore.Client:
-    """Initialize Firebase Admin SDK from JSON and return a Firestore client."""
+@dataclass
+class CachedResponse:
+    """직렬화된 /classify 응답. signature는 응답 내용을 결정하는 요청 형태 (검증 에러 수, 패키지 순서).
+
+    compressed에는 content-coding별 압축 본문을 처음 요청될 때 채워 둔다.
+    """
+
+    signature: Tuple[Any, ...]
+    body: bytes
+    etag: str
+    media_type: str = encoding.JSON_MEDIA_TYPE
+    compressed: Dict[str, bytes] = field(default_factory=dict)
+
+
+def _record_startup_phase(phase: str, started_at: float) -> None:
+    STARTUP_TIMINGS[phase] = round(time.perf_counter() - started_at, 4)
+
+
+def init_firebase_app() -> None:
+    """Initialize Firebase Admin SDK from JSON (once per process)."""
+    import firebase_admin
+    from firebase_admin import credentials
+
     if not firebase_admin._apps:  # type: ignore[attr-defined]
         cred_obj = None
         if FIREBASE_SERVICE_ACCOUNT:
@@ -57,42 +242,176 @@ def init_firestore_client() -> firestore.Client:
             cred_obj = credentials.ApplicationDefault()
         firebase_admin.initialize_app(cred_obj, {"projectId": FIREBASE_PROJECT_ID} if FIREBASE_PROJECT_ID else None)
         logger.info("Firebase app initialized.")
+
+
+def init_firestore_client() -> firestore.Client:
+    """Initialize Firebase Admin SDK and return a Firestore client."""
+    from firebase_admin import firestore
+
+    init_firebase_app()
     return firestore.client()
 
 
-def get_app_records_batch(db: firestore.Client, package_names: List[str]) -> Dict[str, AppRecord]:
+_firestore_client: Optional[firestore.Client] = None
+_lazy_init_lock = threading.Lock()
+
+
+def get_firestore_client() -> firestore.Client:
+    """Firestore 클라이언트를 처음 쓸 때 만든다 (워커 프로세스당 하나)."""
+    global _firestore_client
+    if _firestore_client is None:
+        with _lazy_init_lock:
+            if _firestore_client is None:
+                started_at = time.perf_counter()
+                _firestore_client = init_firestore_client()
+                _record_startup_phase("firestore_init", started_at)
+    return _firestore_client
+
+
+_scraper_module: Any = None
+
+
+def get_scraper() -> Any:
+    """scraper 모듈(google_play_scraper 포함)을 처음 쓸 때 불러온다.
+
+    sys.modules에는 import가 끝나기 전에 모듈이 올라가므로, import가 끝난 뒤에만 채우는 전역으로 판단한다.
+    """
+    global _scraper_module
+    if _scraper_module is None:
+        with _lazy_init_lock:
+            if _scraper_module is None:
+                started_at = time.perf_counter()
+                import scraper  # pylint: disable=import-outside-toplevel
+
+                _record_startup_phase("scraper_import", started_at)
+                _scraper_module = scraper
+    return _scraper_module
+
+
+def _loaded_scraper() -> Any:
+    """이미 불러온 scraper 모듈 (통계용, 불러오지 않았으면 None)."""
+    return _scraper_module
+
+
+def _scraper_circuit_sample(read: Callable[[Any], float]) -> Dict[Tuple[str, ...], float]:
+    scraper = _loaded_scraper()
+    return {(): read(scraper.circuit_breaker)} if scraper is not None else {}
+
+
+def _epoch_seconds(value: Any) -> Optional[float]:
+    """fetched_at 값(숫자 또는 Firestore 타임스탬프/datetime)을 epoch 초로 바꾼다."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    timestamp = getattr(value, "timestamp", None)
+    return float(timestamp()) if callable(timestamp) else None
+
+
+def record_from_row(row_id: str, row: Dict[str, Any]) -> AppRecord:
+    """Firestore 문서(또는 스냅샷 행)를 AppRecord로 변환한다."""
+    return AppRecord(
+        id=row.get("id", row_id),
+        app_name=row.get("app_name") or row_id,
+        description=row.get("description") or "",
+        category=row.get("category"),
+        # category_ko가 비어 있는 오래된 레코드는 매핑 표로 채워서 응답한다.
+        category_ko=row.get("category_ko") or category_ko_for(row.get("category")),
+        fetched_at=_epoch_seconds(row.get("fetched_at")),
+    )
+
+
+def is_stale_record(record: AppRecord) -> bool:
+    """백그라운드 갱신 대상인지 (fetched_at이 RECORD_MAX_AGE_SECONDS보다 오래되었거나 없음).
+
+    fetched_at이 없는 레코드(CSV로 올린 기존 카탈로그)도 오래된 것으로 본다.
+    카탈로그 전체가 한꺼번에 다시 스크래핑되지 않도록 갱신기에는 낮은 우선순위로 올린다.
+    """
+    if RECORD_MAX_AGE_SECONDS <= 0:
+        return False
+    return record.fetched_at is None or time.time() - record.fetched_at > RECORD_MAX_AGE_SECONDS
+
+
+# AppRecord가 쓰는 필드만 읽는다 (field mask). 문서 ID는 스냅샷에 항상 포함된다.
+APP_RECORD_FIELDS = ["id", "app_name", "description", "category", "category_ko", "fetched_at"]
+
+# /classify의 'fields'로 고를 수 있는 결과 필드. 나머지 키(package_name, source, error, score)는 항상 포함된다.
+RESULT_FIELDS = ("app_name", "description", "category", "category_ko")
+
+
+def firestore_field_paths(fields: Optional[Tuple[str, ...]]) -> List[str]:
+    """결과에 필요한 Firestore 필드만 고른다. category(스크래핑 여부)와 fetched_at(갱신 여부)은 항상 읽는다."""
+    if fields is None:
+        return APP_RECORD_FIELDS
+    return ["category", "fetched_at"] + [name for name in fields if name != "category"]
+
+firestore_read_executor = ThreadPoolExecutor(max_workers=FIRESTORE_READ_PARALLELISM, thread_name_prefix="firestore-read")
+
+
+def chunked(items: List[str], size: int) -> List[List[str]]:
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def _get_app_records_chunk(
+    db: firestore.Client,
+    package_names: List[str],
+    field_paths: List[str],
+) -> Dict[str, AppRecord]:
+    doc_refs = [db.collection(FIRESTORE_COLLECTION).document(pkg) for pkg in package_names]
+    records_map: Dict[str, AppRecord] = {}
+
+    with profiling.span("firestore.get_all", docs=len(doc_refs)):
+        for snap in db.get_all(doc_refs, field_paths=field_paths):
+            if not snap.exists:
+                continue
+            record = record_from_row(snap.id, snap.to_dict() or {})
+            records_map[record.id] = record
+
+    return records_map
+
+
+def get_app_records_batch(
+    db: firestore.Client,
+    package_names: List[str],
+    fields: Optional[Tuple[str, ...]] = None,
+) -> Dict[str, AppRecord]:
     """Firestore에서 여러 패키지명을 한 번에 조회한다.
+
+    중복을 제거한 뒤 FIRESTORE_READ_CHUNK_SIZE개씩 나눠, 최대 FIRESTORE_READ_PARALLELISM개 청크를 동시에 조회한다.
     
     Args:
         db: Firestore 클라이언트
         package_names: 조회할 패키지명 리스트
+        fields: 결과에 필요한 필드 (None이면 전체). 지정하면 그 필드와 category만 읽는다.
     
     Returns:
         패키지명을 키로 하는 AppRecord 딕셔너리 (조회된 것만 포함)
     """
-    if not package_names:
+    unique_names = list(dict.fromkeys(package_names))
+    if not unique_names:
         return {}
 
     try:
-        doc_refs = [db.collection(FIRESTORE_COLLECTION).document(pkg) for pkg in package_names]
-        snapshots = db.get_all(doc_refs)
+        chunks = chunked(unique_names, FIRESTORE_READ_CHUNK_SIZE)
+        field_paths = firestore_field_paths(fields)
         records_map: Dict[str, AppRecord] = {}
 
-        for snap in snapshots:
-            if not snap.exists:
-                continue
-            row = snap.to_dict() or {}
-            row_id = snap.id
-            record = AppRecord(
-                id=row.get("id", row_id),
-                app_name=row.get("app_name") or row_id,
-                description=row.get("description") or "",
-                category=row.get("category"),
-                category_ko=row.get("category_ko"),
-            )
-            records_map[record.id] = record
+        if len(chunks) == 1:
+            records_map.update(_get_app_records_chunk(db, chunks[0], field_paths))
+        else:
+            futures = [
+                firestore_read_executor.submit(profiling.bind(_get_app_records_chunk), db, chunk, field_paths)
+                for chunk in chunks
+            ]
+            for future in futures:
+                records_map.update(future.result())
 
-        logger.info("Fetched %d app records from Firestore (requested %d).", len(records_map), len(package_names))
+        logger.info(
+            "Fetched %d app records from Firestore (requested %d in %d chunk(s)).",
+            len(records_map),
+            len(unique_names),
+            len(chunks),
+        )
         return records_map
 
     except Exception as exc:
@@ -100,21 +419,236 @@ def get_app_records_batch(db: firestore.Client, package_names: List[str]) -> Dic
         raise RuntimeError(f"Failed to fetch app records from Firestore: {exc}") from exc
 
 
-def upsert_app_record(db: firestore.Client, record: AppRecord) -> None:
-    """카테고리 결과를 Firestore에 저장(Upsert)한다."""
-    payload = {
+def _record_payload(record: AppRecord) -> Dict[str, Any]:
+    return {
         "id": record.id,
         "app_name": record.app_name,
         "description": record.description,
         "category": record.category,
         "category_ko": record.category_ko,
+        "fetched_at": record.fetched_at,
     }
 
-    db.collection(FIRESTORE_COLLECTION).document(record.id).set(payload, merge=True)
+
+def upsert_app_record(db: firestore.Client, record: AppRecord) -> None:
+    """카테고리 결과를 Firestore에 저장(Upsert)한다."""
+    payload = _record_payload(record)
+
+    with classify_stage("upsert"):
+        db.collection(FIRESTORE_COLLECTION).document(record.id).set(payload, merge=True)
+    app_record_cache.set(record.id, record)
     logger.info("Record for %s upserted into Firestore.", record.id)
 
 
-firestore_client = init_firestore_client()
+def queue_app_record(record: AppRecord) -> None:
+    """카테고리 결과를 write-behind 버퍼에 넣는다. 응답은 Firestore 쓰기를 기다리지 않는다.
+
+    캐시는 즉시 갱신되므로 같은 워커의 다음 요청은 커밋 전에도 이 레코드를 사용한다.
+    """
+    if write_buffer is None:
+        upsert_app_record(get_firestore_client(), record)
+        return
+    with classify_stage("upsert"):
+        write_buffer.enqueue(record.id, _record_payload(record))
+    app_record_cache.set(record.id, record)
+
+
+def lookup_local_records(package_names: List[str]) -> Tuple[Dict[str, AppRecord], List[str]]:
+    """로컬 스냅샷과 인메모리 캐시에서 AppRecord를 찾는다.
+
+    스냅샷에 없거나 카테고리가 비어 있는 패키지는 캐시를 확인하고, Firestore에 없다고
+    캐시된("known missing") 패키지는 다시 조회하지 않는다.
+
+    Returns:
+        (records_map, misses). misses는 Firestore에서 조회해야 하는 패키지명 목록.
+    """
+    records_map: Dict[str, AppRecord] = {}
+    stale_snapshot_records: Dict[str, AppRecord] = {}
+    remaining = list(dict.fromkeys(package_names))
+
+    snapshot_holder.maybe_reload()
+    snapshot = snapshot_holder.current
+    if snapshot is not None:
+        for package_name, row in snapshot.get_many(remaining).items():
+            if row.get("category"):
+                record = record_from_row(package_name, row)
+                # 오래된 스냅샷 행은 백그라운드 갱신 결과가 캐시에 있으면 그것을 쓴다.
+                if is_stale_record(record):
+                    stale_snapshot_records[package_name] = record
+                else:
+                    records_map[package_name] = record
+        remaining = [package_name for package_name in remaining if package_name not in records_map]
+
+    cached, _, misses = app_record_cache.lookup(remaining)
+    records_map.update(cached)
+    if stale_snapshot_records:
+        for package_name, record in stale_snapshot_records.items():
+            records_map.setdefault(package_name, record)
+        misses = [package_name for package_name in misses if package_name not in stale_snapshot_records]
+    return records_map, misses
+
+
+def remember_fetched_records(requested: List[str], fetched: Dict[str, AppRecord]) -> None:
+    """Firestore 조회 결과를 캐시에 넣는다. 없는 패키지는 짧은 시간 동안 "없음"으로 기억한다."""
+    for package_name in requested:
+        record = fetched.get(package_name)
+        if record is None:
+            app_record_cache.set_missing(package_name)
+        else:
+            app_record_cache.set(package_name, record)
+
+
+def remember_lookup(requested: List[str], fetched: Dict[str, AppRecord], fields: Optional[Tuple[str, ...]]) -> None:
+    """Firestore 조회 결과를 캐시에 반영한다. 일부 필드만 읽은 레코드는 캐시하지 않고 "없음"만 기억한다."""
+    if fields is None:
+        remember_fetched_records(requested, fetched)
+    else:
+        remember_fetched_records([package_name for package_name in requested if package_name not in fetched], {})
+
+
+def lookup_app_records(
+    db: firestore.Client,
+    package_names: List[str],
+    fields: Optional[Tuple[str, ...]] = None,
+) -> Dict[str, AppRecord]:
+    """로컬 스냅샷 -> 인메모리 캐시 -> Firestore 순서로 AppRecord를 조회한다 (미스만 Firestore로 간다)."""
+    records_map, misses = lookup_local_records(package_names)
+    if not misses:
+        return records_map
+
+    with classify_stage("firestore_batch_get"):
+        fetched = get_app_records_batch(db, misses, fields=fields)
+    remember_lookup(misses, fetched, fields)
+    for package_name in misses:
+        if package_name in fetched:
+            records_map[package_name] = fetched[package_name]
+    return records_map
+
+
+response_cache: TTLCache[CachedResponse] = TTLCache(
+    max_size=RESPONSE_CACHE_MAX_SIZE,
+    ttl=RESPONSE_CACHE_TTL_SECONDS,
+    negative_ttl=0,
+)
+
+snapshot_holder = SnapshotHolder(APP_SNAPSHOT_PATH, check_interval=APP_SNAPSHOT_CHECK_SECONDS)
+
+app_record_cache: TTLCache[AppRecord] = TTLCache(
+    max_size=APP_CACHE_MAX_SIZE,
+    ttl=APP_CACHE_TTL_SECONDS,
+    negative_ttl=APP_CACHE_NEGATIVE_TTL_SECONDS,
+)
+
+category_model: Optional[Any] = None
+if CLASSIFIER_MODEL_PATH:
+    # numpy는 모델을 쓸 때만 필요하다.
+    from classifier import ModelHolder
+
+    category_model = ModelHolder(CLASSIFIER_MODEL_PATH, CLASSIFIER_MIN_SCORE)
+
+scrape_flight = SingleFlight(wait_timeout=SCRAPE_FLIGHT_WAIT_SECONDS, lock_dir=SCRAPE_LOCK_DIR)
+
+# 조회 단계가 가득 차면 서버 과부하(503)로 거절한다.
+# 스크래핑 단계가 가득 차면 조회된 결과는 그대로 두고, 스크래핑할 패키지만 pending으로 응답한다.
+lookup_pool = AdmissionPool(
+    "lookup",
+    ADMISSION_LOOKUP_CONCURRENCY,
+    max_queue=ADMISSION_LOOKUP_QUEUE,
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    status=503,
+    retry_after=ADMISSION_RETRY_AFTER_SECONDS,
+)
+scrape_pool = AdmissionPool(
+    "scrape",
+    ADMISSION_SCRAPE_CONCURRENCY,
+    max_queue=ADMISSION_SCRAPE_QUEUE,
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    status=429,
+    retry_after=ADMISSION_RETRY_AFTER_SECONDS,
+)
+# 통계/메트릭에 노출할 승인 풀 목록 (ASGI 모드는 자체 비동기 풀을 여기에 추가한다)
+admission_pools: List[Any] = [lookup_pool, scrape_pool]
+
+# 기존 캐시 통계를 메트릭으로도 노출한다.
+metrics.callback_gauge(
+    "app_record_cache_events_total",
+    "AppRecord in-memory cache events.",
+    lambda: {
+        (event,): app_record_cache.stats()[event]
+        for event in ("hits", "negative_hits", "misses", "evictions", "expirations")
+    },
+    labelnames=["event"],
+    kind="counter",
+)
+metrics.callback_gauge(
+    "app_record_cache_size",
+    "Number of entries in the AppRecord in-memory cache.",
+    lambda: {(): len(app_record_cache)},
+)
+
+metrics.callback_gauge(
+    "scraper_circuit_open",
+    "1 while the Play Store circuit breaker is open or half-open.",
+    lambda: _scraper_circuit_sample(lambda breaker: 0 if breaker.state == "closed" else 1),
+)
+metrics.callback_gauge(
+    "scraper_circuit_rejected_total",
+    "Play Store calls rejected by the open circuit breaker.",
+    lambda: _scraper_circuit_sample(lambda breaker: breaker.rejected),
+    kind="counter",
+)
+
+metrics.callback_gauge(
+    "admission_active",
+    "Requests holding a slot in each admission pool.",
+    lambda: {(pool.name,): pool.active for pool in admission_pools},
+    labelnames=["pool"],
+)
+metrics.callback_gauge(
+    "admission_waiting",
+    "Requests queued for a slot in each admission pool.",
+    lambda: {(pool.name,): pool.waiting for pool in admission_pools},
+    labelnames=["pool"],
+)
+
+metrics.callback_gauge(
+    "startup_phase_seconds",
+    "Seconds spent in each cold-start phase (imports, lazy init, warm-up).",
+    lambda: {(phase,): seconds for phase, seconds in STARTUP_TIMINGS.items()},
+    labelnames=["phase"],
+)
+
+write_buffer: Optional[WriteBehindBuffer] = None
+if WRITE_BEHIND_ENABLED:
+    write_buffer = WriteBehindBuffer(
+        get_firestore_client,
+        FIRESTORE_COLLECTION,
+        max_batch=WRITE_BEHIND_MAX_BATCH,
+        flush_interval=WRITE_BEHIND_FLUSH_SECONDS,
+    )
+    # 워커 종료 시 남은 쓰기를 모두 커밋한다.
+    atexit.register(write_buffer.close)
+
+
+def _scraper_circuit_not_closed() -> bool:
+    scraper = _loaded_scraper()
+    return scraper is not None and scraper.circuit_breaker.state != "closed"
+
+
+record_refresher: Optional[RecordRefresher] = None
+if RECORD_MAX_AGE_SECONDS > 0 and REFRESH_RATE_PER_SEC > 0:
+    record_refresher = RecordRefresher(
+        lambda package_names: refresh_stale_records(package_names),  # 아래에서 정의된다
+        rate=REFRESH_RATE_PER_SEC,
+        batch_size=REFRESH_BATCH_SIZE,
+        interval=REFRESH_INTERVAL_SECONDS,
+        max_pending=REFRESH_MAX_PENDING,
+        retry_seconds=REFRESH_RETRY_SECONDS,
+        # Play Store 장애 중에는 갱신을 미룬다.
+        should_pause=_scraper_circuit_not_closed,
+    )
+    # write-behind보다 먼저 멈추도록 나중에 등록한다 (atexit은 역순 실행).
+    atexit.register(record_refresher.close)
 
 app = Flask(__name__)
 app.config["JSON_AS_ASCII"] = False  # 한글 등 유니코드 문자를 이스케이프하지 않음
@@ -127,185 +661,1084 @@ def health_check() -> Any:
     return jsonify({"status": "ok"}), 200
 
 
-@app.post("/classify")
-def classify() -> Any:
-    payload: Dict[str, Any] = request.get_json(silent=True) or {}
-    apps = payload.get("apps", [])
+def warmup() -> Dict[str, float]:
+    """지연 초기화 대상을 미리 준비하고 단계별 소요 시간을 반환한다.
 
-    if not apps or not isinstance(apps, list):
-        return (
-            jsonify(
-                {"error": "Request must contain 'apps' field with a non-empty array."}
-            ),
-            400,
+    실패해도 예외를 올리지 않는다. 준비하지 못한 대상은 첫 요청에서 다시 초기화한다.
+    """
+    started_at = time.perf_counter()
+    steps: List[Tuple[str, Callable[[], Any]]] = [
+        ("firestore", get_firestore_client),
+        ("scraper", get_scraper),
+        ("snapshot", snapshot_holder.maybe_reload),
+    ]
+    if category_model is not None:
+        steps.append(("classifier", lambda: category_model.model))
+    for name, step in steps:
+        step_started_at = time.perf_counter()
+        try:
+            step()
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Warm-up step '%s' failed: %s", name, exc)
+            continue
+        if name == "classifier":
+            _record_startup_phase("classifier_load", step_started_at)
+    _record_startup_phase("warmup", started_at)
+    logger.info("Warm-up finished: %s", STARTUP_TIMINGS)
+    return dict(STARTUP_TIMINGS)
+
+
+@app.get("/_ah/warmup")
+def warmup_endpoint() -> Any:
+    """워밍업 요청 (Cloud Run/App Engine 등에서 트래픽 전에 호출). 단계별 소요 시간을 반환한다."""
+    return jsonify({"status": "ok", "startup": warmup()}), 200
+
+
+@app.get("/startup")
+def startup_report() -> Any:
+    """이 워커의 콜드 스타트 단계별 소요 시간(초)을 반환한다. 아직 초기화되지 않은 단계는 빠진다."""
+    return jsonify(STARTUP_TIMINGS), 200
+
+
+def warm_app_record_cache(package_names: Optional[List[str]] = None, top: int = 0) -> int:
+    """Firestore 레코드를 이 워커의 AppRecord 캐시에 미리 넣고, 넣은 레코드 수를 반환한다.
+
+    package_names를 주면 그 패키지를, 아니면 installs_numeric 상위 top개를 읽는다 (캐시 크기까지).
+    """
+    db = get_firestore_client()
+    if package_names:
+        records = get_app_records_batch(db, package_names[:app_record_cache.max_size])
+    else:
+        limit = min(top, app_record_cache.max_size)
+        if limit <= 0:
+            return 0
+        query = (
+            db.collection(FIRESTORE_COLLECTION)
+            .order_by("installs_numeric", direction="DESCENDING")
+            .limit(limit)
+            .select(APP_RECORD_FIELDS)
         )
+        records = {snap.id: record_from_row(snap.id, snap.to_dict() or {}) for snap in query.stream()}
 
-    # 유효한 package_name 추출
-    valid_package_names = []
-    results = []
+    warmed = 0
+    for package_name, record in records.items():
+        if record.category:
+            app_record_cache.set(package_name, record)
+            warmed += 1
+    logger.info("Warmed %d app records into the in-memory cache.", warmed)
+    return warmed
 
-    for app_data in apps:
-        package_name = app_data.get("package_name")
 
-        if not package_name:
-            results.append(
-                {
-                    "package_name": "unknown",
-                    "app_name": None,
-                    "description": None,
-                    "category": None,
-                    "category_ko": None,
-                    "source": "error",
-                    "error": "'package_name' field is required.",
-                }
-            )
-            continue
+def _cache_warm_loop() -> None:
+    # 캐시 TTL이 지나기 전에 다시 채워 인기 앱이 항상 캐시 적중이 되게 한다.
+    while True:
+        try:
+            warm_app_record_cache(top=CACHE_WARM_TOP_N)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Periodic cache warm-up failed")
+        time.sleep(CACHE_WARM_INTERVAL_SECONDS)
 
-        valid_package_names.append(package_name)
 
-    if not valid_package_names:
-        return jsonify({"results": results}), 200
+@app.post("/admin/warm")
+def warm_cache() -> Any:
+    """Firestore 레코드를 요청을 받은 워커의 AppRecord 캐시에 미리 넣는다 (X-Debug-Token 필요).
+
+    본문: {"package_names": [...]} 또는 {"top": N} (installs_numeric 상위 N개, 기본값 CACHE_WARM_TOP_N)
+    """
+    payload: Dict[str, Any] = request.get_json(silent=True) or {}
+    package_names = payload.get("package_names")
+    top = payload.get("top", CACHE_WARM_TOP_N)
+    if package_names is not None and (
+        not isinstance(package_names, list) or not all(isinstance(name, str) and name for name in package_names)
+    ):
+        return jsonify({"error": "'package_names' must be a list of package names."}), 400
+    if not package_names and (not isinstance(top, int) or top <= 0):
+        return jsonify({"error": "Request must contain 'package_names' or a positive 'top'."}), 400
+
+    try:
+        warmed = warm_app_record_cache(package_names=package_names, top=top)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.exception("Cache warm-up failed")
+        return jsonify({"error": f"Cache warm-up failed: {exc}"}), 500
+    return jsonify({"warmed": warmed, "app_records": app_record_cache.stats()}), 200
+
+
+@app.get("/cache/stats")
+def cache_stats() -> Any:
+    """AppRecord 인메모리 캐시의 적중/미스/제거 카운터를 반환한다 (워커 프로세스 단위)."""
+    scraper = _loaded_scraper()
+    return jsonify({
+        "app_records": app_record_cache.stats(),
+        "responses": response_cache.stats(),
+        "scrape_flight": scrape_flight.stats(),
+        "write_behind": write_buffer.stats() if write_buffer is not None else None,
+        "snapshot": snapshot_holder.stats(),
+        "scrape_cache": scraper.scrape_cache.stats() if scraper and scraper.scrape_cache is not None else None,
+        "scraper_circuit": scraper.circuit_breaker.stats() if scraper else None,
+        "classifier": category_model.stats() if category_model is not None else None,
+        "refresher": record_refresher.stats() if record_refresher is not None else None,
+        "admission": {pool.name: pool.stats() for pool in admission_pools},
+        "classify_jobs": job_manager.stats(),
+    }), 200
+
+
+@app.get("/metrics")
+def metrics_endpoint() -> Any:
+    """Prometheus 텍스트 형식 메트릭 (워커 프로세스 단위)."""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+
+_ADMIN_PATHS = ("/cache/stats", "/snapshot/reload")
+
+
+@app.before_request
+def _check_debug_token() -> Any:
+    """관리용 경로에 DEBUG_TOKEN과 같은 값의 X-Debug-Token 헤더를 요구한다. DEBUG_TOKEN이 없으면 404로 닫아 둔다.
+
+    /debug/*, /admin/*와 내부 상태를 노출하거나(/cache/stats) 디스크 I/O를 일으키는(/snapshot/reload) 경로가 대상이다.
+    """
+    if not (request.path.startswith(("/debug/", "/admin/")) or request.path in _ADMIN_PATHS):
+        return None
+    if not profiling.DEBUG_TOKEN:
+        return jsonify({"error": "Not found."}), 404
+    if hmac.compare_digest(request.headers.get("X-Debug-Token", ""), profiling.DEBUG_TOKEN):
+        return None
+    return jsonify({"error": "Missing or invalid X-Debug-Token."}), 403
+
+
+@app.get("/debug/traces")
+def list_traces() -> Any:
+    """이 워커가 보관 중인 최근 요청 추적 목록 (최신순)."""
+    return jsonify({"pid": os.getpid(), "config": profiling.traces.stats(), "traces": profiling.traces.recent()}), 200
+
+
+@app.post("/debug/traces")
+def configure_traces() -> Any:
+    """이 워커의 추적 조건을 바꾼다. 본문: {"slow_ms": 2000, "sample_rate": 0.01} (둘 다 선택)"""
+    payload: Dict[str, Any] = request.get_json(silent=True) or {}
+    values = {key: payload.get(key) for key in ("slow_ms", "sample_rate")}
+    if any(value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))) for value in values.values()):
+        return jsonify({"error": "'slow_ms' and 'sample_rate' must be numbers."}), 400
+    profiling.traces.configure(**values)
+    return jsonify({"pid": os.getpid(), "config": profiling.traces.stats()}), 200
+
+
+@app.get("/debug/traces/<trace_id>")
+def get_trace(trace_id: str) -> Any:
+    """추적 하나의 전체 구간 트리."""
+    trace = profiling.traces.get(trace_id)
+    if trace is None:
+        return jsonify({"error": "Trace not found in this worker."}), 404
+    return jsonify(trace.to_dict()), 200
+
+
+@app.post("/debug/profiler/start")
+def start_profiler() -> Any:
+    """이 워커의 샘플링 프로파일러를 켠다. 본문: {"interval_ms": 10, "duration_seconds": 60, "include_idle": false}"""
+    payload: Dict[str, Any] = request.get_json(silent=True) or {}
+    try:
+        interval = float(payload.get("interval_ms", 10)) / 1000
+        duration = float(payload.get("duration_seconds", 60))
+    except (TypeError, ValueError):
+        return jsonify({"error": "'interval_ms' and 'duration_seconds' must be numbers."}), 400
+    if not profiling.profiler.start(interval, duration, bool(payload.get("include_idle", False))):
+        return jsonify({"error": "Profiler is already running in this worker.", "pid": os.getpid()}), 409
+    return jsonify({"pid": os.getpid(), "running": True}), 200
+
+
+@app.post("/debug/profiler/stop")
+def stop_profiler() -> Any:
+    """프로파일러를 멈추고 결과를 반환한다."""
+    profiling.profiler.stop()
+    return profiler_report()
+
+
+@app.get("/debug/profiler")
+def profiler_report() -> Any:
+    """현재(또는 마지막) 프로파일 결과. ?format=collapsed면 flamegraph용 텍스트, ?top=N으로 항목 수 지정."""
+    if request.args.get("format") == "collapsed":
+        return Response(profiling.profiler.collapsed(), content_type="text/plain; charset=utf-8")
+    top = request.args.get("top", "30")
+    return jsonify(profiling.profiler.report(top=int(top) if top.isdigit() else 30)), 200
+
+
+@app.post("/snapshot/reload")
+def reload_snapshot() -> Any:
+    """로컬 apps 스냅샷 파일을 다시 열어 원자적으로 교체한다 (요청을 받은 워커 기준).
+
+    다른 워커는 APP_SNAPSHOT_CHECK_SECONDS마다 파일 교체를 감지해 스스로 다시 연다.
+    """
+    if not snapshot_holder.path:
+        return jsonify({"error": "APP_SNAPSHOT_PATH is not configured."}), 400
+    if not snapshot_holder.reload():
+        return jsonify({"error": f"Failed to load snapshot '{snapshot_holder.path}'."}), 500
+    return jsonify(snapshot_holder.stats()), 200
+
+
+_DEADLINE_PENDING_ERROR = "Lookup did not finish before the request deadline. Retry later."
+
+
+def _error_result(
+    package_name: str,
+    error: str,
+    app_name: Optional[str] = None,
+    description: Optional[str] = None,
+) -> Dict[str, Any]:
+    """에러 응답 항목을 만든다."""
+    return {
+        "package_name": package_name,
+        "app_name": app_name,
+        "description": description,
+        "category": None,
+        "category_ko": None,
+        "source": "error",
+        "error": error,
+    }
+
+
+def _pending_result(package_name: str, error: str) -> Dict[str, Any]:
+    """요청 마감 시각이나 부하 차단으로 아직 분류하지 못한 항목 (나중에 다시 요청하면 된다)."""
+    result = _error_result(package_name, error)
+    result["source"] = "pending"
+    return result
+
+
+def request_deadline() -> Optional[float]:
+    """지금 시작하는 요청의 마감 시각 (time.monotonic() 기준). CLASSIFY_DEADLINE_SECONDS가 0이면 None."""
+    return time.monotonic() + CLASSIFY_DEADLINE_SECONDS if CLASSIFY_DEADLINE_SECONDS > 0 else None
+
+
+def _admitted(pool: AdmissionPool, deadline: Optional[float], admit: bool) -> Any:
+    return pool.admit(deadline) if admit else nullcontext()
+
+
+def has_pending_results(results: List[Dict[str, Any]]) -> bool:
+    return any(result["source"] == "pending" for result in results)
+
+
+def count_sources(results: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[result["source"]] = counts.get(result["source"], 0) + 1
+    return counts
+
+
+def scrape_missing_admitted(
+    package_names_to_scrape: List[str],
+    set_result: Callable[[str, Dict[str, Any]], None],
+    deadline: Optional[float] = None,
+    admit: bool = False,
+) -> None:
+    """admit이면 스크래핑 풀의 자리를 얻은 뒤 _scrape_missing을 실행한다.
+
+    자리가 없으면 요청 전체를 거절하지 않고, 스크래핑하지 못한 패키지만 source "pending"으로 채운다
+    (Firestore에서 찾은 결과는 그대로 응답된다).
+    """
+    if admit:
+        try:
+            scrape_pool.acquire(deadline)
+        except OverloadedError as exc:
+            profiling.annotate(rejected=exc.pool)
+            for package_name in package_names_to_scrape:
+                set_result(package_name, _pending_result(package_name, str(exc)))
+            return
+    try:
+        _scrape_missing(package_names_to_scrape, set_result, deadline)
+    finally:
+        if admit:
+            scrape_pool.release()
+
+
+def classify_package_names(
+    package_names: List[str],
+    emit: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+    deadline: Optional[float] = None,
+    admit: bool = False,
+) -> Dict[str, Dict[str, Any]]:
+    """패키지명 목록을 분류한다 (Firestore 조회 -> 없으면 Scraper 조회 후 저장).
+
+    Args:
+        package_names: 분류할 패키지명 리스트 (빈 값 없음)
+        emit: 패키지별 결과가 확정될 때마다 호출되는 콜백 (선택)
+        fields: 응답에 필요한 결과 필드 (None이면 전체). Firestore에서 읽는 필드를 줄이는 데만 쓴다.
+        deadline: 요청 마감 시각 (time.monotonic() 기준). 그때까지 스크래핑하지 못한 패키지는 source "pending"
+        admit: True면 조회/스크래핑 단계마다 승인 풀(lookup_pool, scrape_pool)의 자리를 얻는다
+
+    Returns:
+        패키지명을 키로 하는 결과 딕셔너리
+
+    Raises:
+        OverloadedError: admit이고 조회 풀(lookup_pool)에 자리가 없을 때.
+            스크래핑 풀에 자리가 없으면 예외 대신 스크래핑할 패키지만 source "pending"으로 채운다.
+    """
+    temp_results: Dict[str, Dict[str, Any]] = {}  # package_name을 키로 하는 임시 결과 저장
+
+    def set_result(package_name: str, result: Dict[str, Any]) -> None:
+        temp_results[package_name] = result
+        CLASSIFY_RESULTS_TOTAL.inc(source=result["source"])
+        if emit is not None:
+            emit(package_name, result)
 
     # 1단계: Firestore에서 모든 package_name을 한 번에 배치 조회
     try:
-        existing_records_map = get_app_records_batch(firestore_client, valid_package_names)
+        with _admitted(lookup_pool, deadline, admit), classify_stage("lookup"):
+            existing_records_map = lookup_app_records(get_firestore_client(), package_names, fields=fields)
+    except OverloadedError:
+        raise
     except Exception as exc:  # pylint: disable=broad-except
         logger.exception("Error during batch Firestore lookup")
         # 배치 조회 실패 시 모든 항목을 에러로 처리
-        for package_name in valid_package_names:
-            results.append(
-                {
-                    "package_name": package_name,
-                    "app_name": None,
-                    "description": None,
-                    "category": None,
-                    "category_ko": None,
-                    "source": "error",
-                    "error": f"Firestore lookup failed: {str(exc)}",
-                }
-            )
-        return jsonify({"results": results}), 200
+        for package_name in dict.fromkeys(package_names):
+            set_result(package_name, _error_result(package_name, f"Firestore lookup failed: {str(exc)}"))
+        return temp_results
+
+    package_names_to_scrape = _apply_lookup(package_names, existing_records_map, set_result)
+
+    # 2단계: Scraper로 조회 (조회되지 않은 것들만)
+    if package_names_to_scrape:
+        scrape_missing_admitted(package_names_to_scrape, set_result, deadline, admit)
 
-    # 조회된 것과 조회되지 않은 것 분류
+    return temp_results
+
+
+def _firebase_result(package_name: str, record: AppRecord) -> Dict[str, Any]:
+    return {
+        "package_name": package_name,
+        "app_name": record.app_name,
+        "description": record.description,
+        "category": record.category,
+        "category_ko": record.category_ko,
+        "source": "firebase",
+    }
+
+
+def _apply_lookup(
+    package_names: List[str],
+    records_map: Dict[str, AppRecord],
+    set_result: Callable[[str, Dict[str, Any]], None],
+) -> List[str]:
+    """조회된 레코드로 결과를 채우고, 스크래핑이 필요한 패키지명 목록을 반환한다."""
     package_names_to_scrape = []
-    temp_results = {}  # package_name을 키로 하는 임시 결과 저장
 
-    for package_name in valid_package_names:
-        existing = existing_records_map.get(package_name)
+    for package_name in dict.fromkeys(package_names):
+        existing = records_map.get(package_name)
 
         if existing and existing.category:
             logger.info("Category for %s found in Firestore.", package_name)
-            temp_results[package_name] = {
-                "package_name": package_name,
-                "app_name": existing.app_name,
-                "description": existing.description,
-                "category": existing.category,
-                "category_ko": existing.category_ko,
-                "source": "firebase",
-            }
+            set_result(package_name, _firebase_result(package_name, existing))
+            if record_refresher is not None and is_stale_record(existing):
+                record_refresher.note(package_name, low_priority=existing.fetched_at is None)
         else:
             # Firestore에 없거나 카테고리가 없는 경우 scraper 사용
             package_names_to_scrape.append(package_name)
 
-    # 2단계: Scraper로 조회 (조회되지 않은 것들만)
-    if package_names_to_scrape:
-        try:
-            logger.info(
-                "Fetching app info for %d apps from Google Play Store.",
-                len(package_names_to_scrape),
-            )
-            scraper_results = get_appnames_by_packageNames(package_names_to_scrape)
+    return package_names_to_scrape
 
-            # Scraper 결과를 패키지명으로 매핑
-            scraper_map = {result["id"]: result for result in scraper_results}
 
-            for package_name in package_names_to_scrape:
-                scraper_data = scraper_map.get(package_name)
-
-                if not scraper_data:
-                    temp_results[package_name] = {
-                        "package_name": package_name,
-                        "app_name": None,
-                        "description": None,
-                        "category": None,
-                        "category_ko": None,
-                        "source": "error",
-                        "error": f"Could not find app information for package '{package_name}' in Google Play Store.",
-                    }
-                    continue
-
-                scraped_category = scraper_data.get("category")
-                scraped_app_name = scraper_data.get("app_name") or package_name
-                scraped_description = scraper_data.get("description") or ""
-
-                if not scraped_category:
-                    logger.warning(
-                        "Google Play Store data for %s does not contain category information.",
-                        package_name,
-                    )
-                    temp_results[package_name] = {
-                        "package_name": package_name,
-                        "app_name": scraped_app_name,
-                        "description": scraped_description,
-                        "category": None,
-                        "category_ko": None,
-                        "source": "error",
-                        "error": f"Category information not available for package '{package_name}'.",
-                    }
-                    continue
-
-                record = AppRecord(
-                    id=package_name,
-                    app_name=scraped_app_name,
-                    description=scraped_description,
-                    category=scraped_category,
-                    category_ko=None,  # scraper에서 category_ko는 제공하지 않음
-                )
-
-                upsert_app_record(firestore_client, record)
-
-                temp_results[package_name] = {
-                    "package_name": package_name,
-                    "app_name": scraped_app_name,
-                    "description": scraped_description,
-                    "category": scraped_category,
-                    "category_ko": None,
-                    "source": "scraper",
-                }
+def _scrape_missing(
+    package_names_to_scrape: List[str],
+    set_result: Callable[[str, Dict[str, Any]], None],
+    deadline: Optional[float] = None,
+) -> None:
+    """Scraper로 조회해 결과를 채운다.
 
-        except Exception as exc:  # pylint: disable=broad-except
-            logger.exception("Error during scraping")
+    같은 패키지를 동시에 스크래핑하는 다른 요청이 있으면 그 결과를 공유한다.
+    deadline까지 끝나지 않은 패키지는 source "pending"으로 채운다.
+    """
+    scraped_results, scrape_errors = _scrape_shared(package_names_to_scrape, deadline)
+
+    # 다른 요청이 자기 마감 시각에 끊은(pending) 결과를 받았다면, 이 요청의 마감 전에 한 번 더 시도한다.
+    retry = [
+        package_name for package_name, result in scraped_results.items()
+        if result["source"] == "pending" and (deadline is None or time.monotonic() < deadline)
+    ]
+    if retry:
+        retried_results, retried_errors = _scrape_shared(retry, deadline)
+        for package_name in retry:
+            if package_name in retried_results:
+                scraped_results[package_name] = retried_results[package_name]
+            elif package_name in retried_errors:
+                del scraped_results[package_name]
+                scrape_errors[package_name] = retried_errors[package_name]
+
+    if scrape_errors:
+        logger.warning("Scraping failed for %d package(s): %s", len(scrape_errors), next(iter(scrape_errors.values())))
+
+    failed: List[Tuple[str, Dict[str, Any]]] = []
+    for package_name in package_names_to_scrape:
+        if package_name in scraped_results:
+            result = dict(scraped_results[package_name])
+        elif isinstance(scrape_errors.get(package_name), TimeoutError) and deadline is not None and time.monotonic() >= deadline:
+            # 다른 요청이 진행 중인 스크래핑을 마감 시각까지 기다리다 끝났다.
+            result = _pending_result(package_name, _DEADLINE_PENDING_ERROR)
+        elif package_name in scrape_errors:
             # Scraper 실패 시 에러 결과 추가
-            for package_name in package_names_to_scrape:
-                temp_results[package_name] = {
-                    "package_name": package_name,
-                    "app_name": None,
-                    "description": None,
-                    "category": None,
-                    "category_ko": None,
-                    "source": "error",
-                    "error": f"Scraping failed: {str(exc)}",
-                }
-
-    # 원래 순서대로 결과 구성
-    for package_name in valid_package_names:
+            result = _error_result(package_name, f"Scraping failed: {str(scrape_errors[package_name])}")
+        else:
+            continue
+        if result["source"] == "error" and category_model is not None:
+            failed.append((package_name, result))
+        else:
+            set_result(package_name, result)
+
+    # 스크래핑에 실패한 패키지는 로컬 모델로 한 번에 분류해 본다.
+    if failed:
+        for package_name, result in _predict_with_model(failed):
+            set_result(package_name, result)
+
+
+def _scrape_shared(
+    package_names: List[str],
+    deadline: Optional[float],
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, BaseException]]:
+    try:
+        return scrape_flight.do_many(
+            package_names,
+            lambda names: _scrape_and_store(names, deadline),
+            recheck=_recheck_stored_records,
+            deadline=deadline,
+        )
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.exception("Error during scraping")
+        return {}, {package_name: exc for package_name in package_names}
+
+
+def _predict_with_model(failed: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Dict[str, Any]]]:
+    """로컬 분류 모델의 예측(source: "model")으로 에러 결과를 대체한다. 점수가 낮으면 에러를 그대로 둔다."""
+    try:
+        with classify_stage("model"):
+            predictions = category_model.predict(  # type: ignore[union-attr]
+                [(package_name, result.get("app_name"), result.get("description")) for package_name, result in failed]
+            )
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("Local category model prediction failed")
+        return failed
+
+    results = []
+    for (package_name, result), prediction in zip(failed, predictions):
+        if prediction is None:
+            results.append((package_name, result))
+            continue
+        category, category_ko, score = prediction
+        results.append((package_name, {
+            "package_name": package_name,
+            "app_name": result.get("app_name"),
+            "description": result.get("description"),
+            "category": category,
+            "category_ko": category_ko or category_ko_for(category),
+            "source": "model",
+            "score": round(score, 4),
+        }))
+    return results
+
+
+def _scrape_error_message(package_name: str, exc: Optional[Exception]) -> str:
+    """스크래핑 실패 원인을 응답용 메시지로 바꾼다."""
+    from google_play_scraper.exceptions import NotFoundError
+
+    recent_failure_error = get_scraper().RecentFailureError
+    if isinstance(exc, CircuitOpenError):
+        return "Google Play Store is temporarily unavailable (circuit open). Try again later."
+    if isinstance(exc, recent_failure_error) and exc.reason != "not_found":
+        return f"Google Play Store lookup for '{package_name}' failed recently. Retry after {int(exc.retry_at)}."
+    if exc is None or isinstance(exc, (NotFoundError, recent_failure_error)):
+        return f"Could not find app information for package '{package_name}' in Google Play Store."
+    return f"Scraping failed: {str(exc)}"
+
+
+def _scrape_and_store(package_names: List[str], deadline: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+    """Google Play Store에서 앱 정보를 가져오고, 카테고리가 있으면 Firestore에 저장한다.
+
+    Returns:
+        패키지명을 키로 하는 결과 딕셔너리 (실패한 패키지는 에러 결과, 마감 시각까지 끝나지 않은 패키지는 pending)
+    """
+    logger.info(
+        "Fetching app info for %d apps from Google Play Store.",
+        len(package_names),
+    )
+    scraper = get_scraper()
+    scrape_errors: Dict[str, Exception] = {}
+    with classify_stage("scrape"):
+        scraper_results = scraper.get_appnames_by_packageNames(package_names, errors=scrape_errors, deadline=deadline)
+
+    # Scraper 결과를 패키지명으로 매핑
+    scraper_map = {result["id"]: result for result in scraper_results}
+    results: Dict[str, Dict[str, Any]] = {}
+
+    for package_name in package_names:
+        scraper_data = scraper_map.get(package_name)
+
+        if not scraper_data:
+            if isinstance(scrape_errors.get(package_name), scraper.DeadlineExceeded):
+                results[package_name] = _pending_result(package_name, _DEADLINE_PENDING_ERROR)
+            else:
+                results[package_name] = _error_result(package_name, _scrape_error_message(package_name, scrape_errors.get(package_name)))
+            continue
+
+        scraped_category = scraper_data.get("category")
+        scraped_app_name = scraper_data.get("app_name") or package_name
+        scraped_description = scraper_data.get("description") or ""
+
+        if not scraped_category:
+            logger.warning(
+                "Google Play Store data for %s does not contain category information.",
+                package_name,
+            )
+            results[package_name] = _error_result(
+                package_name,
+                f"Category information not available for package '{package_name}'.",
+                app_name=scraped_app_name,
+                description=scraped_description,
+            )
+            continue
+
+        scraped_category_ko = category_ko_for(scraped_category)
+        record = AppRecord(
+            id=package_name,
+            app_name=scraped_app_name,
+            description=scraped_description,
+            category=scraped_category,
+            category_ko=scraped_category_ko,
+            # 갱신에 실패해 오래된 스크래핑 캐시로 응답했다면 그 캐시의 원래 수집 시각을 그대로 저장한다.
+            fetched_at=scraper_data.get("fetched_at") or time.time(),
+        )
+
+        queue_app_record(record)
+
+        results[package_name] = {
+            "package_name": package_name,
+            "app_name": scraped_app_name,
+            "description": scraped_description,
+            "category": scraped_category,
+            "category_ko": scraped_category_ko,
+            "source": "scraper",
+        }
+
+    # 다른 워커 프로세스가 잠금 해제 후 Firestore를 다시 읽으므로, 그 전에 쓰기를 커밋한다.
+    if scrape_flight.lock_dir and write_buffer is not None:
+        write_buffer.flush()
+
+    return results
+
+
+def refresh_stale_records(package_names: List[str]) -> int:
+    """오래된 레코드를 Play Store에서 다시 가져와 write-behind로 저장한다 (백그라운드 갱신기에서 호출).
+
+    다른 워커가 이미 갱신한 레코드는 Firestore에서 다시 읽어 캐시만 바꾼다.
+    조회에 실패하거나 카테고리가 없으면 기존 레코드를 그대로 둔다.
+
+    Returns:
+        갱신된 레코드 수
+    """
+    refreshed = 0
+    to_scrape = []
+    stored = get_app_records_batch(get_firestore_client(), package_names)
+    for package_name in package_names:
+        record = stored.get(package_name)
+        if record is not None and record.category and not is_stale_record(record):
+            app_record_cache.set(package_name, record)
+            refreshed += 1
+        else:
+            to_scrape.append(package_name)
+    if not to_scrape:
+        return refreshed
+
+    # 영구 스크래핑 캐시도 건너뛰고(max_age=0) Play Store에서 다시 가져온다.
+    # 갱신에 실패한 패키지를 오래된 캐시로 채우면 옛 정보가 새 수집 시각으로 저장되므로 allow_stale=False로 건너뛴다.
+    scraped = get_scraper().get_appnames_by_packageNames(
+        to_scrape, concurrency=REFRESH_CONCURRENCY, max_age=0, allow_stale=False
+    )
+    for info in scraped:
+        if not info.get("category"):
+            continue
+        queue_app_record(AppRecord(
+            id=info["id"],
+            app_name=info.get("app_name") or info["id"],
+            description=info.get("description") or "",
+            category=info["category"],
+            category_ko=category_ko_for(info["category"]),
+            fetched_at=info.get("fetched_at") or time.time(),
+        ))
+        refreshed += 1
+    return refreshed
+
+
+def _recheck_stored_records(package_names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """다른 워커가 스크래핑을 끝낸 뒤 Firestore에서 결과를 다시 읽는다 (캐시 우회)."""
+    results: Dict[str, Dict[str, Any]] = {}
+    for package_name, record in get_app_records_batch(get_firestore_client(), package_names).items():
+        if not record.category:
+            continue
+        app_record_cache.set(package_name, record)
+        results[package_name] = _firebase_result(package_name, record)
+    return results
+
+
+def _parse_indexed_apps(
+    payload: Dict[str, Any],
+) -> Tuple[Optional[List[Tuple[int, str]]], List[Tuple[int, Dict[str, Any]]]]:
+    """요청 본문의 'apps' 배열을 원래 위치(index)와 함께 검증한다.
+
+    Returns:
+        ([(index, package_name)], [(index, error_result)]). 'apps' 필드가 잘못되면 첫 값은 None.
+    """
+    apps = payload.get("apps", [])
+    if not apps or not isinstance(apps, list):
+        return None, []
+
+    valid_apps = []
+    error_results = []
+
+    for index, app_data in enumerate(apps):
+        package_name = app_data.get("package_name") if isinstance(app_data, dict) else None
+
+        if not package_name:
+            error_results.append((index, _error_result("unknown", "'package_name' field is required.")))
+            CLASSIFY_RESULTS_TOTAL.inc(source="error")
+            continue
+
+        valid_apps.append((index, package_name))
+
+    return valid_apps, error_results
+
+
+def _parse_apps_payload(payload: Dict[str, Any]) -> Tuple[Optional[List[str]], List[Dict[str, Any]]]:
+    """요청 본문에서 유효한 package_name 목록과 검증 에러 항목을 추출한다.
+
+    Returns:
+        (valid_package_names, error_results). 'apps' 필드가 잘못되면 valid_package_names는 None.
+    """
+    valid_apps, error_results = _parse_indexed_apps(payload)
+    if valid_apps is None:
+        return None, []
+    return [package_name for _, package_name in valid_apps], [result for _, result in error_results]
+
+
+def _order_results(package_names: List[str], temp_results: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """원래 요청 순서대로 결과를 구성한다."""
+    results = []
+    for package_name in package_names:
         if package_name in temp_results:
             results.append(temp_results[package_name])
         else:
             # 이 경우는 발생하지 않아야 하지만 안전장치
-            results.append(
-                {
-                    "package_name": package_name,
-                    "app_name": None,
-                    "description": None,
-                    "category": None,
-                    "category_ko": None,
-                    "source": "error",
-                    "error": "Unexpected error: result not found.",
-                }
-            )
+            results.append(_error_result(package_name, "Unexpected error: result not found."))
+    return results
+
+
+_INVALID_APPS_ERROR = "Request must contain 'apps' field with a non-empty array."
+
+
+def parse_result_fields(value: Any) -> Tuple[Optional[Tuple[str, ...]], Optional[str]]:
+    """'fields' 값(리스트 또는 쉼표로 구분한 문자열)을 검증한다.
+
+    Returns:
+        (fields, error). 비어 있거나 모든 필드를 고르면 fields는 None (전체 필드).
+    """
+    if isinstance(value, str):
+        names = [name.strip() for name in value.split(",") if name.strip()]
+    elif isinstance(value, list) and all(isinstance(name, str) for name in value):
+        names = value
+    elif value is None:
+        names = []
+    else:
+        return None, "'fields' must be a list of field names or a comma-separated string."
+
+    unknown = sorted(set(names) - set(RESULT_FIELDS))
+    if unknown:
+        return None, f"Unknown field(s) in 'fields': {', '.join(unknown)}. Allowed: {', '.join(RESULT_FIELDS)}."
+    selected = tuple(name for name in RESULT_FIELDS if name in names)
+    if not selected or selected == RESULT_FIELDS:
+        return None, None
+    return selected, None
+
+
+def project_result(result: Dict[str, Any], fields: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+    """결과 항목에서 고른 필드만 남긴다. RESULT_FIELDS가 아닌 키(package_name, source, error 등)는 유지한다."""
+    if fields is None:
+        return result
+    return {key: value for key, value in result.items() if key in fields or key not in RESULT_FIELDS}
+
+
+def response_fingerprint(
+    package_names: List[str],
+    fields: Optional[Tuple[str, ...]] = None,
+    media_type: str = encoding.JSON_MEDIA_TYPE,
+) -> str:
+    """정렬한 패키지 집합(과 응답 필드/형식)의 지문. 순서/중복과 무관하게 같은 집합이면 같은 값이다."""
+    key = "\n".join(sorted(set(package_names)))
+    if fields is not None or media_type != encoding.JSON_MEDIA_TYPE:
+        key = f"{','.join(fields or RESULT_FIELDS)}|{media_type}\n{key}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def response_etag(body: bytes) -> str:
+    return hashlib.sha1(body).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더 값에 etag가 포함되어 있는지 확인한다 (약한 비교)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
+
+
+def get_cached_response(fingerprint: str, signature: Tuple[Any, ...]) -> Optional[CachedResponse]:
+    """같은 패키지 집합의 캐시된 응답을 찾는다. 요청 순서가 다르면 응답 본문도 다르므로 미스로 본다."""
+    cached = response_cache.get(fingerprint)
+    if cached is None or cached.signature != signature:
+        CLASSIFY_RESPONSE_CACHE_TOTAL.inc(outcome="miss")
+        return None
+    CLASSIFY_RESPONSE_CACHE_TOTAL.inc(outcome="hit")
+    return cached
+
+
+def store_response(
+    fingerprint: str,
+    signature: Tuple[Any, ...],
+    results: List[Dict[str, Any]],
+    body: bytes,
+    media_type: str = encoding.JSON_MEDIA_TYPE,
+) -> CachedResponse:
+    """응답을 캐시에 넣는다. 에러/pending이 섞인 응답이나 너무 큰 응답은 캐시하지 않는다 (응답 객체는 항상 반환)."""
+    response = CachedResponse(signature=signature, body=body, etag=response_etag(body), media_type=media_type)
+    if not response_cache.enabled:
+        return response
+    if len(body) > RESPONSE_CACHE_MAX_BODY_BYTES or any(result["source"] in ("error", "pending") for result in results):
+        CLASSIFY_RESPONSE_CACHE_TOTAL.inc(outcome="uncacheable")
+        return response
+    response_cache.set(fingerprint, response)
+    return response
+
+
+def encode_results(results: List[Dict[str, Any]], media_type: str) -> bytes:
+    with classify_stage("encode"):
+        return encoding.encode({"results": results}, media_type)
+
+
+def negotiated_body(cached: CachedResponse, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str], str]:
+    """Accept-Encoding에 맞춘 (본문, content-coding, ETag). 압축본은 캐시 항목에 함께 보관해 재사용한다.
+
+    압축한 표현은 바이트가 다르므로 ETag에 coding을 붙여 구분한다.
+    """
+    coding = encoding.negotiate_content_coding(accept_encoding, len(cached.body))
+    if coding is None:
+        body, etag = cached.body, cached.etag
+    else:
+        body = cached.compressed.get(coding)  # type: ignore[assignment]
+        if body is None:
+            with classify_stage("compress"):
+                body = encoding.compress(cached.body, coding)
+            cached.compressed[coding] = body
+        etag = f"{cached.etag}-{coding}"
+    return body, coding, etag
+
+
+def _etag_response(cached: CachedResponse) -> Any:
+    """ETag를 붙인 응답. 클라이언트의 If-None-Match와 같으면 본문 없이 304를 반환한다."""
+    body, coding, etag = negotiated_body(cached, request.headers.get("Accept-Encoding"))
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        CLASSIFY_RESPONSE_CACHE_TOTAL.inc(outcome="not_modified")
+        response = Response(status=304)
+    else:
+        response = Response(body, status=200, content_type=cached.media_type)
+        CLASSIFY_RESPONSE_BYTES.observe(len(body), media_type=cached.media_type, coding=coding or "identity")
+        if coding is not None:
+            response.headers["Content-Encoding"] = coding
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.vary.update(("Accept", "Accept-Encoding"))
+    return response
+
+
+def _overloaded_response(exc: OverloadedError) -> Any:
+    """승인 풀에 자리가 없을 때의 빠른 거절 응답 (429 또는 503 + Retry-After)."""
+    response = jsonify({"error": str(exc)})
+    response.status_code = exc.status
+    response.headers["Retry-After"] = str(exc.retry_after)
+    return response
+
+
+def _too_many_apps_error(count: int) -> Optional[str]:
+    """CLASSIFY_MAX_APPS를 넘으면 에러 메시지를 반환한다 (413 응답용)."""
+    if CLASSIFY_MAX_APPS > 0 and count > CLASSIFY_MAX_APPS:
+        return f"Too many apps in one request ({count} > {CLASSIFY_MAX_APPS}). Use /classify/jobs for large batches."
+    return None
+
+
+stream_executor = ThreadPoolExecutor(max_workers=CLASSIFY_STREAM_CONCURRENCY, thread_name_prefix="classify-stream")
+
+
+def iter_classified_package_names(
+    package_names: List[str],
+    fields: Optional[Tuple[str, ...]] = None,
+    deadline: Optional[float] = None,
+    admit: bool = False,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """패키지별 결과를 확정되는 순서대로 (package_name, result)로 내보낸다.
+
+    캐시/스냅샷/Firestore 조회 결과를 먼저 모두 내보내고, 나머지는 패키지별로 따로 스크래핑해
+    끝나는 대로 내보낸다. 중복 패키지는 한 번만 내보낸다.
+    응답 상태를 이미 보낸 뒤이므로 승인 풀에 자리가 없으면 남은 패키지를 source "pending"으로 내보낸다.
+    """
+    temp_results: Dict[str, Dict[str, Any]] = {}
+
+    def set_result(package_name: str, result: Dict[str, Any]) -> None:
+        temp_results[package_name] = result
+        CLASSIFY_RESULTS_TOTAL.inc(source=result["source"])
+
+    try:
+        with _admitted(lookup_pool, deadline, admit), classify_stage("lookup"):
+            existing_records_map = lookup_app_records(get_firestore_client(), package_names, fields=fields)
+    except OverloadedError as exc:
+        for package_name in dict.fromkeys(package_names):
+            result = _pending_result(package_name, str(exc))
+            set_result(package_name, result)
+            yield package_name, result
+        return
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.exception("Error during batch Firestore lookup")
+        for package_name in dict.fromkeys(package_names):
+            result = _error_result(package_name, f"Firestore lookup failed: {str(exc)}")
+            set_result(package_name, result)
+            yield package_name, result
+        return
+
+    package_names_to_scrape = _apply_lookup(package_names, existing_records_map, set_result)
+    for package_name, result in list(temp_results.items()):
+        yield package_name, result
+    if not package_names_to_scrape:
+        return
+
+    if admit:
+        try:
+            scrape_pool.acquire(deadline)
+        except OverloadedError as exc:
+            for package_name in package_names_to_scrape:
+                result = _pending_result(package_name, str(exc))
+                set_result(package_name, result)
+                yield package_name, result
+            return
+
+    futures = {
+        stream_executor.submit(profiling.bind(_scrape_missing), [package_name], set_result, deadline): package_name
+        for package_name in package_names_to_scrape
+    }
+    try:
+        for future in as_completed(futures):
+            package_name = futures[future]
+            result = temp_results.get(package_name) or _error_result(package_name, "Unexpected error: result not found.")
+            yield package_name, result
+    finally:
+        # 클라이언트가 연결을 끊으면 아직 시작하지 않은 스크래핑은 취소한다.
+        for future in futures:
+            future.cancel()
+        if admit:
+            scrape_pool.release()
+
+
+def _wants_stream() -> bool:
+    """?stream=true 또는 Accept: application/x-ndjson 이면 스트리밍 응답을 보낸다."""
+    if request.args.get("stream", "").lower() in ("1", "true", "yes"):
+        return True
+    return request.accept_mimetypes.best == "application/x-ndjson"
+
+
+def _stream_classify(
+    valid_apps: List[Tuple[int, str]],
+    error_results: List[Tuple[int, Dict[str, Any]]],
+    fields: Optional[Tuple[str, ...]] = None,
+    deadline: Optional[float] = None,
+) -> Iterator[bytes]:
+    """NDJSON 한 줄에 결과 하나씩, 요청 배열에서의 위치(index)를 붙여 내보낸다. 마지막 줄은 완료 요약."""
+    with CLASSIFY_IN_FLIGHT.track_inprogress(), CLASSIFY_REQUEST_SECONDS.time(), profiling.trace("classify_stream"):
+        started_at = time.perf_counter()
+        first = True
+
+        def line(index: int, result: Dict[str, Any]) -> bytes:
+            nonlocal first
+            if first:
+                CLASSIFY_STREAM_FIRST_RESULT_SECONDS.observe(time.perf_counter() - started_at)
+                first = False
+            return encoding.dumps_json({"index": index, **project_result(result, fields)}) + b"\n"
+
+        for index, result in error_results:
+            yield line(index, result)
+
+        indexes: Dict[str, List[int]] = {}
+        for index, package_name in valid_apps:
+            indexes.setdefault(package_name, []).append(index)
+
+        profiling.annotate(apps=len(valid_apps) + len(error_results), packages=len(indexes))
+        sources: Dict[str, int] = {}
+        if indexes:
+            classified = iter_classified_package_names(list(indexes), fields=fields, deadline=deadline, admit=True)
+            for package_name, result in classified:
+                sources[result["source"]] = sources.get(result["source"], 0) + 1
+                for index in indexes[package_name]:
+                    yield line(index, result)
+        profiling.annotate(sources=sources)
+
+        yield encoding.dumps_json({"status": "done", "total": len(valid_apps) + len(error_results)}) + b"\n"
+
+
+def _requested_fields(payload: Dict[str, Any]) -> Any:
+    """본문의 'fields'가 있으면 그것을, 없으면 ?fields= 쿼리 값을 쓴다."""
+    return payload["fields"] if "fields" in payload else request.args.get("fields")
+
+
+def _classify_stream_response() -> Any:
+    payload: Dict[str, Any] = request.get_json(silent=True) or {}
+    valid_apps, error_results = _parse_indexed_apps(payload)
+    if valid_apps is None:
+        return jsonify({"error": _INVALID_APPS_ERROR}), 400
+    fields, fields_error = parse_result_fields(_requested_fields(payload))
+    if fields_error:
+        return jsonify({"error": fields_error}), 400
+    too_many = _too_many_apps_error(len(valid_apps) + len(error_results))
+    if too_many:
+        return jsonify({"error": too_many}), 413
+    CLASSIFY_BATCH_SIZE.observe(len(valid_apps) + len(error_results))
+    # 마감 시각은 본문 스트리밍이 시작될 때가 아니라 요청을 받은 시점부터 잰다.
+    stream = _stream_classify(valid_apps, error_results, fields, request_deadline())
+    return Response(stream, mimetype="application/x-ndjson")
+
+
+@app.post("/classify")
+def classify() -> Any:
+    if _wants_stream():
+        return _classify_stream_response()
+
+    with CLASSIFY_IN_FLIGHT.track_inprogress(), CLASSIFY_REQUEST_SECONDS.time(), profiling.trace("classify"):
+        deadline = request_deadline()
+        with classify_stage("parse"):
+            payload: Dict[str, Any] = request.get_json(silent=True) or {}
+            valid_package_names, results = _parse_apps_payload(payload)
+
+        if valid_package_names is None:
+            return jsonify({"error": _INVALID_APPS_ERROR}), 400
+
+        fields, fields_error = parse_result_fields(_requested_fields(payload))
+        if fields_error:
+            return jsonify({"error": fields_error}), 400
+
+        too_many = _too_many_apps_error(len(valid_package_names) + len(results))
+        if too_many:
+            return jsonify({"error": too_many}), 413
+
+        CLASSIFY_BATCH_SIZE.observe(len(valid_package_names) + len(results))
+        profiling.annotate(apps=len(valid_package_names) + len(results))
+        media_type = encoding.negotiate_media_type(request.headers.get("Accept"))
+
+        if not valid_package_names:
+            results = [project_result(result, fields) for result in results]
+            body = encode_results(results, media_type)
+            return _etag_response(CachedResponse(signature=(), body=body, etag=response_etag(body), media_type=media_type))
+
+        # 같은 패키지 목록의 최근 응답이 있으면 조회와 직렬화를 모두 건너뛴다.
+        fingerprint = response_fingerprint(valid_package_names, fields, media_type)
+        signature = (len(results), tuple(valid_package_names))
+        cached = get_cached_response(fingerprint, signature) if response_cache.enabled else None
+        if cached is not None:
+            profiling.annotate(response_cache="hit")
+            return _etag_response(cached)
+
+        try:
+            temp_results = classify_package_names(valid_package_names, fields=fields, deadline=deadline, admit=True)
+        except OverloadedError as exc:
+            profiling.annotate(rejected=exc.pool)
+            return _overloaded_response(exc)
+        results.extend(_order_results(valid_package_names, temp_results))
+        results = [project_result(result, fields) for result in results]
+        profiling.annotate(sources=count_sources(results))
+
+        body = encode_results(results, media_type)
+        response = _etag_response(store_response(fingerprint, signature, results, body, media_type))
+        if has_pending_results(results):
+            response.headers["Retry-After"] = str(ADMISSION_RETRY_AFTER_SECONDS)
+        return response
+
+
+def _run_classify_job(job: ClassifyJob) -> None:
+    """백그라운드 워커에서 작업을 청크 단위로 분류하며 부분 결과를 기록한다."""
+    for start in range(0, len(job.package_names), CLASSIFY_JOB_CHUNK_SIZE):
+        chunk = job.package_names[start:start + CLASSIFY_JOB_CHUNK_SIZE]
+        classify_package_names(chunk, emit=job.add_result)
+
+
+job_manager = JobManager(
+    runner=_run_classify_job,
+    store_path=CLASSIFY_JOB_DB_PATH,
+    max_workers=CLASSIFY_JOB_WORKERS,
+    ttl=CLASSIFY_JOB_TTL_SECONDS,
+    stale_after=CLASSIFY_JOB_STALE_SECONDS,
+    max_queued=CLASSIFY_JOB_MAX_QUEUED,
+    retry_after=ADMISSION_RETRY_AFTER_SECONDS,
+)
+
+
+@app.post("/classify/jobs")
+def submit_classify_job() -> Any:
+    """대량 분류 작업을 제출하고 즉시 job_id를 반환한다.
+
+    같은 패키지 집합으로 진행 중(또는 TTL 내 에러 없이 완료된) 작업이 있으면 그 작업을 공유한다.
+    이 워커에서 실행을 기다리는 작업이 CLASSIFY_JOB_MAX_QUEUED개면 429 + Retry-After로 거절한다.
+    """
+    payload: Dict[str, Any] = request.get_json(silent=True) or {}
+    valid_package_names, error_results = _parse_apps_payload(payload)
+
+    if not valid_package_names:
+        return jsonify({"error": _INVALID_APPS_ERROR}), 400
+
+    try:
+        job, created = job_manager.submit(valid_package_names)
+    except OverloadedError as exc:
+        return _overloaded_response(exc)
+    body = job.to_dict(include_results=False)
+    body["deduplicated"] = not created
+    body["skipped"] = len(error_results)
+    return jsonify(body), 202
+
+
+@app.get("/classify/jobs/<job_id>")
+def get_classify_job(job_id: str) -> Any:
+    """작업 상태와 지금까지 완료된 부분 결과를 반환한다."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job '{job_id}' not found."}), 404
+    return jsonify(job.to_dict(include_results=True)), 200
+
+
+@app.get("/classify/jobs/<job_id>/stream")
+def stream_classify_job(job_id: str) -> Any:
+    """작업 결과를 완료되는 순서대로 NDJSON으로 스트리밍한다."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job '{job_id}' not found."}), 404
+
+    def generate() -> Iterator[str]:
+        for result in job.iter_results(timeout=CLASSIFY_JOB_STREAM_TIMEOUT_SECONDS):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+        yield json.dumps(job.to_dict(include_results=False), ensure_ascii=False) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
 
-    return jsonify({"results": results}), 200
+_record_startup_phase("module_init", _IMPORT_STARTED_AT)
+logger.info("Module loaded: %s", STARTUP_TIMINGS)
+if WARMUP_ON_START:
+    threading.Thread(target=warmup, name="warmup", daemon=True).start()
+if CACHE_WARM_TOP_N > 0:
+    threading.Thread(target=_cache_warm_loop, name="cache-warm", daemon=True).start()
 
 
 if __name__ == "__main__":
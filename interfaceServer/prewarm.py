@@ -0,0 +1,204 @@
+"""카테고리 크롤링 결과를 apps 컬렉션에 바로 채우는 사전 준비(pre-warm) 작업.
+
+scraper.crawl_categories의 결과를 CSV로 내리지 않고 FirestoreSink로 흘려보내 배치 쓰기로 저장한다.
+문서는 AppRecord 스키마(id, app_name, description, category, category_ko, fetched_at)에
+크롤링 부가 정보와 installs_numeric(firestore_csv_upload.py와 같은 규칙)을 더한 형태다.
+
+사용법 (Cloud Scheduler + Cloud Run Job, cron 등으로 주기 실행):
+    python prewarm.py run                                   # 카테고리당 100개
+    python prewarm.py run --per-category 200 --dry-run      # 쓰지 않고 수집만
+    python prewarm.py run --warm-url http://localhost:8080  # 저장 후 서버 캐시도 채운다 (요청을 받은 워커 하나만)
+
+--warm-url은 서버의 DEBUG_TOKEN을 X-Debug-Token 헤더로 보낸다 (--warm-token 또는 DEBUG_TOKEN 환경 변수).
+AppRecord 캐시는 워커 프로세스마다 따로 있으므로 이 호출로는 요청을 받은 워커 하나만 채워진다.
+모든 워커를 채우려면 서버에 CACHE_WARM_TOP_N을 설정한다.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from categories import category_ko_for
+from firestore_csv_upload import FIRESTORE_COLLECTION, init_firestore, parse_installs
+
+logger = logging.getLogger(__name__)
+
+FIRESTORE_BATCH_LIMIT = 500          # Firestore 배치 커밋 한도
+DEFAULT_PARALLEL_COMMITS = 4         # 동시에 진행할 배치 커밋 수
+
+
+def to_app_document(record: Dict[str, Any], fetched_at: float) -> Dict[str, Any]:
+    """크롤링 레코드(scraper.CRAWL_FIELDS)를 apps 문서 데이터로 변환한다."""
+    document = dict(record)
+    document["category_ko"] = record.get("category_ko") or category_ko_for(record.get("category"))
+    document["installs_numeric"] = parse_installs(str(record.get("installs") or ""), record.get("id"))
+    document["fetched_at"] = fetched_at
+    return document
+
+
+class FirestoreSink:
+    """crawl_categories의 sink. 레코드를 batch_size개씩 모아 Firestore 배치로 쓴다 (스레드 안전).
+
+    최대 parallel개의 커밋을 동시에 진행하고, 그보다 밀리면 write()가 기다린다 (메모리 사용량 일정).
+    close()는 남은 레코드를 커밋하고 모든 커밋이 끝날 때까지 기다린다.
+    """
+
+    def __init__(
+        self,
+        db: Any,
+        collection: str,
+        batch_size: int = FIRESTORE_BATCH_LIMIT,
+        parallel: int = DEFAULT_PARALLEL_COMMITS,
+        dry_run: bool = False,
+    ) -> None:
+        self._db = db
+        self._collection = collection
+        self.batch_size = max(1, min(batch_size, FIRESTORE_BATCH_LIMIT))
+        self.dry_run = dry_run
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._in_flight = threading.BoundedSemaphore(max(1, parallel))
+        self._executor = ThreadPoolExecutor(max_workers=max(1, parallel), thread_name_prefix="prewarm-commit")
+        self.written_ids: List[str] = []
+        self.stats = {"written": 0, "failed": 0, "commits": 0}
+
+    def write(self, record: Dict[str, Any]) -> None:
+        document = to_app_document(record, time.time())
+        with self._lock:
+            self._pending.append(document)
+            if len(self._pending) < self.batch_size:
+                return
+            documents, self._pending = self._pending, []
+        self._submit(documents)
+
+    def _submit(self, documents: List[Dict[str, Any]]) -> None:
+        self._in_flight.acquire()  # 진행 중인 커밋이 parallel개를 넘지 않도록 대기
+        self._executor.submit(self._commit, documents)
+
+    def _commit(self, documents: List[Dict[str, Any]]) -> None:
+        try:
+            if not self.dry_run:
+                batch = self._db.batch()
+                ref = self._db.collection(self._collection)
+                for document in documents:
+                    batch.set(ref.document(document["id"]), document, merge=True)
+                batch.commit()
+            with self._lock:
+                self.stats["written"] += len(documents)
+                self.stats["commits"] += 1
+                self.written_ids.extend(document["id"] for document in documents)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("pre-warm 배치 커밋 실패 (%d개 문서): %s", len(documents), exc)
+            with self._lock:
+                self.stats["failed"] += len(documents)
+        finally:
+            self._in_flight.release()
+
+    def close(self) -> None:
+        with self._lock:
+            documents, self._pending = self._pending, []
+        if documents:
+            self._submit(documents)
+        self._executor.shutdown(wait=True)
+
+
+def warm_server_cache(
+    base_url: str,
+    package_names: List[str],
+    token: Optional[str] = None,
+    timeout: float = 60.0,
+) -> Dict[str, Any]:
+    """서버의 POST /admin/warm을 호출해 요청을 받은 워커의 AppRecord 캐시를 채운다.
+
+    로드 밸런서 뒤의 워커 하나만 채워지므로, 다른 워커는 첫 조회 때(또는 CACHE_WARM_TOP_N 주기 예열로) 채워진다.
+    """
+    body = json.dumps({"package_names": package_names}).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["X-Debug-Token"] = token
+    req = urllib.request.Request(
+        base_url.rstrip("/") + "/admin/warm",
+        data=body,
+        headers=headers,
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def run_prewarm(
+    db: Any,
+    collection: str,
+    per_category: int = 100,
+    concurrency: Optional[int] = None,
+    batch_size: int = FIRESTORE_BATCH_LIMIT,
+    parallel: int = DEFAULT_PARALLEL_COMMITS,
+    dry_run: bool = False,
+) -> FirestoreSink:
+    """모든 카테고리를 크롤링해 Firestore에 저장하고, 쓰기 통계를 담은 sink를 반환한다."""
+    from scraper import crawl_categories
+
+    sink = FirestoreSink(db, collection, batch_size=batch_size, parallel=parallel, dry_run=dry_run)
+    started_at = time.monotonic()
+    crawl_stats: Dict[str, Any] = {}
+    try:
+        crawl_stats = crawl_categories(sink, num_per_category=per_category, concurrency=concurrency)
+    finally:
+        sink.close()
+    logger.info(
+        "pre-warm %s: 크롤링 %s, %d개 문서 %s, %d개 실패 (%.1fs)",
+        "(dry-run)" if dry_run else "완료",
+        crawl_stats,
+        sink.stats["written"],
+        "대상" if dry_run else "저장",
+        sink.stats["failed"],
+        time.monotonic() - started_at,
+    )
+    return sink
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="카테고리별 인기 앱을 크롤링해 Firestore apps 컬렉션을 미리 채웁니다.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="크롤링 결과를 Firestore에 배치로 저장합니다.")
+    run.add_argument("--per-category", type=int, default=100, help="카테고리당 수집할 앱 개수")
+    run.add_argument("--concurrency", type=int, default=None, help="동시에 진행할 상세 조회 수")
+    run.add_argument("--batch-size", type=int, default=FIRESTORE_BATCH_LIMIT, help="배치당 문서 수 (최대 500)")
+    run.add_argument("--parallel", type=int, default=DEFAULT_PARALLEL_COMMITS, help="동시에 진행할 배치 커밋 수")
+    run.add_argument("--dry-run", action="store_true", help="Firestore에 쓰지 않고 수집만 합니다.")
+    run.add_argument("--warm-url", default=None,
+                     help="저장 후 POST <url>/admin/warm으로 서버 캐시를 채웁니다 (요청을 받은 워커 하나만).")
+    run.add_argument("--warm-token", default=os.getenv("DEBUG_TOKEN"),
+                     help="/admin/warm에 보낼 X-Debug-Token (기본값: DEBUG_TOKEN 환경 변수)")
+    args = parser.parse_args(argv)
+
+    sink = run_prewarm(
+        None if args.dry_run else init_firestore(),
+        FIRESTORE_COLLECTION,
+        per_category=args.per_category,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        parallel=args.parallel,
+        dry_run=args.dry_run,
+    )
+
+    if args.warm_url and not args.dry_run and sink.written_ids:
+        try:
+            logger.info("서버 캐시 채우기: %s", warm_server_cache(args.warm_url, sink.written_ids, token=args.warm_token))
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("서버 캐시 채우기 실패 (%s): %s", args.warm_url, exc)
+
+    if sink.stats["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""느린 /classify 요청의 구간(span) 기록과 워커별 샘플링 CPU 프로파일러.
+
+요청 추적 (PROFILE_SLOW_MS 또는 PROFILE_SAMPLE_RATE를 지정했을 때만 동작):
+- trace()로 요청 하나를 감싸면, 그 안의 span()/record() 호출이 요청별 구간 트리로 쌓인다.
+  현재 구간은 contextvar로 전달되므로 스레드 풀에 넘기는 작업은 bind()로 감싸야 같은 트리에 붙는다.
+- 요청이 끝났을 때 PROFILE_SLOW_MS 이상 걸렸거나 표본(PROFILE_SAMPLE_RATE)으로 뽑혔으면
+  워커별 링 버퍼(TraceStore)에 보관하고, PROFILE_TRACE_DIR가 있으면 JSON 파일로도 쓴다.
+- 추적하지 않는 요청에서는 contextvar 조회 한 번만 하고 끝난다.
+
+샘플링 프로파일러:
+- SamplingProfiler는 interval마다 sys._current_frames()로 모든 스레드의 스택을 모아 센다 (벽시계 기준).
+  재배포 없이 실행 중인 워커에서 켜고 끌 수 있고, 결과는 상위 스택/함수 또는 collapsed 형식
+  (flamegraph.pl, speedscope)으로 본다.
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))             # 0이면 느린 요청 기록 안 함
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))     # 0~1, 무작위로 기록할 요청 비율
+PROFILE_TRACE_BUFFER = int(os.getenv("PROFILE_TRACE_BUFFER", "50"))    # 워커별로 보관하는 최근 추적 수
+PROFILE_TRACE_DIR = os.getenv("PROFILE_TRACE_DIR")                     # 지정하면 추적을 JSON 파일로도 쓴다
+PROFILE_MAX_SPANS = int(os.getenv("PROFILE_MAX_SPANS", "2000"))        # 요청 하나에 기록하는 최대 구간 수
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "120"))  # 샘플링 프로파일러 최대 실행 시간
+PROFILER_MIN_INTERVAL = 0.005  # 샘플링 간격 하한 (더 잦으면 GIL을 잡는 샘플러가 요청 처리를 눈에 띄게 늦춘다)
+# /debug/* 요청에는 같은 값의 X-Debug-Token 헤더가 있어야 한다. 지정하지 않으면 /debug/*는 404를 반환한다.
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN")
+
+PROFILE_TRACES_TOTAL = metrics.counter(
+    "profile_traces_total",
+    "Request traces kept for /debug/traces.",
+    ["reason"],
+)
+
+
+class Span:
+    """추적 안의 구간 하나. start/end는 time.perf_counter() 값."""
+
+    __slots__ = ("name", "start", "end", "attrs", "thread", "children")
+
+    def __init__(self, name: str, attrs: Dict[str, Any], start: Optional[float] = None) -> None:
+        self.name = name
+        self.start = time.perf_counter() if start is None else start
+        self.end: Optional[float] = None
+        self.attrs = attrs
+        self.thread = threading.current_thread().name
+        self.children: List["Span"] = []
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        end = self.end if self.end is not None else time.perf_counter()
+        payload: Dict[str, Any] = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round((end - self.start) * 1000, 3),
+            "thread": self.thread,
+        }
+        if self.attrs:
+            payload["attrs"] = self.attrs
+        if self.children:
+            payload["children"] = [child.to_dict(origin) for child in sorted(self.children, key=lambda c: c.start)]
+        return payload
+
+
+class Trace:
+    """요청 하나의 구간 트리. 여러 스레드가 동시에 구간을 붙이므로 추가는 잠금 안에서 한다."""
+
+    def __init__(self, name: str, attrs: Dict[str, Any], sampled: bool) -> None:
+        self.id = uuid.uuid4().hex[:16]
+        self.started_at = time.time()
+        self.root = Span(name, attrs)
+        self.sampled = sampled
+        self.span_count = 1
+        self.dropped_spans = 0
+        self.reason: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.root.end if self.root.end is not None else time.perf_counter()
+        return (end - self.root.start) * 1000
+
+    def add(self, parent: Span, span: Span) -> bool:
+        with self._lock:
+            if self.span_count >= PROFILE_MAX_SPANS:
+                self.dropped_spans += 1
+                return False
+            self.span_count += 1
+            parent.children.append(span)
+            return True
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.root.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 3),
+            "reason": self.reason,
+            "spans": self.span_count,
+            "attrs": self.root.attrs,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self.summary(), "dropped_spans": self.dropped_spans, "root": self.root.to_dict(self.root.start)}
+
+
+# 현재 (추적, 구간). 추적 중이 아니면 None.
+# 끝날 때 토큰(reset) 대신 이전 값을 다시 넣는다: 스트리밍 응답의 제너레이터는 next()마다
+# 다른 컨텍스트(asyncio.to_thread)에서 실행될 수 있어, 다른 컨텍스트의 토큰으로 reset하면 실패한다.
+_current: contextvars.ContextVar[Optional[Tuple[Trace, Span]]] = contextvars.ContextVar("profiling_span", default=None)
+
+
+class TraceStore:
+    """보관 조건(느림/표본)을 만족한 최근 추적을 워커별 링 버퍼에 둔다. 조건은 실행 중에 바꿀 수 있다."""
+
+    def __init__(self, slow_ms: float, sample_rate: float, size: int, trace_dir: Optional[str] = None) -> None:
+        self.slow_ms = slow_ms
+        self.sample_rate = sample_rate
+        self.trace_dir = trace_dir
+        self._traces: Deque[Trace] = deque(maxlen=max(1, size))
+        self._lock = threading.Lock()
+        if trace_dir:
+            os.makedirs(trace_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.slow_ms > 0 or self.sample_rate > 0
+
+    def configure(self, slow_ms: Optional[float] = None, sample_rate: Optional[float] = None) -> None:
+        if slow_ms is not None:
+            self.slow_ms = max(0.0, slow_ms)
+        if sample_rate is not None:
+            self.sample_rate = min(1.0, max(0.0, sample_rate))
+
+    def offer(self, trace: Trace) -> None:
+        if self.slow_ms > 0 and trace.duration_ms >= self.slow_ms:
+            trace.reason = "slow"
+        elif trace.sampled:
+            trace.reason = "sampled"
+        else:
+            return
+        PROFILE_TRACES_TOTAL.inc(reason=trace.reason)
+        with self._lock:
+            self._traces.append(trace)
+        if self.trace_dir:
+            self._write(trace)
+
+    def _write(self, trace: Trace) -> None:
+        path = os.path.join(self.trace_dir or "", f"trace-{int(trace.started_at)}-{trace.id}.json")
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(trace.to_dict(), f, ensure_ascii=False)
+        except OSError as exc:
+            logger.warning("Failed to write trace file %s: %s", path, exc)
+
+    def recent(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            traces = list(self._traces)
+        return [trace.summary() for trace in reversed(traces)]
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        with self._lock:
+            return next((trace for trace in self._traces if trace.id == trace_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._traces)
+        return {
+            "enabled": self.enabled,
+            "slow_ms": self.slow_ms,
+            "sample_rate": self.sample_rate,
+            "size": size,
+            "max_size": self._traces.maxlen,
+            "trace_dir": self.trace_dir,
+        }
+
+
+traces = TraceStore(PROFILE_SLOW_MS, PROFILE_SAMPLE_RATE, PROFILE_TRACE_BUFFER, PROFILE_TRACE_DIR)
+
+
+@contextmanager
+def trace(name: str, **attrs: Any) -> Iterator[Optional[Trace]]:
+    """요청 하나를 추적한다. 추적이 꺼져 있거나 이미 추적 중이면 아무것도 하지 않는다."""
+    if not traces.enabled or _current.get() is not None:
+        yield None
+        return
+    current = Trace(name, attrs, sampled=traces.sample_rate > 0 and random.random() < traces.sample_rate)
+    _current.set((current, current.root))
+    try:
+        yield current
+    finally:
+        _current.set(None)
+        current.root.end = time.perf_counter()
+        traces.offer(current)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """현재 구간 아래에 하위 구간을 연다. 추적 중이 아니면 None을 내주고 아무것도 하지 않는다.
+
+    구간이 끝난 뒤에야 알 수 있는 속성(결과 등)은 내준 Span의 attrs에 넣는다.
+    """
+    current = _current.get()
+    if current is None:
+        yield None
+        return
+    active, parent = current
+    child = Span(name, attrs)
+    if not active.add(parent, child):
+        yield None
+        return
+    _current.set((active, child))
+    try:
+        yield child
+    finally:
+        _current.set(current)
+        child.end = time.perf_counter()
+
+
+def record(name: str, started_at: float, **attrs: Any) -> None:
+    """started_at(time.perf_counter())부터 지금까지를 현재 구간의 하위 구간으로 기록한다."""
+    current = _current.get()
+    if current is None:
+        return
+    active, parent = current
+    child = Span(name, attrs, start=started_at)
+    child.end = time.perf_counter()
+    active.add(parent, child)
+
+
+def annotate(**attrs: Any) -> None:
+    """진행 중인 추적의 최상위 구간에 속성을 더한다."""
+    current = _current.get()
+    if current is not None:
+        current[0].root.attrs.update(attrs)
+
+
+def bind(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """다른 스레드에서 실행해도 현재 구간 아래에 기록되도록 fn을 현재 컨텍스트에 묶는다.
+
+    추적 중이 아니면 fn을 그대로 반환한다. 작업마다 따로 불러야 한다 (컨텍스트 하나는 동시에 한 스레드만 쓴다).
+    """
+    if _current.get() is None:
+        return fn
+    context = contextvars.copy_context()
+
+    def run(*args: Any, **kwargs: Any) -> Any:
+        return context.run(fn, *args, **kwargs)
+
+    return run
+
+
+# 대기 중인 스레드의 가장 안쪽 프레임 (파일, 함수). 기본적으로 프로파일에서 뺀다.
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("socket.py", "accept"),
+    ("thread.py", "_worker"),  # concurrent.futures 작업 대기
+}
+_MAX_STACK_DEPTH = 64
+
+
+def _frame_label(frame: Any) -> str:
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+
+
+def _collapse(frame: Any) -> Tuple[str, ...]:
+    stack = []
+    while frame is not None and len(stack) < _MAX_STACK_DEPTH:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+def _is_idle(frame: Any) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE_FRAMES
+
+
+class SamplingProfiler:
+    """모든 스레드의 스택을 interval마다 모으는 샘플링 프로파일러 (워커 프로세스 단위, 한 번에 하나).
+
+    벽시계 기준이므로 I/O를 기다리는 스레드도 잡힌다. include_idle이 False면 잠금/큐/select에서
+    대기 중인 스레드는 센다(idle_samples)만 하고 스택에는 넣지 않는다.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stacks: Counter = Counter()
+        self.interval = 0.01
+        self.include_idle = False
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self.ticks = 0
+        self.idle_samples = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.01, duration: float = 60.0, include_idle: bool = False) -> bool:
+        """프로파일링을 시작한다 (이전 결과는 지운다). 이미 실행 중이면 False."""
+        with self._lock:
+            if self.running:
+                return False
+            self.interval = max(PROFILER_MIN_INTERVAL, interval)
+            self.include_idle = include_idle
+            self._stacks = Counter()
+            self.ticks = 0
+            self.idle_samples = 0
+            self.started_at = time.time()
+            self.stopped_at = None
+            self._stop.clear()
+            duration = min(max(0.0, duration), PROFILER_MAX_SECONDS) if duration > 0 else PROFILER_MAX_SECONDS
+            self._thread = threading.Thread(target=self._run, args=(duration,), name="sampling-profiler", daemon=True)
+            self._thread.start()
+        logger.info("Sampling profiler started (interval %.3fs, up to %.0fs).", self.interval, duration)
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=self.interval + 1)
+
+    def _run(self, duration: float) -> None:
+        me = threading.get_ident()
+        deadline = time.monotonic() + duration
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            frames = sys._current_frames()  # pylint: disable=protected-access
+            with self._lock:
+                self.ticks += 1
+                for ident, frame in frames.items():
+                    if ident == me:
+                        continue
+                    if not self.include_idle and _is_idle(frame):
+                        self.idle_samples += 1
+                        continue
+                    self._stacks[_collapse(frame)] += 1
+        self.stopped_at = time.time()
+        logger.info("Sampling profiler stopped after %d ticks.", self.ticks)
+
+    def collapsed(self) -> str:
+        """flamegraph.pl/speedscope가 읽는 collapsed 형식 ("a;b;c 횟수" 한 줄에 스택 하나)."""
+        with self._lock:
+            stacks = self._stacks.most_common()
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in stacks)
+
+    def report(self, top: int = 30) -> Dict[str, Any]:
+        with self._lock:
+            stacks = list(self._stacks.items())
+            ticks, idle_samples = self.ticks, self.idle_samples
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in stacks:
+            self_counts[stack[-1]] += count
+            for label in set(stack):
+                total_counts[label] += count
+        samples = sum(count for _, count in stacks)
+        return {
+            "running": self.running,
+            "pid": os.getpid(),
+            "interval_ms": round(self.interval * 1000, 3),
+            "include_idle": self.include_idle,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "ticks": ticks,
+            "samples": samples,
+            "idle_samples": idle_samples,
+            "top_functions": [
+                {"function": label, "self": self_counts[label], "total": count}
+                for label, count in total_counts.most_common(top)
+            ],
+            "top_stacks": [
+                {"stack": ";".join(stack), "count": count}
+                for stack, count in sorted(stacks, key=lambda item: item[1], reverse=True)[:top]
+            ],
+        }
+
+
+profiler = SamplingProfiler()
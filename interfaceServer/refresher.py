@@ -0,0 +1,148 @@
+"""오래된 AppRecord를 백그라운드에서 다시 스크래핑하는 갱신기 (stale-while-revalidate).
+
+요청 경로는 오래된 레코드를 그대로 응답하고 note()로 갱신 대상에 올리기만 한다.
+백그라운드 스레드가 요청 빈도가 높은 패키지부터, 초당 rate개 예산 안에서 배치로 다시 스크래핑한다.
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+REFRESH_PACKAGES_TOTAL = metrics.counter(
+    "refresh_packages_total",
+    "Stale app records re-scraped by the background refresher.",
+    ["outcome"],
+)
+
+
+class RecordRefresher:
+    """요청 빈도 순으로 오래된 레코드를 다시 스크래핑한다.
+
+    - note(): 오래된 레코드가 응답될 때마다 호출한다. 대기 중인 패키지는 요청 횟수만 늘린다.
+      low_priority=True로 올린 패키지(수집 시각이 없는 기존 카탈로그)는 따로 모아 두고,
+      일반 패키지를 모두 꺼낸 뒤 남는 예산으로만 갱신한다.
+    - 백그라운드 스레드는 interval초마다 쌓인 예산(rate x 경과 시간, 최대 batch_size)만큼
+      요청 횟수가 많은 패키지를 꺼내 refresh(package_names)를 호출한다.
+    - 한 번 시도한 패키지는 retry_seconds 동안 다시 올리지 않는다 (갱신 실패/다른 워커의 중복 방지).
+    - should_pause()가 True면 (예: 서킷 브레이커가 열림) 그 주기는 건너뛴다.
+
+    refresh는 성공적으로 갱신한 패키지 수를 반환한다.
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[List[str]], int],
+        rate: float,
+        batch_size: int = 20,
+        interval: float = 5.0,
+        max_pending: int = 10000,
+        retry_seconds: float = 3600.0,
+        should_pause: Callable[[], bool] = lambda: False,
+    ) -> None:
+        self._refresh = refresh
+        self.rate = rate
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self.max_pending = max_pending
+        self.retry_seconds = retry_seconds
+        self._should_pause = should_pause
+        self._pending: Dict[str, int] = {}        # 패키지명 -> 요청 횟수
+        self._backlog: Dict[str, int] = {}        # 낮은 우선순위 패키지명 -> 요청 횟수
+        self._attempted: Dict[str, float] = {}    # 패키지명 -> 마지막 시도 시각 (monotonic)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._budget = 0.0
+        self.noted = 0
+        self.dropped = 0
+        self.attempted = 0
+        self.refreshed = 0
+        self._thread = threading.Thread(target=self._run, name="record-refresher", daemon=True)
+        self._thread.start()
+
+    def note(self, package_name: str, low_priority: bool = False) -> None:
+        """오래된 레코드가 응답되었음을 알린다 (요청 경로에서 호출, 대기하지 않는다)."""
+        with self._lock:
+            self.noted += 1
+            queue = self._backlog if low_priority else self._pending
+            if package_name in queue:
+                queue[package_name] += 1
+                return
+            attempted_at = self._attempted.get(package_name)
+            if attempted_at is not None and time.monotonic() - attempted_at < self.retry_seconds:
+                return
+            if len(self._pending) + len(self._backlog) >= self.max_pending:
+                self.dropped += 1
+                return
+            queue[package_name] = 1
+
+    def _take(self, count: int) -> List[str]:
+        with self._lock:
+            names = heapq.nlargest(count, self._pending, key=self._pending.__getitem__)
+            for name in names:
+                del self._pending[name]
+            if len(names) < count:
+                backlog = heapq.nlargest(count - len(names), self._backlog, key=self._backlog.__getitem__)
+                for name in backlog:
+                    del self._backlog[name]
+                names += backlog
+            now = time.monotonic()
+            for name in names:
+                self._attempted[name] = now
+            if len(self._attempted) > self.max_pending:
+                cutoff = now - self.retry_seconds
+                self._attempted = {name: at for name, at in self._attempted.items() if at >= cutoff}
+        return names
+
+    def _run(self) -> None:
+        last = time.monotonic()
+        while not self._stop.wait(self.interval):
+            now = time.monotonic()
+            self._budget = min(float(self.batch_size), self._budget + (now - last) * self.rate)
+            last = now
+            if self._budget < 1 or not (self._pending or self._backlog) or self._should_pause():
+                continue
+            names = self._take(int(self._budget))
+            if not names:
+                continue
+            self._budget -= len(names)
+            self.run_once(names)
+
+    def run_once(self, package_names: List[str]) -> int:
+        """package_names를 바로 갱신한다 (예산과 무관)."""
+        self.attempted += len(package_names)
+        try:
+            refreshed = self._refresh(package_names)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Background refresh of %d records failed", len(package_names))
+            REFRESH_PACKAGES_TOTAL.inc(len(package_names), outcome="error")
+            return 0
+        self.refreshed += refreshed
+        REFRESH_PACKAGES_TOTAL.inc(refreshed, outcome="refreshed")
+        REFRESH_PACKAGES_TOTAL.inc(len(package_names) - refreshed, outcome="failed")
+        logger.info("Refreshed %d/%d stale app records.", refreshed, len(package_names))
+        return refreshed
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 1)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+            backlog = len(self._backlog)
+        return {
+            "pending": pending,
+            "backlog": backlog,
+            "rate_per_second": self.rate,
+            "noted": self.noted,
+            "dropped": self.dropped,
+            "attempted": self.attempted,
+            "refreshed": self.refreshed,
+        }
@@ -0,0 +1,131 @@
+"""업스트림 장애 시 빠르게 실패하기 위한 서킷 브레이커."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """서킷이 열려 있어 업스트림 호출을 시도하지 않았다."""
+
+
+class CircuitBreaker:
+    """최근 window초 동안의 실패율로 열리고 닫히는 서킷 브레이커.
+
+    - closed: 모든 호출을 허용한다. 최근 호출이 min_calls 이상이고 실패율이 failure_ratio 이상이면 연다.
+    - open: open_seconds 동안 모든 호출을 즉시 거절한다.
+    - half_open: 시험 호출을 하나씩만 허용한다. 성공하면 닫고, 실패하면 다시 연다.
+
+    min_calls <= 0 이면 항상 닫혀 있다 (비활성화).
+    """
+
+    def __init__(self, failure_ratio: float, min_calls: int, window: float, open_seconds: float) -> None:
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.window = window
+        self.open_seconds = open_seconds
+        self._lock = threading.Lock()
+        self._events: Deque[Tuple[float, bool]] = deque()  # (시각, 실패 여부)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.min_calls > 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def _trim(self, now: float) -> None:
+        while self._events and now - self._events[0][0] > self.window:
+            self._events.popleft()
+
+    def allow(self) -> bool:
+        """지금 업스트림을 호출해도 되는지 반환한다. True를 받았다면 반드시 결과를 기록하거나 cancel()해야 한다."""
+        if not self.enabled:
+            return True
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def cancel(self) -> None:
+        """allow()로 받은 호출을 하지 않기로 했을 때 부른다 (결과를 기록하지 않고 시험 호출 자리만 돌려준다)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._current_state(time.monotonic()) == HALF_OPEN:
+                self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self._current_state(now) == HALF_OPEN:
+                self._state = CLOSED
+                self._probe_in_flight = False
+                self._events.clear()
+                return
+            self._events.append((now, False))
+            self._trim(now)
+
+    def record_failure(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == HALF_OPEN:
+                self._open(now)
+                return
+            if state == OPEN:
+                return
+            self._events.append((now, True))
+            self._trim(now)
+            failures = sum(1 for _, failed in self._events if failed)
+            if len(self._events) >= self.min_calls and failures / len(self._events) >= self.failure_ratio:
+                self._open(now)
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._probe_in_flight = False
+        self._events.clear()
+        self.opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            self._trim(now)
+            return {
+                "enabled": self.enabled,
+                "state": state,
+                "window_calls": len(self._events),
+                "window_failures": sum(1 for _, failed in self._events if failed),
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,186 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeCache:
+    """
+    google_play_scraper.app() 상세 응답을 보관하는 SQLite 기반 영구 캐시.
+
+    - (app_id, lang, country)별로 원본 응답과 수집 시각(fetched_at)을 저장한다.
+    - 조회에 실패한 패키지는 실패 이유와 다음 재시도 시각(retry_at)을 따로 기록한다 (negative cache).
+      연속 실패할수록 재시도 간격이 지수적으로 늘어나고, 조회에 성공하면 기록이 지워진다.
+    - 여러 스레드/워커 프로세스가 같은 파일을 함께 쓸 수 있도록 WAL 모드를 사용한다.
+    - 파일(과 상위 디렉터리)은 처음 조회/기록할 때 만든다.
+    """
+
+    def __init__(self, path: str, max_age: float):
+        self.path = path
+        self.max_age = max_age
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.negative_hits = 0
+        self.failures_recorded = 0
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS app_details ("
+            " app_id TEXT NOT NULL, lang TEXT NOT NULL, country TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL, payload TEXT NOT NULL,"
+            " PRIMARY KEY (app_id, lang, country))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS scrape_failures ("
+            " app_id TEXT NOT NULL, lang TEXT NOT NULL, country TEXT NOT NULL,"
+            " reason TEXT NOT NULL, error TEXT NOT NULL, failures INTEGER NOT NULL,"
+            " failed_at REAL NOT NULL, retry_at REAL NOT NULL,"
+            " PRIMARY KEY (app_id, lang, country))"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._schema_ready:
+                with self._schema_lock:
+                    if not self._schema_ready:
+                        self._create_schema(conn)
+                        self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    def get(self, app_id: str, lang: str, country: str, max_age: float = None):
+        """
+        캐시된 상세 정보를 반환한다.
+
+        Args:
+            max_age: 신선도 기준(초). 기본값은 생성 시 지정한 max_age
+
+        Returns:
+            (detail, fresh) 튜플. fresh는 max_age 이내에 수집된 값인지 여부.
+            캐시에 없으면 (None, False).
+        """
+        detail, _, fresh = self.get_entry(app_id, lang, country, max_age=max_age)
+        return detail, fresh
+
+    def get_entry(self, app_id: str, lang: str, country: str, max_age: float = None):
+        """
+        get과 같지만 수집 시각도 함께 반환한다.
+
+        Returns:
+            (detail, fetched_at, fresh) 튜플. 캐시에 없으면 (None, None, False).
+        """
+        row = self._conn().execute(
+            "SELECT fetched_at, payload FROM app_details WHERE app_id = ? AND lang = ? AND country = ?",
+            (app_id, lang, country),
+        ).fetchone()
+
+        with self._stats_lock:
+            if row is None:
+                self.misses += 1
+                return None, None, False
+            fresh = (time.time() - row[0]) <= (self.max_age if max_age is None else max_age)
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+
+        return json.loads(row[1]), row[0], fresh
+
+    def put(self, app_id: str, lang: str, country: str, detail: dict) -> float:
+        """상세 정보를 저장하고 기록한 수집 시각(fetched_at)을 반환한다."""
+        fetched_at = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO app_details (app_id, lang, country, fetched_at, payload) VALUES (?, ?, ?, ?, ?)",
+            (app_id, lang, country, fetched_at, json.dumps(detail, ensure_ascii=False, default=str)),
+        )
+        conn.execute(
+            "DELETE FROM scrape_failures WHERE app_id = ? AND lang = ? AND country = ?",
+            (app_id, lang, country),
+        )
+        conn.commit()
+        with self._stats_lock:
+            self.writes += 1
+        return fetched_at
+
+    def get_failure(self, app_id: str, lang: str, country: str):
+        """
+        아직 재시도 시각이 되지 않은 실패 기록을 반환한다.
+
+        Returns:
+            {"reason", "error", "failures", "retry_at"} dict. 기록이 없거나 재시도할 때가 되었으면 None.
+        """
+        row = self._conn().execute(
+            "SELECT reason, error, failures, retry_at FROM scrape_failures"
+            " WHERE app_id = ? AND lang = ? AND country = ?",
+            (app_id, lang, country),
+        ).fetchone()
+        if row is None or row[3] <= time.time():
+            return None
+        with self._stats_lock:
+            self.negative_hits += 1
+        return {"reason": row[0], "error": row[1], "failures": row[2], "retry_at": row[3]}
+
+    def record_failure(
+        self,
+        app_id: str,
+        lang: str,
+        country: str,
+        reason: str,
+        error: str,
+        base_delay: float,
+        max_delay: float,
+    ) -> float:
+        """
+        조회 실패를 기록하고 다음 재시도 시각을 반환한다.
+
+        재시도 간격은 base_delay * 2^(연속 실패 횟수 - 1)이며 max_delay를 넘지 않는다.
+        """
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT failures FROM scrape_failures WHERE app_id = ? AND lang = ? AND country = ?",
+            (app_id, lang, country),
+        ).fetchone()
+        failures = (row[0] if row else 0) + 1
+        now = time.time()
+        retry_at = now + min(max_delay, base_delay * (2 ** (failures - 1)))
+        conn.execute(
+            "INSERT OR REPLACE INTO scrape_failures"
+            " (app_id, lang, country, reason, error, failures, failed_at, retry_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (app_id, lang, country, reason, error, failures, now, retry_at),
+        )
+        conn.commit()
+        with self._stats_lock:
+            self.failures_recorded += 1
+        return retry_at
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "path": self.path,
+                "max_age_seconds": self.max_age,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "negative_hits": self.negative_hits,
+                "failures_recorded": self.failures_recorded,
+            }
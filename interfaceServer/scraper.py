@@ -1,4 +1,18 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from google_play_scraper import app, search
+from google_play_scraper.exceptions import NotFoundError
+from scrape_cache import ScrapeCache
+from categories import canonical_category, category_ko_for
+from resilience import CircuitBreaker, CircuitOpenError
+import metrics
+import profiling
+import argparse
+import csv
+import json
+import os
+import random
+import threading
 import time
 import logging
 
@@ -37,41 +51,379 @@ COUNTRY = 'kr'
 LANG = 'ko'
 
 
-def get_appnames_by_packageNames(package_names:list):
+class TokenBucket:
     """
-    패키지명 목록을 받아 각 앱의 기본 정보를 조회한다.
+    스레드 안전한 토큰 버킷 속도 제한기.
+
+    초당 rate개의 토큰이 채워지고 최대 burst개까지 쌓인다.
+    acquire()는 토큰을 얻을 때까지 대기한다 (고정 sleep 대체).
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float = None) -> bool:
+        if self.rate <= 0:
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+# 동시 수집 설정 (환경 변수로 조정)
+SCRAPER_CONCURRENCY = int(os.getenv("SCRAPER_CONCURRENCY", "8"))
+SCRAPER_RATE_PER_SEC = float(os.getenv("SCRAPER_RATE_PER_SEC", "10"))
+SCRAPER_RATE_BURST = int(os.getenv("SCRAPER_RATE_BURST", "10"))
+SCRAPER_PACKAGE_TIMEOUT = float(os.getenv("SCRAPER_PACKAGE_TIMEOUT", "10"))
+SCRAPER_MAX_RETRIES = int(os.getenv("SCRAPER_MAX_RETRIES", "2"))
+SCRAPER_BACKOFF_BASE = float(os.getenv("SCRAPER_BACKOFF_BASE", "0.5"))
+
+# 프로세스 전체에서 공유하는 Play Store 호출 속도 제한기
+rate_limiter = TokenBucket(SCRAPER_RATE_PER_SEC, SCRAPER_RATE_BURST)
+
+# 프로세스 전체에서 공유하는 상세 조회 스레드 풀.
+# 응답이 없는 호출은 중단할 수 없으므로 시간 초과 후에도 스레드를 잡고 있다. 호출마다 풀을 새로 만들면
+# 이런 스레드가 끝없이 쌓이므로, 스레드 수(SCRAPER_MAX_THREADS)와 제출해 둔 작업 수(SCRAPER_MAX_OUTSTANDING,
+# 실행 중 + 대기 중)에 상한을 둔다. 자리가 나지 않으면 새 패키지는 시작하지 않고 시간 초과로 처리한다.
+# 기본값은 gunicorn 스레드(4) 각각이 SCRAPER_CONCURRENCY개씩 동시에 조회하는 경우에 맞춘다.
+SCRAPER_MAX_THREADS = max(1, int(os.getenv("SCRAPER_MAX_THREADS", str(SCRAPER_CONCURRENCY * 4))))
+SCRAPER_MAX_OUTSTANDING = max(SCRAPER_MAX_THREADS, int(os.getenv("SCRAPER_MAX_OUTSTANDING", str(SCRAPER_MAX_THREADS * 2))))
+_detail_executor = ThreadPoolExecutor(max_workers=SCRAPER_MAX_THREADS, thread_name_prefix="scraper")
+_detail_slots = threading.BoundedSemaphore(SCRAPER_MAX_OUTSTANDING)
+
+# 앱 상세 정보 영구 캐시 설정 (SCRAPE_CACHE_PATH를 빈 값으로 두면 비활성화).
+# 기본 위치는 DATA_DIR(main.py와 같은 변수)이며, 파일은 처음 조회할 때 만든다.
+SCRAPE_CACHE_PATH = os.getenv("SCRAPE_CACHE_PATH", os.path.join(os.getenv("DATA_DIR", "data"), "scrape_cache.sqlite3"))
+SCRAPE_CACHE_MAX_AGE_SECONDS = float(os.getenv("SCRAPE_CACHE_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+
+scrape_cache = ScrapeCache(SCRAPE_CACHE_PATH, SCRAPE_CACHE_MAX_AGE_SECONDS) if SCRAPE_CACHE_PATH else None
+
+# 조회 실패 기록(negative cache) 재시도 간격: 스토어에 없는 앱은 길게, 일시적 오류는 짧게 잡는다.
+SCRAPE_NOT_FOUND_RETRY_SECONDS = float(os.getenv("SCRAPE_NOT_FOUND_RETRY_SECONDS", str(6 * 3600)))
+SCRAPE_NOT_FOUND_MAX_RETRY_SECONDS = float(os.getenv("SCRAPE_NOT_FOUND_MAX_RETRY_SECONDS", str(7 * 24 * 3600)))
+SCRAPE_ERROR_RETRY_SECONDS = float(os.getenv("SCRAPE_ERROR_RETRY_SECONDS", "60"))
+SCRAPE_ERROR_MAX_RETRY_SECONDS = float(os.getenv("SCRAPE_ERROR_MAX_RETRY_SECONDS", "3600"))
+
+# Play Store 서킷 브레이커 설정 (SCRAPER_BREAKER_MIN_CALLS=0 이면 비활성화)
+circuit_breaker = CircuitBreaker(
+    failure_ratio=float(os.getenv("SCRAPER_BREAKER_FAILURE_RATIO", "0.5")),
+    min_calls=int(os.getenv("SCRAPER_BREAKER_MIN_CALLS", "10")),
+    window=float(os.getenv("SCRAPER_BREAKER_WINDOW_SECONDS", "30")),
+    open_seconds=float(os.getenv("SCRAPER_BREAKER_OPEN_SECONDS", "30")),
+)
+
+
+class RecentFailureError(Exception):
+    """최근 조회에 실패해 재시도 시각 전까지 Play Store를 다시 호출하지 않는다."""
+
+    def __init__(self, app_id: str, reason: str, retry_at: float):
+        super().__init__(f"패키지 '{app_id}' 최근 조회 실패({reason}), {max(0.0, retry_at - time.time()):.0f}초 후 재시도")
+        self.app_id = app_id
+        self.reason = reason
+        self.retry_at = retry_at
+
+
+class DeadlineExceeded(TimeoutError):
+    """호출한 요청의 마감 시각까지 조회를 끝내지 못했다 (패키지 탓이 아니므로 실패로 기록하지 않는다)."""
+
+# 패키지별 상세 조회 지연 시간 (outcome: cache, network, stale, not_found, negative, circuit_open, error)
+SCRAPER_FETCH_SECONDS = metrics.histogram(
+    "scraper_fetch_seconds",
+    "Per-package Play Store detail lookup latency.",
+    ["outcome"],
+)
+
+
+def fetch_app_detail(app_id: str, timeout: float = None, max_retries: int = None):
+    """
+    속도 제한과 재시도(지터가 적용된 지수 백오프)를 적용해 앱 상세 정보를 가져온다.
+
+    Args:
+        app_id: Google Play 패키지 이름
+        timeout: 이 패키지에 쓸 수 있는 최대 시간(초). 재시도/대기 시간을 포함한다.
+        max_retries: 첫 시도 이후 최대 재시도 횟수
+
+    Returns:
+        google_play_scraper.app()의 상세 정보 dict
+
+    Raises:
+        마지막 시도의 예외, 시간 초과 시 TimeoutError, 서킷이 열려 있으면 CircuitOpenError
+    """
+    timeout = SCRAPER_PACKAGE_TIMEOUT if timeout is None else timeout
+    max_retries = SCRAPER_MAX_RETRIES if max_retries is None else max_retries
+    deadline = time.monotonic() + timeout
+
+    attempt = 0
+    while True:
+        # 서킷 허가를 먼저 받는다. 서킷이 열려 있거나 half-open 시험 호출이 이미 진행 중이면
+        # 속도 제한 토큰을 쓰지 않고 바로 실패한다.
+        if not circuit_breaker.allow():
+            raise CircuitOpenError("Play Store 오류율이 높아 서킷이 열려 있습니다.")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not rate_limiter.acquire(timeout=remaining):
+            # 호출하지 않았으므로 결과를 기록하지 않고 시험 호출 자리만 돌려준다.
+            circuit_breaker.cancel()
+            raise TimeoutError(f"패키지 '{app_id}' 조회 시간 초과 ({timeout:.1f}s)")
+
+        try:
+            with profiling.span("google_play_scraper.app", package=app_id, attempt=attempt):
+                detail = app(app_id=app_id, lang=LANG, country=COUNTRY)
+            circuit_breaker.record_success()
+            return detail
+        except NotFoundError:
+            # 스토어에 없는 앱은 재시도해도 결과가 같다 (업스트림은 정상 응답한 것).
+            circuit_breaker.record_success()
+            raise
+        except Exception as exc:  # pylint: disable=broad-except
+            circuit_breaker.record_failure()
+            if attempt >= max_retries:
+                raise
+            backoff = SCRAPER_BACKOFF_BASE * (2 ** attempt)
+            backoff = random.uniform(0, backoff)  # full jitter
+            if time.monotonic() + backoff >= deadline:
+                raise
+            logger.info("패키지 '%s' 재시도 %d/%d (%.2fs 후): %s", app_id, attempt + 1, max_retries, backoff, exc)
+            time.sleep(backoff)
+            attempt += 1
+
+
+def get_app_detail(app_id: str, timeout: float = None, max_age: float = None):
+    """
+    앱 상세 정보를 영구 캐시에서 먼저 찾고, 없거나 오래된 경우에만 Play Store에서 가져온다.
+
+    Args:
+        app_id: Google Play 패키지 이름
+        timeout: 네트워크 조회 시 패키지당 최대 시간(초)
+        max_age: 캐시를 신선하다고 볼 최대 나이(초). 기본값은 SCRAPE_CACHE_MAX_AGE_SECONDS
+
+    Returns:
+        google_play_scraper.app()의 상세 정보 dict
+
+    Raises:
+        최근 실패 기록의 재시도 시각 전이면 RecentFailureError (오래된 캐시가 있으면 그 값을 반환)
+    """
+    detail, _ = get_app_detail_entry(app_id, timeout, max_age)
+    return detail
+
+
+def get_app_detail_entry(app_id: str, timeout: float = None, max_age: float = None, allow_stale: bool = True):
+    """
+    get_app_detail과 같지만 상세 정보를 수집한 시각도 함께 반환한다.
+
+    Args:
+        allow_stale: False이면 갱신에 실패했을 때 오래된 캐시를 돌려주지 않고 예외를 그대로 던진다
+            (백그라운드 갱신처럼 "새로 가져온 값"만 필요한 호출용)
+
+    Returns:
+        (detail, fetched_at) 튜플. fetched_at은 Play Store에서 가져온 시각(epoch 초)으로,
+        오래된 캐시를 대신 반환했다면 그 캐시의 원래 수집 시각이다.
+    """
+    started_at = time.perf_counter()
+    outcome = "error"
+    try:
+        cached, cached_at, fresh = (None, None, False)
+        if scrape_cache is not None:
+            cached, cached_at, fresh = scrape_cache.get_entry(app_id, LANG, COUNTRY, max_age=max_age)
+            if cached is not None and fresh:
+                outcome = "cache"
+                return cached, cached_at
+            if not allow_stale:
+                cached = None
+
+            failure = scrape_cache.get_failure(app_id, LANG, COUNTRY)
+            if failure is not None:
+                if cached is not None:
+                    outcome = "stale"
+                    return cached, cached_at
+                outcome = "negative"
+                raise RecentFailureError(app_id, failure["reason"], failure["retry_at"])
+
+        try:
+            detail = fetch_app_detail(app_id, timeout)
+        except NotFoundError as exc:
+            outcome = "not_found"
+            _record_failure(app_id, "not_found", exc)
+            raise
+        except Exception as exc:  # pylint: disable=broad-except
+            if isinstance(exc, CircuitOpenError):
+                outcome = "circuit_open"
+            elif not isinstance(exc, TimeoutError):
+                # 속도 제한 대기로 인한 시간 초과는 패키지 탓이 아니므로 기록하지 않는다.
+                _record_failure(app_id, "error", exc)
+            if cached is None:
+                raise
+            # 갱신에 실패하면 오래된 캐시라도 사용한다.
+            logger.warning("패키지 '%s' 갱신 실패, 캐시된 정보를 사용합니다: %s", app_id, exc)
+            outcome = "stale"
+            return cached, cached_at
+
+        fetched_at = time.time()
+        if scrape_cache is not None:
+            fetched_at = scrape_cache.put(app_id, LANG, COUNTRY, detail)
+        outcome = "network"
+        return detail, fetched_at
+    finally:
+        SCRAPER_FETCH_SECONDS.observe(time.perf_counter() - started_at, outcome=outcome)
+        profiling.record("app_detail", started_at, package=app_id, outcome=outcome)
+
+
+def _get_app_detail_until(
+    app_id: str, timeout: float, max_age: float, deadline: float = None, allow_stale: bool = True
+):
+    """get_app_detail_entry와 같지만, 조회 시간을 요청 마감 시각(deadline, time.monotonic() 기준)까지로 줄인다."""
+    if deadline is None:
+        return get_app_detail_entry(app_id, timeout, max_age, allow_stale)
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded(f"패키지 '{app_id}' 조회 전에 요청 마감 시각이 지났습니다.")
+    if remaining >= timeout:
+        return get_app_detail_entry(app_id, timeout, max_age, allow_stale)
+    try:
+        return get_app_detail_entry(app_id, remaining, max_age, allow_stale)
+    except TimeoutError as exc:
+        raise DeadlineExceeded(f"패키지 '{app_id}' 조회가 요청 마감 시각까지 끝나지 않았습니다.") from exc
+
+
+def _record_failure(app_id: str, reason: str, exc: Exception) -> None:
+    if scrape_cache is None:
+        return
+    if reason == "not_found":
+        base_delay, max_delay = SCRAPE_NOT_FOUND_RETRY_SECONDS, SCRAPE_NOT_FOUND_MAX_RETRY_SECONDS
+    else:
+        base_delay, max_delay = SCRAPE_ERROR_RETRY_SECONDS, SCRAPE_ERROR_MAX_RETRY_SECONDS
+    try:
+        scrape_cache.record_failure(app_id, LANG, COUNTRY, reason, str(exc), base_delay, max_delay)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("패키지 '%s' 실패 기록 저장 실패", app_id)
+
+
+def _to_app_info(pkg: str, detail: dict, fetched_at: float = None) -> dict:
+    return {
+        "id": detail.get("appId", pkg),
+        "app_name": detail.get("title") or detail.get("appId", pkg),
+        "description": detail.get("description", ""),
+        "category": detail.get("genreId") or detail.get("genre"),
+        "fetched_at": fetched_at,
+    }
+
+
+def get_appnames_by_packageNames(
+    package_names: list,
+    concurrency: int = None,
+    timeout: float = None,
+    errors: dict = None,
+    max_age: float = None,
+    deadline: float = None,
+    allow_stale: bool = True,
+):
+    """
+    패키지명 목록을 받아 각 앱의 기본 정보를 동시에 조회한다.
 
     Args:
         package_names: Google Play 패키지 이름(iterable)
+        concurrency: 동시에 조회할 최대 패키지 수 (기본값: SCRAPER_CONCURRENCY, 1이면 순차 조회)
+        timeout: 패키지당 최대 조회 시간(초) (기본값: SCRAPER_PACKAGE_TIMEOUT)
+        errors: 주어지면 조회에 실패한 패키지의 예외를 {패키지명: 예외}로 채운다
+        max_age: 영구 캐시를 신선하다고 볼 최대 나이(초). 0이면 캐시를 건너뛰고 다시 가져온다 (get_app_detail 참고)
+        deadline: 호출한 요청의 마감 시각(time.monotonic() 기준). 그때까지 끝나지 않은 패키지는
+            시작하지 않거나 중단하고 errors에 DeadlineExceeded로 남긴다
+        allow_stale: False이면 갱신에 실패한 패키지를 오래된 캐시로 채우지 않고 errors에 남긴다
 
     Returns:
-        각 앱에 대한 dict 리스트. (id, app_name, description, category 포함)
+        각 앱에 대한 dict 리스트. (id, app_name, description, category, fetched_at 포함)
+        입력 순서를 유지하며, 조회에 실패한 패키지는 포함되지 않는다.
     """
     if not package_names:
         logger.warning("패키지 이름 목록이 비어 있습니다.")
         return []
 
-    results = []
-    for pkg in package_names:
-        if not pkg:
-            continue
+    packages = [pkg for pkg in package_names if pkg]
+    if not packages:
+        return []
 
-        try:
-            detail = app(app_id=pkg, lang=LANG, country=COUNTRY)
-            results.append(
-                {
-                    "id": detail.get("appId", pkg),
-                    "app_name": detail.get("title") or detail.get("appId", pkg),
-                    "description": detail.get("description", ""),
-                    "category": detail.get("genreId") or detail.get("genre"),
-                }
-            )
-            logger.info("패키지 '%s' 정보 수집 완료.", pkg)
-        except Exception as exc:  # pylint: disable=broad-except
-            logger.warning("패키지 '%s' 정보 수집 실패: %s", pkg, exc)
-            continue
+    concurrency = max(1, SCRAPER_CONCURRENCY if concurrency is None else concurrency)
+    timeout = SCRAPER_PACKAGE_TIMEOUT if timeout is None else timeout
+    workers = min(concurrency, len(packages))
+
+    # 패키지별 timeout은 fetch_app_detail 안에서 지켜지지만, 응답이 없는 호출은 중단할 수 없으므로
+    # 배치 전체에도 상한(패키지 timeout x 처리 라운드 수)을 둔다.
+    rounds = -(-len(packages) // workers)
+    batch_deadline = time.monotonic() + timeout * rounds + 1.0
+    request_bound = deadline is not None and deadline < batch_deadline
+    if request_bound:
+        batch_deadline = deadline
+
+    # 공유 풀에 이 호출의 패키지를 최대 workers개씩만 올려 둔다 (하나가 끝나면 다음 패키지를 제출).
+    futures = [None] * len(packages)
+    waiting = deque(range(len(packages)))
+    in_flight = set()
+    try:
+        while waiting or in_flight:
+            while waiting and len(in_flight) < workers:
+                remaining = batch_deadline - time.monotonic()
+                if remaining <= 0 or not _detail_slots.acquire(timeout=remaining):
+                    break
+                index = waiting.popleft()
+                future = _detail_executor.submit(
+                    profiling.bind(_get_app_detail_until), packages[index], timeout, max_age, deadline, allow_stale
+                )
+                future.add_done_callback(lambda _: _detail_slots.release())
+                futures[index] = future
+                in_flight.add(future)
+            remaining = batch_deadline - time.monotonic()
+            if not in_flight or remaining <= 0:
+                break
+            done, _ = wait(in_flight, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            in_flight -= done
 
-        time.sleep(0.2)
+        results = []
+        for pkg, future in zip(packages, futures):
+            if future is None or not future.done():
+                if future is not None:
+                    future.cancel()
+                logger.warning("패키지 '%s' 정보 수집 실패: %s 시간 초과", pkg, "요청 마감" if request_bound else "배치")
+                if errors is not None:
+                    errors[pkg] = (
+                        DeadlineExceeded(f"패키지 '{pkg}' 조회가 요청 마감 시각까지 끝나지 않았습니다.")
+                        if request_bound
+                        else TimeoutError(f"패키지 '{pkg}' 조회 시간 초과 (배치)")
+                    )
+                continue
+            try:
+                detail, fetched_at = future.result()
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning("패키지 '%s' 정보 수집 실패: %s", pkg, exc)
+                if errors is not None:
+                    errors[pkg] = exc
+                continue
+            results.append(_to_app_info(pkg, detail, fetched_at))
+            logger.info("패키지 '%s' 정보 수집 완료.", pkg)
+    finally:
+        # 아직 시작하지 않은 작업은 취소해 자리를 돌려준다 (실행 중인 호출은 끝날 때 돌려준다).
+        for future in in_flight:
+            future.cancel()
 
     logger.info("총 %d개 패키지 정보 수집 완료.", len(results))
     return results
@@ -113,12 +465,8 @@ def get_top_apps_by_category(category_key: str, category_search_term: str, num_r
                 if not app_id:
                     continue
                 
-                # 앱 상세 정보 가져오기
-                app_detail = app(
-                    app_id=app_id,
-                    lang=LANG,
-                    country=COUNTRY
-                )
+                # 앱 상세 정보 가져오기 (영구 캐시 우선, 네트워크 조회는 공용 속도 제한기를 거친다)
+                app_detail = get_app_detail(app_id)
                 
                 # 카테고리 정보 추가 (검색 결과의 genre와 상세 정보의 genreId 확인)
                 # 상세 정보에 카테고리 정보가 더 정확함
@@ -127,9 +475,6 @@ def get_top_apps_by_category(category_key: str, category_search_term: str, num_r
                 if idx % 10 == 0:
                     logger.info(f"  진행 상황: {idx}/{min(len(search_results), num_results)}개 처리 완료")
                 
-                # API 호출 제한을 피하기 위해 짧은 딜레이
-                time.sleep(0.2)
-                
             except Exception as e:
                 logger.warning(f"앱 '{result.get('title', 'Unknown')}' (ID: {result.get('appId', 'N/A')}) 상세 정보 가져오기 실패: {e}")
                 continue
@@ -169,3 +514,170 @@ def scrape_all_categories(num_per_category: int = 100):
         time.sleep(2)
     
     return all_apps
+
+
+# 크롤링 결과 파일 열 (firestore_csv_upload.py가 그대로 읽을 수 있는 형식)
+CRAWL_FIELDS = [
+    'id', 'app_name', 'description', 'category', 'category_ko',
+    'genre', 'installs', 'score', 'ratings', 'developer', 'crawl_category',
+]
+
+
+def to_crawl_record(detail: dict, app_id: str, crawl_category: str) -> dict:
+    """app() 상세 정보를 업로드용 레코드(CRAWL_FIELDS)로 변환한다.
+
+    genreId가 없으면 수집 분류 키를 Play Store 장르 ID로 바꿔 쓰고, 장르 ID가 아니면 category를 비워 둔다.
+    """
+    category = detail.get('genreId') or canonical_category(crawl_category) or ''
+    return {
+        'id': detail.get('appId', app_id),
+        'app_name': detail.get('title') or app_id,
+        'description': detail.get('description') or '',
+        'category': category,
+        'category_ko': category_ko_for(category),
+        'genre': detail.get('genre'),
+        'installs': detail.get('installs'),
+        'score': detail.get('score'),
+        'ratings': detail.get('ratings'),
+        'developer': detail.get('developer'),
+        'crawl_category': crawl_category,
+    }
+
+
+class CsvSink:
+    """크롤링 결과를 CSV로 한 줄씩 기록한다 (스레드 안전)."""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=CRAWL_FIELDS, extrasaction='ignore')
+        self._writer.writeheader()
+        self._lock = threading.Lock()
+
+    def write(self, record: dict) -> None:
+        with self._lock:
+            self._writer.writerow(record)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class JsonlSink:
+    """크롤링 결과를 JSON Lines로 한 줄씩 기록한다 (스레드 안전)."""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'w', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _search_category(category_search_term: str, num_results: int):
+    rate_limiter.acquire()
+    return search(query=category_search_term, lang=LANG, country=COUNTRY, n_hits=num_results) or []
+
+
+def crawl_categories(sink, num_per_category: int = 100, concurrency: int = None, categories: dict = None):
+    """
+    여러 카테고리를 동시에 크롤링해 결과를 sink로 바로 흘려보낸다.
+
+    - 카테고리 검색과 상세 조회가 모두 공용 속도 제한기(rate_limiter)를 거친다.
+    - 여러 카테고리 검색 결과에 같은 앱이 나오면 상세 조회는 한 번만 한다.
+    - 결과를 메모리에 모으지 않고, 진행 중인 상세 조회 수도 제한해 메모리 사용량이 일정하다.
+
+    Args:
+        sink: write(record)/close()를 가진 객체 (CsvSink, JsonlSink 등)
+        num_per_category: 카테고리당 수집할 앱 개수
+        concurrency: 동시에 진행할 상세 조회 수 (기본값: SCRAPER_CONCURRENCY)
+        categories: {카테고리 키: 검색어} (기본값: KOREAN_CATEGORIES)
+
+    Returns:
+        수집 통계 dict
+    """
+    categories = categories or KOREAN_CATEGORIES
+    concurrency = max(1, SCRAPER_CONCURRENCY if concurrency is None else concurrency)
+
+    seen = set()
+    stats = {'categories': len(categories), 'found': 0, 'duplicates': 0, 'written': 0, 'failed': 0}
+    lock = threading.Lock()
+    slots = threading.BoundedSemaphore(concurrency * 2)
+
+    def fetch_and_write(app_id: str, category_key: str) -> None:
+        try:
+            detail = get_app_detail(app_id)
+            sink.write(to_crawl_record(detail, app_id, category_key))
+            with lock:
+                stats['written'] += 1
+                written = stats['written']
+            if written % 100 == 0:
+                logger.info(f"  진행 상황: {written}개 앱 기록 완료")
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f"앱 '{app_id}' 상세 정보 가져오기 실패: {e}")
+            with lock:
+                stats['failed'] += 1
+        finally:
+            slots.release()
+
+    started_at = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="crawl-detail") as detail_pool, \
+            ThreadPoolExecutor(max_workers=min(len(categories), concurrency), thread_name_prefix="crawl-search") as search_pool:
+        search_futures = {
+            search_pool.submit(_search_category, term, num_per_category): key
+            for key, term in categories.items()
+        }
+        for future in as_completed(search_futures):
+            category_key = search_futures[future]
+            try:
+                results = future.result()
+            except Exception as e:  # pylint: disable=broad-except
+                logger.error(f"카테고리 '{category_key}' 검색 중 오류 발생: {e}")
+                continue
+
+            logger.info(f"카테고리 '{category_key}': 검색 결과 {len(results)}개")
+            for result in results[:num_per_category]:
+                app_id = result.get('appId')
+                if not app_id:
+                    continue
+                with lock:
+                    stats['found'] += 1
+                    if app_id in seen:
+                        stats['duplicates'] += 1
+                        continue
+                    seen.add(app_id)
+                slots.acquire()  # 진행 중인 상세 조회가 너무 많으면 대기
+                detail_pool.submit(fetch_and_write, app_id, category_key)
+
+    stats['elapsed_seconds'] = round(time.monotonic() - started_at, 1)
+    logger.info(
+        f"크롤링 완료: {stats['written']}개 기록, 중복 {stats['duplicates']}개 제외, "
+        f"실패 {stats['failed']}개 ({stats['elapsed_seconds']}초)"
+    )
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Google Play Store 카테고리별 상위 앱을 크롤링합니다.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    crawl = sub.add_parser('crawl', help="모든 카테고리를 동시에 크롤링해 CSV/JSONL로 저장")
+    crawl.add_argument('--out', required=True, help="출력 파일 경로")
+    crawl.add_argument('--format', choices=['csv', 'jsonl'], default=None,
+                       help="출력 형식 (기본값: 확장자로 판단, 그 외에는 csv)")
+    crawl.add_argument('--per-category', type=int, default=100, help="카테고리당 수집할 앱 개수")
+    crawl.add_argument('--concurrency', type=int, default=None, help="동시에 진행할 상세 조회 수")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('jsonl' if args.out.endswith('.jsonl') else 'csv')
+    sink = JsonlSink(args.out) if fmt == 'jsonl' else CsvSink(args.out)
+    try:
+        crawl_categories(sink, num_per_category=args.per_category, concurrency=args.concurrency)
+    finally:
+        sink.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows 등 fcntl이 없는 환경
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+BatchFn = Callable[[List[Hashable]], Dict[Hashable, Any]]
+
+
+class _Call:
+    """진행 중인 키 하나에 대한 호출 상태."""
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: Any = None
+        self.found = False
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """같은 키에 대한 동시 호출을 하나로 합친다 (Go의 singleflight와 같은 개념).
+
+    프로세스 내부에서는 먼저 도착한 호출(leader)만 실제 작업을 수행하고,
+    나머지 호출은 그 결과를 기다린다. lock_dir를 지정하면 파일 잠금(fcntl.flock)으로
+    같은 호스트의 다른 워커 프로세스와도 작업을 나누며, 잠금을 얻지 못한 쪽은
+    잠금이 풀린 뒤 recheck 함수로 공유 저장소를 다시 조회한다.
+    """
+
+    def __init__(self, wait_timeout: float = 60.0, lock_dir: Optional[str] = None) -> None:
+        self.wait_timeout = wait_timeout
+        self.lock_dir = lock_dir if (lock_dir and fcntl is not None) else None
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.leader_keys = 0
+        self.shared_keys = 0
+
+    def do_many(
+        self,
+        keys: List[Hashable],
+        fn: BatchFn,
+        recheck: Optional[BatchFn] = None,
+        deadline: Optional[float] = None,
+    ) -> Tuple[Dict[Hashable, Any], Dict[Hashable, BaseException]]:
+        """여러 키를 한 번에 처리한다.
+
+        Args:
+            keys: 처리할 키 목록
+            fn: 키 목록을 받아 {키: 값}을 반환하는 실제 작업. 결과에 없는 키는 "값 없음"으로 본다.
+            recheck: 다른 프로세스가 작업을 끝낸 뒤 공유 저장소에서 값을 다시 읽는 함수 (선택)
+            deadline: 다른 호출의 결과를 기다리는 마감 시각 (time.monotonic() 기준, 기본값: 지금부터 wait_timeout)
+
+        Returns:
+            (values, errors). values에는 값이 있는 키만, errors에는 실패한 키의 예외가 담긴다.
+        """
+        owned: Dict[Hashable, _Call] = {}
+        waiting: Dict[Hashable, _Call] = {}
+
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                call = self._calls.get(key)
+                if call is not None:
+                    waiting[key] = call
+                    continue
+                call = _Call()
+                self._calls[key] = call
+                owned[key] = call
+            self.leader_keys += len(owned)
+            self.shared_keys += len(waiting)
+
+        values: Dict[Hashable, Any] = {}
+        errors: Dict[Hashable, BaseException] = {}
+
+        if owned:
+            try:
+                self._run_owned(owned, fn, recheck, deadline)
+            finally:
+                with self._lock:
+                    for key, call in owned.items():
+                        if self._calls.get(key) is call:
+                            del self._calls[key]
+                for call in owned.values():
+                    call.event.set()
+
+        if waiting:
+            logger.info("Waiting on %d in-flight key(s) owned by another request.", len(waiting))
+
+        wait_deadline = self._wait_deadline(deadline)
+        for key, call in list(owned.items()) + list(waiting.items()):
+            if not call.event.wait(max(0.0, wait_deadline - time.monotonic())):
+                errors[key] = TimeoutError(f"Timed out waiting for in-flight fetch of '{key}'.")
+            elif call.error is not None:
+                errors[key] = call.error
+            elif call.found:
+                values[key] = call.value
+
+        return values, errors
+
+    def _wait_deadline(self, deadline: Optional[float]) -> float:
+        wait_deadline = time.monotonic() + self.wait_timeout
+        return wait_deadline if deadline is None else min(wait_deadline, deadline)
+
+    def _run_owned(
+        self,
+        owned: Dict[Hashable, _Call],
+        fn: BatchFn,
+        recheck: Optional[BatchFn],
+        deadline: Optional[float] = None,
+    ) -> None:
+        lock_files: Dict[Hashable, int] = {}
+        contended: List[Hashable] = []
+        try:
+            if self.lock_dir:
+                for key in owned:
+                    fd = self._try_file_lock(key)
+                    if fd is None:
+                        contended.append(key)
+                    else:
+                        lock_files[key] = fd
+                to_fetch = list(lock_files)
+            else:
+                to_fetch = list(owned)
+
+            if to_fetch:
+                self._fill(owned, to_fetch, fn)
+
+            if contended:
+                self._wait_for_other_process(owned, contended, fn, recheck, deadline)
+        finally:
+            for fd in lock_files.values():
+                self._release_file_lock(fd)
+
+    @staticmethod
+    def _fill(owned: Dict[Hashable, _Call], keys: List[Hashable], fn: BatchFn) -> None:
+        try:
+            result = fn(keys)
+        except BaseException as exc:  # pylint: disable=broad-except
+            for key in keys:
+                owned[key].error = exc
+            return
+        for key in keys:
+            if key in result:
+                owned[key].value = result[key]
+                owned[key].found = True
+
+    def _wait_for_other_process(
+        self,
+        owned: Dict[Hashable, _Call],
+        keys: List[Hashable],
+        fn: BatchFn,
+        recheck: Optional[BatchFn],
+        deadline: Optional[float] = None,
+    ) -> None:
+        """다른 프로세스가 잠근 키는 잠금이 풀릴 때까지 기다린 뒤 공유 저장소를 다시 조회한다."""
+        logger.info("Waiting on %d key(s) being fetched by another worker process.", len(keys))
+        wait_deadline = self._wait_deadline(deadline)
+        remaining_keys: List[Hashable] = []
+        for key in keys:
+            fd = self._try_file_lock(key, deadline=wait_deadline)
+            if fd is not None:
+                self._release_file_lock(fd)
+            remaining_keys.append(key)
+
+        if recheck is not None:
+            try:
+                rechecked = recheck(remaining_keys)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Recheck after cross-process wait failed")
+                rechecked = {}
+            for key in list(remaining_keys):
+                if key in rechecked:
+                    owned[key].value = rechecked[key]
+                    owned[key].found = True
+                    remaining_keys.remove(key)
+
+        # 다른 프로세스의 작업이 실패했거나 recheck가 없으면 직접 가져온다.
+        if remaining_keys:
+            self._fill(owned, remaining_keys, fn)
+
+    def _lock_path(self, key: Hashable) -> str:
+        name = hashlib.sha1(str(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.lock_dir or "", f"{name}.lock")
+
+    def _try_file_lock(self, key: Hashable, deadline: Optional[float] = None) -> Optional[int]:
+        """키의 파일 잠금을 얻는다. deadline이 없으면 한 번만 시도한다."""
+        fd = os.open(self._lock_path(key), os.O_CREAT | os.O_RDWR, 0o644)
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                if deadline is None or time.monotonic() >= deadline:
+                    os.close(fd)
+                    return None
+                time.sleep(0.05)
+
+    @staticmethod
+    def _release_file_lock(fd: int) -> None:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "leader_keys": self.leader_keys,
+                "shared_keys": self.shared_keys,
+                "cross_process": bool(self.lock_dir),
+            }
@@ -0,0 +1,219 @@
+"""apps 컬렉션의 로컬 스냅샷 파일 (읽기 전용, mmap 공유).
+
+파일 형식 (리틀 엔디언):
+    header  : magic(8) b"APPSNAP1" | count(u32) | reserved(u32) | index_offset(u64)
+    records : key_len(u16) | key(utf-8) | payload_len(u32) | payload(JSON utf-8)
+    index   : count x record_offset(u64), 키 순으로 정렬
+
+조회는 mmap 위에서 인덱스를 이진 탐색하므로 파일 전체를 메모리에 올리지 않으며,
+같은 파일을 여는 gunicorn 워커들은 OS 페이지 캐시를 공유한다.
+
+사용법:
+    python snapshot.py build --csv playstore_apps.csv --out apps.snapshot
+    python snapshot.py build --firestore --out apps.snapshot
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"APPSNAP1"
+_HEADER = struct.Struct("<8sIIQ")
+_KEY_LEN = struct.Struct("<H")
+_PAYLOAD_LEN = struct.Struct("<I")
+_OFFSET = struct.Struct("<Q")
+
+# 스냅샷에 저장하는 AppRecord 필드
+SNAPSHOT_FIELDS = ("app_name", "description", "category", "category_ko", "fetched_at")
+
+
+class AppSnapshot:
+    """mmap으로 연 스냅샷 파일. 스레드 간에 안전하게 공유할 수 있다 (읽기 전용)."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count, _, self._index_offset = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"'{path}' is not an app snapshot file.")
+        self.loaded_at = time.time()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _record_at(self, i: int) -> Tuple[bytes, int]:
+        (offset,) = _OFFSET.unpack_from(self._mm, self._index_offset + i * _OFFSET.size)
+        (key_len,) = _KEY_LEN.unpack_from(self._mm, offset)
+        key_start = offset + _KEY_LEN.size
+        return self._mm[key_start:key_start + key_len], key_start + key_len
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        target = key.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key, payload_pos = self._record_at(mid)
+            if mid_key < target:
+                lo = mid + 1
+            elif mid_key > target:
+                hi = mid
+            else:
+                (payload_len,) = _PAYLOAD_LEN.unpack_from(self._mm, payload_pos)
+                start = payload_pos + _PAYLOAD_LEN.size
+                return json.loads(self._mm[start:start + payload_len])
+        return None
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        found: Dict[str, Dict[str, Any]] = {}
+        for key in keys:
+            row = self.get(key)
+            if row is not None:
+                found[key] = row
+        return found
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def write_snapshot(rows: Iterable[Tuple[str, Dict[str, Any]]], out_path: str) -> int:
+    """(id, row) 목록으로 스냅샷 파일을 만든다. 같은 id가 여러 번 나오면 마지막 값을 쓴다.
+
+    임시 파일에 쓴 뒤 os.replace로 교체하므로, 파일을 읽는 워커는 항상 완전한 스냅샷만 본다.
+    """
+    tmp_path = f"{out_path}.tmp.{os.getpid()}"
+    offsets: Dict[bytes, int] = {}
+
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, 0, 0, 0))
+        for key, row in rows:
+            key_bytes = key.encode("utf-8")
+            payload = json.dumps(
+                {field: row.get(field) for field in SNAPSHOT_FIELDS},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode("utf-8")
+            offsets[key_bytes] = f.tell()
+            f.write(_KEY_LEN.pack(len(key_bytes)))
+            f.write(key_bytes)
+            f.write(_PAYLOAD_LEN.pack(len(payload)))
+            f.write(payload)
+
+        index_offset = f.tell()
+        for key_bytes in sorted(offsets):
+            f.write(_OFFSET.pack(offsets[key_bytes]))
+
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, len(offsets), 0, index_offset))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, out_path)
+    return len(offsets)
+
+
+class SnapshotHolder:
+    """현재 스냅샷을 들고 있다가 파일이 바뀌면 원자적으로 교체한다.
+
+    읽는 쪽은 `holder.current`를 지역 변수로 잡아 쓰면 되고, 교체된 이전 스냅샷은
+    참조가 모두 사라질 때 닫힌다.
+    """
+
+    def __init__(self, path: Optional[str], check_interval: float = 30.0) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        self.current: Optional[AppSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        if path:
+            self.reload()
+
+    def reload(self) -> bool:
+        """스냅샷 파일을 다시 연다. 성공하면 True."""
+        if not self.path:
+            return False
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                snapshot = AppSnapshot(self.path)
+            except (OSError, ValueError) as exc:
+                logger.warning("Could not load app snapshot '%s': %s", self.path, exc)
+                return False
+            self.current = snapshot
+        logger.info("Loaded app snapshot '%s' (%d records).", self.path, len(snapshot))
+        return True
+
+    def maybe_reload(self) -> None:
+        """check_interval마다 파일이 교체되었는지 확인하고, 바뀌었으면 다시 연다."""
+        if not self.path or time.monotonic() - self._checked_at < self.check_interval:
+            return
+        self._checked_at = time.monotonic()
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return
+        current = self.current
+        if current is None or current.identity != (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+            self.reload()
+
+    def stats(self) -> Dict[str, Any]:
+        current = self.current
+        return {
+            "path": self.path,
+            "records": len(current) if current is not None else 0,
+            "loaded_at": current.loaded_at if current is not None else None,
+        }
+
+
+def _iter_csv_rows(csv_path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    from firestore_csv_upload import DOCUMENT_ID_COLUMN
+
+    with open(csv_path, mode="r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            doc_id = row.get(DOCUMENT_ID_COLUMN)
+            if doc_id:
+                yield doc_id, row
+
+
+def _iter_firestore_rows() -> Iterator[Tuple[str, Dict[str, Any]]]:
+    from firestore_csv_upload import FIRESTORE_COLLECTION, init_firestore
+
+    db = init_firestore()
+    query = db.collection(FIRESTORE_COLLECTION).select(list(SNAPSHOT_FIELDS))
+    for snap in query.stream():
+        yield snap.id, snap.to_dict() or {}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="apps 컬렉션 스냅샷 파일을 만듭니다.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="CSV 또는 Firestore에서 스냅샷을 만듭니다.")
+    source = build.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="firestore_csv_upload.py가 사용하는 CSV 파일")
+    source.add_argument("--firestore", action="store_true", help="Firestore apps 컬렉션 전체를 읽어 만듭니다.")
+    build.add_argument("--out", required=True, help="출력 스냅샷 파일 경로")
+    args = parser.parse_args(argv)
+
+    started_at = time.monotonic()
+    rows = _iter_csv_rows(args.csv) if args.csv else _iter_firestore_rows()
+    count = write_snapshot(rows, args.out)
+    logger.info("스냅샷 '%s' 생성 완료: %d개 레코드 (%.1fs)", args.out, count, time.monotonic() - started_at)
+
+
+if __name__ == "__main__":
+    main()
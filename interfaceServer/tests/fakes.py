@@ -0,0 +1,243 @@
+"""테스트와 벤치마크용 인프로세스 Firestore / Google Play Store 대역(fake).
+
+실제 네트워크 없이 지연 시간과 오류율을 설정할 수 있어, 동작과 성능 변경을 오프라인에서 재현 가능하게 확인한다.
+bench/는 이미지에 포함되지 않으므로 테스트가 함께 쓰는 이 모듈은 tests/에 둔다.
+"""
+from __future__ import annotations
+
+import hashlib
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from google_play_scraper.exceptions import NotFoundError
+
+GENRES = [
+    "GAME_ACTION", "GAME_PUZZLE", "COMMUNICATION", "SOCIAL", "PRODUCTIVITY", "PHOTOGRAPHY",
+    "VIDEO_PLAYERS", "ENTERTAINMENT", "MUSIC_AND_AUDIO", "SHOPPING", "FOOD_AND_DRINK",
+    "TRAVEL_AND_LOCAL", "NEWS_AND_MAGAZINES", "EDUCATION", "FINANCE", "TOOLS",
+]
+
+
+def _stable_index(key: str, modulo: int) -> int:
+    return int(hashlib.md5(key.encode("utf-8")).hexdigest(), 16) % modulo
+
+
+class _Latency:
+    """고정 지연 + 지터, 오류율을 흉내낸다."""
+
+    def __init__(self, latency_ms: float, jitter_ms: float, error_rate: float, seed: Optional[int]) -> None:
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise RuntimeError("injected upstream error")
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id: str, data: Optional[Dict[str, Any]]) -> None:
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocumentReference:
+    def __init__(self, client: "FakeFirestoreClient", collection: str, doc_id: str) -> None:
+        self._client = client
+        self._collection = collection
+        self.id = doc_id
+
+    def _read(self, field_paths: Optional[Iterable[str]] = None) -> FakeSnapshot:
+        data = self._client.data.get(self._collection, {}).get(self.id)
+        if data is not None and field_paths is not None:
+            data = {key: value for key, value in data.items() if key in set(field_paths)}
+        return FakeSnapshot(self.id, data)
+
+    def _write(self, payload: Dict[str, Any], merge: bool) -> None:
+        with self._client.lock:
+            docs = self._client.data.setdefault(self._collection, {})
+            current = docs.get(self.id) if merge else None
+            docs[self.id] = {**(current or {}), **payload}
+
+    def get(self, field_paths: Optional[Iterable[str]] = None) -> FakeSnapshot:
+        self._client.rpc("get")
+        return self._read(field_paths)
+
+    def set(self, payload: Dict[str, Any], merge: bool = False) -> None:
+        self._client.rpc("set")
+        self._write(payload, merge)
+
+    def delete(self) -> None:
+        self._client.rpc("delete")
+        with self._client.lock:
+            self._client.data.get(self._collection, {}).pop(self.id, None)
+
+
+class FakeQuery:
+    def __init__(
+        self,
+        client: "FakeFirestoreClient",
+        collection: str,
+        field_paths: Optional[List[str]] = None,
+        order: Optional[Tuple[str, bool]] = None,
+        limit_count: Optional[int] = None,
+    ) -> None:
+        self._client = client
+        self._collection = collection
+        self._field_paths = field_paths
+        self._order = order
+        self._limit = limit_count
+
+    def _copy(self, **changes: Any) -> "FakeQuery":
+        state = {"field_paths": self._field_paths, "order": self._order, "limit_count": self._limit, **changes}
+        return FakeQuery(self._client, self._collection, **state)
+
+    def select(self, field_paths: List[str]) -> "FakeQuery":
+        return self._copy(field_paths=list(field_paths))
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> "FakeQuery":
+        return self._copy(order=(field_path, direction == "DESCENDING"))
+
+    def limit(self, count: int) -> "FakeQuery":
+        return self._copy(limit_count=count)
+
+    def stream(self) -> Iterable[FakeSnapshot]:
+        self._client.rpc("stream")
+        docs = self._client.data.get(self._collection, {})
+        doc_ids = list(docs)
+        if self._order is not None:
+            field_path, descending = self._order
+            # Firestore처럼 정렬 필드가 없는 문서는 결과에서 빠진다.
+            doc_ids = sorted(
+                (doc_id for doc_id in doc_ids if docs[doc_id].get(field_path) is not None),
+                key=lambda doc_id: docs[doc_id][field_path],
+                reverse=descending,
+            )
+        if self._limit is not None:
+            doc_ids = doc_ids[:self._limit]
+        for doc_id in doc_ids:
+            yield FakeDocumentReference(self._client, self._collection, doc_id)._read(self._field_paths)
+
+
+class FakeCollectionReference(FakeQuery):
+    def document(self, doc_id: str) -> FakeDocumentReference:
+        return FakeDocumentReference(self._client, self._collection, doc_id)
+
+
+class FakeWriteBatch:
+    def __init__(self, client: "FakeFirestoreClient") -> None:
+        self._client = client
+        self._ops: List[Any] = []
+
+    def set(self, ref: FakeDocumentReference, payload: Dict[str, Any], merge: bool = False) -> None:
+        self._ops.append((ref, payload, merge))
+
+    def delete(self, ref: FakeDocumentReference) -> None:
+        self._ops.append((ref, None, False))
+
+    def commit(self) -> List[Any]:
+        if len(self._ops) > 500:
+            raise ValueError("maximum 500 writes allowed per request")
+        self._client.rpc("commit")
+        for ref, payload, merge in self._ops:
+            if payload is None:
+                with self._client.lock:
+                    self._client.data.get(ref._collection, {}).pop(ref.id, None)
+            else:
+                ref._write(payload, merge)
+        return []
+
+
+class FakeFirestoreClient:
+    """firestore.Client 중 이 서비스가 쓰는 부분만 구현한 인메모리 대역."""
+
+    project = "bench"
+
+    def __init__(self, latency_ms: float = 5.0, jitter_ms: float = 2.0, error_rate: float = 0.0, seed: Optional[int] = None) -> None:
+        self.data: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+        self._latency = _Latency(latency_ms, jitter_ms, error_rate, seed)
+
+    def rpc(self, name: str) -> None:
+        with self.lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        self._latency.wait()
+
+    def collection(self, name: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, name)
+
+    def get_all(self, references: Iterable[FakeDocumentReference], field_paths: Optional[Iterable[str]] = None, **_: Any):
+        self.rpc("get_all")
+        return [ref._read(field_paths) for ref in references]
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch(self)
+
+    def seed(self, collection: str, docs: Dict[str, Dict[str, Any]]) -> None:
+        with self.lock:
+            self.data.setdefault(collection, {}).update(docs)
+
+
+class FakePlayStore:
+    """google_play_scraper.app / search 대역. 패키지명으로 결정적인 장르를 돌려준다."""
+
+    def __init__(
+        self,
+        latency_ms: float = 300.0,
+        jitter_ms: float = 100.0,
+        error_rate: float = 0.0,
+        not_found_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self._latency = _Latency(latency_ms, jitter_ms, error_rate, seed)
+        self.not_found_rate = not_found_rate
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def app(self, app_id: str, lang: str = "ko", country: str = "kr") -> Dict[str, Any]:
+        with self._lock:
+            self.calls += 1
+        self._latency.wait()
+        if _stable_index(app_id, 10_000) < self.not_found_rate * 10_000:
+            raise NotFoundError(f"App not found(404): {app_id}")
+        genre_id = GENRES[_stable_index(app_id, len(GENRES))]
+        return {
+            "appId": app_id,
+            "title": f"App {app_id.rsplit('.', 1)[-1]}",
+            "description": f"Benchmark description for {app_id}. " * 20,
+            "genreId": genre_id,
+            "genre": genre_id.title(),
+            "installs": "1,000,000+",
+            "score": 4.2,
+        }
+
+    def search(self, query: str, lang: str = "ko", country: str = "kr", n_hits: int = 30) -> List[Dict[str, Any]]:
+        self._latency.wait()
+        return [{"appId": f"com.bench.{_stable_index(query, 1000)}.{i}", "title": f"{query} {i}"} for i in range(n_hits)]
+
+
+def install(firestore_client: FakeFirestoreClient, play_store: FakePlayStore) -> None:
+    """main/scraper 모듈을 import 하기 전에 호출해 Firebase 초기화와 Play Store 호출을 대역으로 바꾼다."""
+    import firebase_admin
+    from firebase_admin import firestore
+
+    import scraper
+
+    firebase_admin._apps.setdefault("[DEFAULT]", object())  # type: ignore[attr-defined]
+    firestore.client = lambda *args, **kwargs: firestore_client  # type: ignore[assignment]
+    scraper.app = play_store.app
+    scraper.search = play_store.search
@@ -0,0 +1,28 @@
+"""main 모듈을 인메모리 Firestore / Play Store 대역으로 불러오는 테스트 도우미.
+
+main은 import 시점에 환경 변수를 읽으므로, 처음 불러오기 전에 테스트용 설정을 채운다.
+같은 프로세스의 테스트 모듈은 모두 같은 main과 Firestore 대역을 공유한다.
+"""
+import os
+import tempfile
+
+from tests.fakes import FakeFirestoreClient, FakePlayStore, install
+
+_loaded = None
+
+
+def load_main():
+    """(main 모듈, FakeFirestoreClient)를 반환한다."""
+    global _loaded
+    if _loaded is None:
+        data_dir = tempfile.mkdtemp(prefix="interface-server-test-")
+        os.environ.setdefault("SCRAPE_CACHE_PATH", "")
+        os.environ.setdefault("CLASSIFY_JOB_DB_PATH", os.path.join(data_dir, "classify_jobs.sqlite3"))
+        os.environ.setdefault("SCRAPER_MAX_RETRIES", "0")
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        db = FakeFirestoreClient(latency_ms=0, jitter_ms=0)
+        install(db, FakePlayStore(latency_ms=0, jitter_ms=0))
+        import main  # pylint: disable=import-outside-toplevel
+
+        _loaded = (main, db)
+    return _loaded
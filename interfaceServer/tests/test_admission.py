@@ -0,0 +1,110 @@
+"""AdmissionPool / AsyncAdmissionPool 부하 차단 테스트."""
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from admission import AdmissionPool, AsyncAdmissionPool, OverloadedError  # noqa: E402
+
+
+class AdmissionPoolTest(unittest.TestCase):
+    def test_rejects_when_queue_is_full(self):
+        pool = AdmissionPool("test", 1, max_queue=0, status=503, retry_after=4)
+        pool.acquire()
+        with self.assertRaises(OverloadedError) as ctx:
+            pool.acquire()
+        self.assertEqual((ctx.exception.pool, ctx.exception.status, ctx.exception.retry_after), ("test", 503, 4))
+        pool.release()
+        pool.acquire()
+        self.assertEqual(pool.stats()["rejected"], 1)
+
+    def test_rejects_after_queue_timeout(self):
+        pool = AdmissionPool("test", 1, max_queue=1, queue_timeout=0.05, status=429)
+        pool.acquire()
+        started = time.monotonic()
+        with self.assertRaises(OverloadedError) as ctx:
+            pool.acquire()
+        self.assertEqual(ctx.exception.status, 429)
+        self.assertGreaterEqual(time.monotonic() - started, 0.04)
+
+    def test_request_deadline_shortens_wait(self):
+        pool = AdmissionPool("test", 1, max_queue=1, queue_timeout=5)
+        pool.acquire()
+        started = time.monotonic()
+        with self.assertRaises(OverloadedError):
+            pool.acquire(deadline=time.monotonic() + 0.05)
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_queued_request_is_admitted_on_release(self):
+        pool = AdmissionPool("test", 1, max_queue=1, queue_timeout=5)
+        pool.acquire()
+        admitted = threading.Event()
+
+        def waiter():
+            with pool.admit():
+                admitted.set()
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        time.sleep(0.05)
+        self.assertEqual(pool.stats()["waiting"], 1)
+        pool.release()
+        thread.join(5)
+        self.assertTrue(admitted.is_set())
+        self.assertEqual((pool.stats()["active"], pool.stats()["admitted"]), (0, 2))
+
+    def test_disabled_pool_never_rejects(self):
+        pool = AdmissionPool("test", 0)
+        for _ in range(3):
+            pool.acquire()
+        self.assertEqual(pool.stats()["active"], 0)
+
+
+class AsyncAdmissionPoolTest(unittest.TestCase):
+    def test_rejects_when_queue_is_full(self):
+        async def scenario():
+            pool = AsyncAdmissionPool("async", 1, max_queue=0, status=503)
+            await pool.acquire()
+            with self.assertRaises(OverloadedError):
+                await pool.acquire()
+            pool.release()
+            await pool.acquire()
+            return pool.stats()
+
+        stats = asyncio.run(scenario())
+        self.assertEqual((stats["active"], stats["rejected"]), (1, 1))
+
+    def test_rejects_after_queue_timeout(self):
+        async def scenario():
+            pool = AsyncAdmissionPool("async", 1, max_queue=1, queue_timeout=0.05, status=429)
+            await pool.acquire()
+            with self.assertRaises(OverloadedError) as ctx:
+                await pool.acquire()
+            return ctx.exception.status, pool.stats()["waiting"]
+
+        self.assertEqual(asyncio.run(scenario()), (429, 0))
+
+    def test_queued_request_is_admitted_on_release(self):
+        async def scenario():
+            pool = AsyncAdmissionPool("async", 1, max_queue=1, queue_timeout=5)
+            await pool.acquire()
+
+            async def waiter():
+                async with pool.admit():
+                    return True
+
+            task = asyncio.create_task(waiter())
+            await asyncio.sleep(0.01)
+            waiting = pool.stats()["waiting"]
+            pool.release()
+            return waiting, await task, pool.stats()["active"]
+
+        self.assertEqual(asyncio.run(scenario()), (1, True, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Flask 앱 경로(관리용 경로 인증, /classify 응답 캐시/ETag) 테스트 (인메모리 Firestore / Play Store 대역 사용)."""
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.server import load_main  # noqa: E402
+
+main, _DB = load_main()
+
+import profiling  # noqa: E402
+
+
+class AdminPathTest(unittest.TestCase):
+    def setUp(self):
+        self.client = main.app.test_client()
+
+    def test_admin_paths_are_closed_without_debug_token(self):
+        with mock.patch.object(profiling, "DEBUG_TOKEN", None):
+            self.assertEqual(self.client.get("/cache/stats").status_code, 404)
+            self.assertEqual(self.client.post("/snapshot/reload").status_code, 404)
+            self.assertEqual(self.client.get("/health").status_code, 200)
+
+    def test_admin_paths_require_matching_token(self):
+        with mock.patch.object(profiling, "DEBUG_TOKEN", "secret"):
+            self.assertEqual(self.client.get("/cache/stats").status_code, 403)
+            self.assertEqual(self.client.get("/cache/stats", headers={"X-Debug-Token": "wrong"}).status_code, 403)
+            response = self.client.get("/cache/stats", headers={"X-Debug-Token": "secret"})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("admission", response.get_json())
+
+
+class ClassifyResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.client = main.app.test_client()
+        _DB.seed("apps", {
+            "com.etag.a": {"id": "com.etag.a", "app_name": "A", "description": "", "category": "TOOLS", "category_ko": "도구"},
+            "com.etag.b": {"id": "com.etag.b", "app_name": "B", "description": "", "category": "GAME_ACTION"},
+        })
+        self.body = {"apps": [{"package_name": "com.etag.a"}, {"package_name": "com.etag.b"}]}
+
+    def test_repeated_request_is_served_from_response_cache(self):
+        first = self.client.post("/classify", json=self.body)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers["Cache-Control"], "private, no-cache")
+        calls = dict(_DB.calls)
+
+        second = self.client.post("/classify", json=self.body)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second.headers["ETag"], first.headers["ETag"])
+        self.assertEqual(_DB.calls, calls)
+
+    def test_matching_if_none_match_returns_304(self):
+        etag = self.client.post("/classify", json=self.body).headers["ETag"]
+        response = self.client.post("/classify", json=self.body, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+
+    def test_different_order_is_a_different_response(self):
+        first = self.client.post("/classify", json=self.body)
+        reordered = self.client.post("/classify", json={"apps": self.body["apps"][::-1]})
+        self.assertNotEqual(reordered.headers["ETag"], first.headers["ETag"])
+        self.assertEqual([result["package_name"] for result in reordered.get_json()["results"]],
+                         ["com.etag.b", "com.etag.a"])
+        # category_ko가 비어 있는 레코드는 매핑 표로 채운다.
+        self.assertTrue(reordered.get_json()["results"][0]["category_ko"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""firestore_csv_upload 체크포인트 / 델타 업로드 회귀 테스트 (인메모리 Firestore 대역 사용).
+
+실행 (interfaceServer 디렉터리에서):
+    python -m pytest -q tests
+    python -m unittest discover -s tests -t .
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import firestore_csv_upload as upload  # noqa: E402
+from tests.fakes import FakeFirestoreClient  # noqa: E402
+
+
+class DeltaUploadTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+        self.csv_path = os.path.join(self.dir, "apps.csv")
+        self.manifest_path = os.path.join(self.dir, "apps.manifest.sqlite3")
+        self.checkpoint_path = upload.default_checkpoint_path(self.csv_path)
+        self.db = FakeFirestoreClient(latency_ms=0, jitter_ms=0)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write_csv(self, rows):
+        with open(self.csv_path, "w", encoding="utf-8", newline="") as f:
+            f.write("id,title\n")
+            for doc_id, title in rows:
+                f.write(f"{doc_id},{title}\n")
+
+    def run_upload(self, **kwargs):
+        return upload.upload_csv_to_firestore(
+            self.csv_path, batch_size=1, parallel=1, db=self.db,
+            delta=True, manifest_path=self.manifest_path, **kwargs,
+        )
+
+    def titles(self):
+        return {doc_id: doc["title"] for doc_id, doc in self.db.data.get(upload.FIRESTORE_COLLECTION, {}).items()}
+
+    def test_second_upload_picks_up_modified_early_row(self):
+        self.write_csv([("a", "A"), ("b", "B"), ("c", "C")])
+        self.assertTrue(self.run_upload(delete_missing=True))
+        self.assertFalse(os.path.exists(self.checkpoint_path))
+
+        self.write_csv([("a", "A"), ("b", "B-changed"), ("c", "C")])
+        self.assertTrue(self.run_upload(delete_missing=True))
+
+        self.assertEqual(self.titles(), {"a": "A", "b": "B-changed", "c": "C"})
+
+    def test_leftover_checkpoint_does_not_skip_rows_or_delete_them(self):
+        self.write_csv([("a", "A"), ("b", "B"), ("c", "C")])
+        self.assertTrue(self.run_upload())
+        # 이전 실행이 중간에 끊겨 체크포인트가 남아 있는 상황
+        upload.save_checkpoint(self.checkpoint_path, self.csv_path, 2, 2, upload.csv_fingerprint(self.csv_path))
+
+        self.write_csv([("a", "A-changed"), ("b", "B"), ("c", "C"), ("d", "D")])
+        self.assertTrue(self.run_upload(delete_missing=True))
+
+        self.assertEqual(self.titles(), {"a": "A-changed", "b": "B", "c": "C", "d": "D"})
+        self.assertFalse(os.path.exists(self.checkpoint_path))
+
+    def test_delete_missing_removes_only_dropped_rows(self):
+        self.write_csv([("a", "A"), ("b", "B"), ("c", "C")])
+        self.assertTrue(self.run_upload())
+
+        self.write_csv([("a", "A"), ("c", "C")])
+        self.assertTrue(self.run_upload(delete_missing=True))
+
+        self.assertEqual(self.titles(), {"a": "A", "c": "C"})
+
+    def test_reupload_keeps_fields_written_by_the_server(self):
+        self.write_csv([("a", "A")])
+        self.db.seed(upload.FIRESTORE_COLLECTION, {"a": {"id": "a", "title": "old", "fetched_at": 1700000000.0}})
+        self.assertTrue(self.run_upload())
+
+        doc = self.db.data[upload.FIRESTORE_COLLECTION]["a"]
+        self.assertEqual(doc["title"], "A")
+        self.assertEqual(doc["fetched_at"], 1700000000.0)
+
+
+class CheckpointTest(unittest.TestCase):
+    def test_checkpoint_for_changed_file_is_ignored(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "apps.csv")
+            checkpoint_path = upload.default_checkpoint_path(csv_path)
+            with open(csv_path, "w", encoding="utf-8") as f:
+                f.write("id,title\na,A\nb,B\n")
+            upload.save_checkpoint(checkpoint_path, csv_path, 1, 1, upload.csv_fingerprint(csv_path))
+            self.assertEqual(upload.load_checkpoint(checkpoint_path, csv_path), 1)
+
+            with open(csv_path, "w", encoding="utf-8") as f:
+                f.write("id,title\na,A-changed\nb,B\n")
+            self.assertEqual(upload.load_checkpoint(checkpoint_path, csv_path), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""JobStore / JobManager 중복 제거, heartbeat, 대기열 상한 테스트."""
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jobs  # noqa: E402
+from admission import OverloadedError  # noqa: E402
+
+
+class JobManagerTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "jobs.sqlite3")
+        self.gate = threading.Event()
+        self.managers = []
+
+    def tearDown(self):
+        self.gate.set()
+        for manager in self.managers:
+            manager.close()
+        self._tmp.cleanup()
+
+    def runner(self, job):
+        self.gate.wait(5)
+        for package_name in job.package_names:
+            job.add_result(package_name, {"package_name": package_name, "error": "boom" if package_name == "bad" else None})
+
+    def make_manager(self, **kwargs):
+        kwargs.setdefault("max_workers", 1)
+        manager = jobs.JobManager(self.runner, self.path, **kwargs)
+        self.managers.append(manager)
+        return manager
+
+    def wait_finished(self, job):
+        deadline = time.monotonic() + 5
+        while not job.finished and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return job.status
+
+    def test_store_file_is_created_on_first_use(self):
+        path = os.path.join(self._tmp.name, "nested", "jobs.sqlite3")
+        store = jobs.JobStore(path, ttl=600, stale_after=600)
+        self.assertFalse(os.path.exists(os.path.dirname(path)))
+        self.assertIsNone(store.load("missing"))
+        self.assertTrue(os.path.exists(path))
+
+    def test_same_package_set_is_deduplicated_across_managers(self):
+        first, created = self.make_manager().submit(["a", "b"])
+        self.assertTrue(created)
+        shared, created = self.make_manager().submit(["b", "a", "a"])
+        self.assertFalse(created)
+        self.assertEqual(shared.id, first.id)
+
+        self.gate.set()
+        self.assertEqual(self.wait_finished(first), jobs.JOB_DONE)
+        again, created = self.make_manager().submit(["a", "b"])
+        self.assertFalse(created)
+        self.assertEqual(again.to_dict(include_results=True)["completed"], 2)
+
+    def test_job_with_error_results_is_not_reused(self):
+        manager = self.make_manager()
+        self.gate.set()
+        failed, _ = manager.submit(["bad"])
+        self.assertEqual(self.wait_finished(failed), jobs.JOB_DONE)
+        retried, created = manager.submit(["bad"])
+        self.assertTrue(created)
+        self.assertNotEqual(retried.id, failed.id)
+
+    def test_queued_job_is_kept_alive_by_heartbeat(self):
+        manager = self.make_manager(stale_after=0.3)
+        manager.submit(["running"])
+        queued, _ = manager.submit(["queued"])
+        time.sleep(0.8)
+        self.assertEqual(queued.status, jobs.JOB_QUEUED)
+        self.gate.set()
+        self.assertEqual(self.wait_finished(queued), jobs.JOB_DONE)
+
+    def test_job_of_lost_worker_becomes_failed(self):
+        store = jobs.JobStore(self.path, ttl=600, stale_after=0.1)
+        store.create("lost", jobs.package_set_key(["a"]), ["a"])
+        time.sleep(0.2)
+        row = store.load("lost")
+        self.assertEqual(row["status"], jobs.JOB_FAILED)
+        self.assertIsNone(store.find_reusable(jobs.package_set_key(["a"])))
+
+    def test_failed_queued_job_is_not_run(self):
+        manager = self.make_manager()
+        manager.submit(["running"])
+        queued, _ = manager.submit(["queued"])
+        manager._store.set_status(queued.id, jobs.JOB_FAILED, "cancelled")
+        self.gate.set()
+        manager.close()
+        self.assertEqual(queued.to_dict(include_results=True)["results"], [])
+        self.assertEqual(queued.status, jobs.JOB_FAILED)
+
+    def test_queue_cap_rejects_new_jobs_but_not_shared_ones(self):
+        manager = self.make_manager(max_queued=1, retry_after=3)
+        manager.submit(["a"])
+        deadline = time.monotonic() + 5
+        while manager.stats()["queued"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        manager.submit(["b"])  # 실행 스레드는 "a"가 차지하고 있으므로 대기
+
+        with self.assertRaises(OverloadedError) as ctx:
+            manager.submit(["c"])
+        self.assertEqual((ctx.exception.status, ctx.exception.retry_after), (429, 3))
+        _, created = manager.submit(["b"])
+        self.assertFalse(created)
+        self.assertEqual(manager.stats()["rejected"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""갱신에 실패해 오래된 스크래핑 캐시로 채운 레코드가 새 수집 시각으로 저장되지 않는지 확인한다."""
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.server import load_main  # noqa: E402
+
+main, _DB = load_main()
+
+import scraper  # noqa: E402
+from resilience import CircuitBreaker  # noqa: E402
+from scrape_cache import ScrapeCache  # noqa: E402
+
+_DAY = 24 * 3600
+
+
+def _failing_app(app_id, lang="ko", country="kr"):
+    raise ConnectionError(f"upstream unavailable: {app_id}")
+
+
+class StaleFallbackTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = ScrapeCache(os.path.join(self._tmp.name, "scrape_cache.sqlite3"), max_age=7 * _DAY)
+        self._saved = (scraper.scrape_cache, scraper.app, scraper.circuit_breaker)
+        scraper.scrape_cache = self.cache
+        scraper.app = _failing_app
+        scraper.circuit_breaker = CircuitBreaker(failure_ratio=0.5, min_calls=0, window=30, open_seconds=30)
+
+        # 40일 전에 수집한 상세 정보
+        self.old_fetched_at = time.time() - 40 * _DAY
+        self.cache.put("com.old", scraper.LANG, scraper.COUNTRY, {"appId": "com.old", "title": "Old", "genreId": "TOOLS"})
+        self.cache._conn().execute("UPDATE app_details SET fetched_at = ?", (self.old_fetched_at,))
+        self.cache._conn().commit()
+
+    def tearDown(self):
+        scraper.scrape_cache, scraper.app, scraper.circuit_breaker = self._saved
+        self._tmp.cleanup()
+
+    def test_request_path_keeps_original_fetch_time(self):
+        errors = {}
+        results = scraper.get_appnames_by_packageNames(["com.old"], errors=errors)
+        self.assertEqual([info["id"] for info in results], ["com.old"])
+        self.assertAlmostEqual(results[0]["fetched_at"], self.old_fetched_at, places=3)
+
+    def test_refresh_skips_stale_fallback(self):
+        errors = {}
+        results = scraper.get_appnames_by_packageNames(["com.old"], max_age=0, allow_stale=False, errors=errors)
+        self.assertEqual(results, [])
+        self.assertIsInstance(errors["com.old"], ConnectionError)
+
+        # 실패 기록이 남은 뒤에도 오래된 캐시로 채우지 않는다.
+        errors = {}
+        self.assertEqual(scraper.get_appnames_by_packageNames(["com.old"], max_age=0, allow_stale=False, errors=errors), [])
+        self.assertIsInstance(errors["com.old"], scraper.RecentFailureError)
+
+    def test_scrape_and_store_keeps_stale_fetch_time(self):
+        main.app_record_cache.clear()
+        results = main._scrape_and_store(["com.old"])
+        self.assertEqual(results["com.old"]["category"], "TOOLS")
+        if main.write_buffer is not None:
+            main.write_buffer.flush()
+        stored = _DB.collection("apps").document("com.old").get().to_dict()
+        self.assertAlmostEqual(stored["fetched_at"], self.old_fetched_at, places=3)
+        self.assertTrue(main.is_stale_record(main.app_record_cache.get("com.old")))
+
+    def test_failed_refresh_does_not_restamp_record(self):
+        _DB.seed("apps", {
+            "com.old": {"id": "com.old", "app_name": "Old", "description": "", "category": "TOOLS",
+                        "category_ko": "도구", "fetched_at": self.old_fetched_at},
+        })
+        self.assertEqual(main.refresh_stale_records(["com.old"]), 0)
+        if main.write_buffer is not None:
+            main.write_buffer.flush()
+        stored = _DB.collection("apps").document("com.old").get().to_dict()
+        self.assertAlmostEqual(stored["fetched_at"], self.old_fetched_at, places=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
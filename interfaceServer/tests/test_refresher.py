@@ -0,0 +1,47 @@
+"""RecordRefresher 우선순위 테스트."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from refresher import RecordRefresher  # noqa: E402
+
+
+class RecordRefresherTest(unittest.TestCase):
+    def setUp(self):
+        self.refreshed = []
+        self.refresher = RecordRefresher(self._refresh, rate=0.0, batch_size=2, interval=3600, max_pending=3)
+
+    def tearDown(self):
+        self.refresher._stop.set()
+
+    def _refresh(self, package_names):
+        self.refreshed.append(list(package_names))
+        return len(package_names)
+
+    def test_low_priority_records_wait_for_regular_ones(self):
+        self.refresher.note("legacy.a", low_priority=True)
+        self.refresher.note("legacy.a", low_priority=True)
+        self.refresher.note("stale.b")
+        self.assertEqual(self.refresher._take(1), ["stale.b"])
+        self.assertEqual(self.refresher._take(2), ["legacy.a"])
+        self.assertEqual(self.refresher.stats()["backlog"], 0)
+
+    def test_max_pending_counts_both_queues(self):
+        for name in ("legacy.a", "legacy.b", "legacy.c", "legacy.d"):
+            self.refresher.note(name, low_priority=True)
+        self.refresher.note("stale.e")
+        stats = self.refresher.stats()
+        self.assertEqual((stats["pending"], stats["backlog"], stats["dropped"]), (0, 3, 2))
+
+    def test_attempted_records_are_not_requeued(self):
+        self.refresher.note("legacy.a", low_priority=True)
+        self.refresher.run_once(self.refresher._take(2))
+        self.refresher.note("legacy.a", low_priority=True)
+        self.assertEqual(self.refresher.stats()["backlog"], 0)
+        self.assertEqual(self.refreshed, [["legacy.a"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""CircuitBreaker 상태 전이와 fetch_app_detail의 서킷 허가 -> 속도 제한 순서 테스트."""
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scraper  # noqa: E402
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError  # noqa: E402
+
+_OPEN_SECONDS = 0.05
+
+
+def _breaker(min_calls=4):
+    return CircuitBreaker(failure_ratio=0.5, min_calls=min_calls, window=30, open_seconds=_OPEN_SECONDS)
+
+
+def _open(breaker):
+    for _ in range(breaker.min_calls):
+        breaker.record_failure()
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_opens_when_failure_ratio_reached(self):
+        breaker = _breaker()
+        breaker.record_success()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.stats()["rejected"], 1)
+
+    def test_stays_closed_below_min_calls(self):
+        breaker = _breaker()
+        for _ in range(3):
+            breaker.record_failure()
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_half_open_allows_single_probe(self):
+        breaker = _breaker()
+        _open(breaker)
+        time.sleep(_OPEN_SECONDS * 2)
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+    def test_successful_probe_closes(self):
+        breaker = _breaker()
+        _open(breaker)
+        time.sleep(_OPEN_SECONDS * 2)
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.stats()["window_calls"], 0)
+
+    def test_failed_probe_reopens(self):
+        breaker = _breaker()
+        _open(breaker)
+        time.sleep(_OPEN_SECONDS * 2)
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(breaker.stats()["opened"], 2)
+
+    def test_cancel_frees_probe_slot(self):
+        breaker = _breaker()
+        _open(breaker)
+        time.sleep(_OPEN_SECONDS * 2)
+        self.assertTrue(breaker.allow())
+        breaker.cancel()
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow())
+
+    def test_disabled_breaker_always_allows(self):
+        breaker = _breaker(min_calls=0)
+        _open(breaker)
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CLOSED)
+
+
+class FetchOrderingTest(unittest.TestCase):
+    """서킷 허가를 먼저 받고, 그다음에 속도 제한 토큰을 쓴다."""
+
+    def setUp(self):
+        self.breaker = _breaker()
+        self.limiter = mock.Mock()
+        self.app = mock.Mock(return_value={"appId": "com.a"})
+        patches = [
+            mock.patch.object(scraper, "circuit_breaker", self.breaker),
+            mock.patch.object(scraper, "rate_limiter", self.limiter),
+            mock.patch.object(scraper, "app", self.app),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_open_circuit_does_not_take_a_token(self):
+        _open(self.breaker)
+        with self.assertRaises(CircuitOpenError):
+            scraper.fetch_app_detail("com.a", timeout=1, max_retries=0)
+        self.limiter.acquire.assert_not_called()
+        self.app.assert_not_called()
+
+    def test_token_timeout_cancels_half_open_probe(self):
+        _open(self.breaker)
+        time.sleep(_OPEN_SECONDS * 2)
+        self.limiter.acquire.return_value = False
+        with self.assertRaises(TimeoutError):
+            scraper.fetch_app_detail("com.a", timeout=1, max_retries=0)
+        self.app.assert_not_called()
+        # 호출하지 않았으므로 서킷은 그대로 half-open이고, 다음 호출이 시험 호출을 할 수 있다.
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.limiter.acquire.return_value = True
+        self.assertEqual(scraper.fetch_app_detail("com.a", timeout=1, max_retries=0), {"appId": "com.a"})
+        self.assertEqual(self.breaker.state, CLOSED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""scraper 테스트: get_appnames_by_packageNames 배치 조회(공유 실행기, 순서, 마감 시각)와 크롤링 레코드 변환."""
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google_play_scraper.exceptions import NotFoundError  # noqa: E402
+
+import scraper  # noqa: E402
+from resilience import CircuitBreaker  # noqa: E402
+from scrape_cache import ScrapeCache  # noqa: E402
+
+
+class BatchLookupTest(unittest.TestCase):
+    def setUp(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        self.delay = 0.02
+        patches = [
+            mock.patch.object(scraper, "scrape_cache", None),
+            mock.patch.object(scraper, "app", self.fake_app),
+            mock.patch.object(scraper, "circuit_breaker", CircuitBreaker(0.5, 0, 30, 30)),
+            mock.patch.object(scraper, "rate_limiter", mock.Mock(**{"acquire.return_value": True})),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def fake_app(self, app_id, lang="ko", country="kr"):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if app_id.startswith("missing"):
+                raise NotFoundError(app_id)
+            return {"appId": app_id, "title": app_id.upper(), "genreId": "TOOLS"}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def test_results_keep_input_order_and_errors_are_collected(self):
+        errors = {}
+        packages = [f"com.app{i}" for i in range(6)] + ["missing.one"]
+        results = scraper.get_appnames_by_packageNames(packages, concurrency=3, errors=errors)
+        self.assertEqual([info["id"] for info in results], packages[:-1])
+        self.assertIsInstance(errors["missing.one"], NotFoundError)
+        self.assertLessEqual(self.peak, 3)
+
+    def test_request_deadline_leaves_unfinished_packages_as_deadline_exceeded(self):
+        self.delay = 0.3
+        errors = {}
+        started = time.monotonic()
+        results = scraper.get_appnames_by_packageNames(
+            ["com.slow1", "com.slow2"], concurrency=1, errors=errors, deadline=time.monotonic() + 0.1
+        )
+        self.assertLess(time.monotonic() - started, 0.3)
+        self.assertEqual(results, [])
+        self.assertTrue(all(isinstance(exc, scraper.DeadlineExceeded) for exc in errors.values()))
+        self.assertEqual(sorted(errors), ["com.slow1", "com.slow2"])
+
+
+class ScrapeCacheTest(unittest.TestCase):
+    def test_cache_file_is_created_on_first_use(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data", "scrape_cache.sqlite3")
+            cache = ScrapeCache(path, max_age=60)
+            self.assertFalse(os.path.exists(os.path.dirname(path)))
+            self.assertEqual(cache.get("com.a", "ko", "kr"), (None, False))
+            fetched_at = cache.put("com.a", "ko", "kr", {"appId": "com.a"})
+            self.assertEqual(cache.get_entry("com.a", "ko", "kr"), ({"appId": "com.a"}, fetched_at, True))
+
+
+class CrawlRecordTest(unittest.TestCase):
+    def test_genre_id_wins_over_crawl_bucket(self):
+        record = scraper.to_crawl_record({"appId": "com.a", "genreId": "TOOLS"}, "com.a", "MUSIC_AUDIO")
+        self.assertEqual((record["category"], record["category_ko"]), ("TOOLS", "도구"))
+        self.assertEqual(record["crawl_category"], "MUSIC_AUDIO")
+
+    def test_missing_genre_id_maps_legacy_bucket_to_play_genre(self):
+        record = scraper.to_crawl_record({"appId": "com.a"}, "com.a", "MUSIC_AUDIO")
+        self.assertEqual(record["category"], "MUSIC_AND_AUDIO")
+        self.assertTrue(record["category_ko"])
+
+    def test_missing_genre_id_with_unknown_bucket_leaves_category_empty(self):
+        record = scraper.to_crawl_record({"appId": "com.a"}, "com.a", "NOT_A_GENRE")
+        self.assertEqual(record["category"], "")
+        self.assertIsNone(record["category_ko"])
+
+
+if __name__ == "__main__":
+    unittest.main()
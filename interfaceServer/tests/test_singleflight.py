@@ -0,0 +1,109 @@
+"""SingleFlight.do_many 테스트."""
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from singleflight import SingleFlight  # noqa: E402
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_concurrent_callers_share_one_fetch(self):
+        flight = SingleFlight(wait_timeout=5)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def fetch(keys):
+            calls.append(sorted(keys))
+            started.set()
+            release.wait(5)
+            return {key: key.upper() for key in keys if key != "missing"}
+
+        results = {}
+        leader = threading.Thread(target=lambda: results.setdefault("leader", flight.do_many(["a", "b", "missing"], fetch)))
+        leader.start()
+        self.assertTrue(started.wait(5))
+        follower = threading.Thread(target=lambda: results.setdefault("follower", flight.do_many(["b", "c"], fetch)))
+        follower.start()
+        time.sleep(0.05)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertEqual(calls, [["a", "b", "missing"], ["c"]])
+        self.assertEqual(results["leader"], ({"a": "A", "b": "B"}, {}))
+        self.assertEqual(results["follower"], ({"b": "B", "c": "C"}, {}))
+        self.assertEqual(flight.stats()["shared_keys"], 1)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_errors_are_reported_per_key(self):
+        flight = SingleFlight(wait_timeout=5)
+
+        def fetch(keys):
+            raise RuntimeError("boom")
+
+        values, errors = flight.do_many(["a", "a"], fetch)
+        self.assertEqual(values, {})
+        self.assertEqual(list(errors), ["a"])
+        self.assertIsInstance(errors["a"], RuntimeError)
+
+    def test_waiter_times_out_at_deadline(self):
+        flight = SingleFlight(wait_timeout=5)
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow(keys):
+            started.set()
+            release.wait(5)
+            return {key: 1 for key in keys}
+
+        leader = threading.Thread(target=flight.do_many, args=(["a"], slow))
+        leader.start()
+        self.assertTrue(started.wait(5))
+        values, errors = flight.do_many(["a"], slow, deadline=time.monotonic() + 0.05)
+        release.set()
+        leader.join(5)
+        self.assertEqual(values, {})
+        self.assertIsInstance(errors["a"], TimeoutError)
+
+    def test_file_lock_waiter_rechecks_shared_store(self):
+        lock_dir = tempfile.mkdtemp()
+        # 서로 다른 워커 프로세스를 흉내 낸다 (같은 lock_dir, 다른 인스턴스).
+        worker_a = SingleFlight(wait_timeout=5, lock_dir=lock_dir)
+        worker_b = SingleFlight(wait_timeout=5, lock_dir=lock_dir)
+        store = {}
+        started = threading.Event()
+        release = threading.Event()
+        fetched_by_b = []
+
+        def fetch_a(keys):
+            started.set()
+            release.wait(5)
+            store.update({key: "from-a" for key in keys})
+            return {key: "from-a" for key in keys}
+
+        def fetch_b(keys):
+            fetched_by_b.extend(keys)
+            return {key: "from-b" for key in keys}
+
+        def recheck(keys):
+            return {key: store[key] for key in keys if key in store}
+
+        thread = threading.Thread(target=worker_a.do_many, args=(["a"], fetch_a))
+        thread.start()
+        self.assertTrue(started.wait(5))
+        threading.Timer(0.1, release.set).start()
+        values, errors = worker_b.do_many(["a"], fetch_b, recheck=recheck)
+        thread.join(5)
+
+        self.assertEqual((values, errors), ({"a": "from-a"}, {}))
+        self.assertEqual(fetched_by_b, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""WriteBehindBuffer 재시도 테스트 (인메모리 Firestore 대역 사용)."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.fakes import FakeFirestoreClient  # noqa: E402
+from write_behind import WriteBehindBuffer  # noqa: E402
+
+
+class _FlakyProvider:
+    """처음 failures번은 클라이언트 초기화에 실패하는 db_provider."""
+
+    def __init__(self, db, failures):
+        self.db = db
+        self.failures = failures
+
+    def __call__(self):
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("firebase init failed")
+        return self.db
+
+
+class WriteBehindBufferTest(unittest.TestCase):
+    def setUp(self):
+        self.db = FakeFirestoreClient(latency_ms=0, jitter_ms=0)
+        self.buffers = []
+
+    def tearDown(self):
+        for buffer in self.buffers:
+            buffer.close()
+
+    def make_buffer(self, provider, **kwargs):
+        # 백그라운드 커밋이 테스트의 flush()와 겹치지 않도록 flush 간격을 길게 둔다.
+        buffer = WriteBehindBuffer(provider, "apps", flush_interval=3600, **kwargs)
+        self.buffers.append(buffer)
+        return buffer
+
+    def stored(self, doc_id):
+        return self.db.data.get("apps", {}).get(doc_id)
+
+    def test_provider_failure_requeues_batch(self):
+        provider = _FlakyProvider(self.db, failures=1)
+        buffer = self.make_buffer(provider)
+        buffer.enqueue("com.a", {"category": "TOOLS"})
+        buffer.flush()
+        self.assertIsNone(self.stored("com.a"))
+        self.assertEqual(buffer.stats()["pending"], 1)
+
+        buffer.flush()
+        self.assertEqual(self.stored("com.a"), {"category": "TOOLS"})
+        self.assertEqual(buffer.stats()["committed"], 1)
+
+    def test_newer_write_wins_over_requeued_one(self):
+        provider = _FlakyProvider(self.db, failures=1)
+        buffer = self.make_buffer(provider)
+        buffer.enqueue("com.a", {"category": "TOOLS", "app_name": "A"})
+        buffer.flush()
+        buffer.enqueue("com.a", {"category": "GAME_ACTION"})
+        buffer.flush()
+        self.assertEqual(self.stored("com.a"), {"category": "GAME_ACTION", "app_name": "A"})
+
+    def test_write_dropped_after_max_attempts(self):
+        provider = _FlakyProvider(self.db, failures=10)
+        buffer = self.make_buffer(provider, max_attempts=2)
+        buffer.enqueue("com.a", {"category": "TOOLS"})
+        buffer.flush()
+        buffer.flush()
+        stats = buffer.stats()
+        self.assertEqual((stats["pending"], stats["failed"]), (0, 1))
+        provider.failures = 0
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Firestore 배치 하나에 담을 수 있는 최대 쓰기 수
+FIRESTORE_BATCH_LIMIT = 500
+
+WRITE_BEHIND_COMMIT_SECONDS = metrics.histogram(
+    "write_behind_commit_seconds",
+    "Latency of write-behind Firestore batch commits.",
+    ["outcome"],
+)
+WRITE_BEHIND_BATCH_SIZE = metrics.histogram(
+    "write_behind_batch_size",
+    "Number of writes per write-behind Firestore batch commit.",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500),
+)
+
+
+class WriteBehindBuffer:
+    """Firestore upsert(set merge=True)를 모아 배치 커밋으로 보내는 write-behind 버퍼.
+
+    - enqueue()는 즉시 반환하고, 백그라운드 스레드가 max_batch개가 모이거나
+      flush_interval초가 지나면 batch.commit()으로 한꺼번에 쓴다.
+    - 같은 문서에 대한 쓰기가 커밋 전에 여러 번 들어오면 필드를 병합해 한 번만 쓴다.
+    - close()는 남은 쓰기를 모두 커밋한다 (워커 종료 시 호출).
+    """
+
+    def __init__(
+        self,
+        db_provider: Callable[[], Any],
+        collection: str,
+        max_batch: int = FIRESTORE_BATCH_LIMIT,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000,
+        max_attempts: int = 3,
+    ) -> None:
+        self._db_provider = db_provider
+        self._collection = collection
+        self.max_batch = max(1, min(int(max_batch), FIRESTORE_BATCH_LIMIT))
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._attempts: Dict[str, int] = {}
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self.enqueued = 0
+        self.committed = 0
+        self.commits = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, doc_id: str, payload: Dict[str, Any]) -> None:
+        if self._closed:
+            # 종료 이후 들어온 쓰기는 즉시 동기 처리한다.
+            self._db_provider().collection(self._collection).document(doc_id).set(payload, merge=True)
+            return
+
+        with self._cond:
+            current = self._pending.get(doc_id)
+            self._pending[doc_id] = {**current, **payload} if current else dict(payload)
+            self.enqueued += 1
+            pending = len(self._pending)
+            # 첫 쓰기가 들어오면 flush 타이머를 시작하고, 배치가 차면 바로 커밋하도록 깨운다.
+            if pending == 1 or pending >= self.max_batch:
+                self._cond.notify()
+
+        # 커밋이 밀려 버퍼가 너무 커지면 호출한 쪽에서 직접 비운다 (backpressure).
+        if pending >= self.max_pending:
+            self.flush()
+
+    def flush(self) -> None:
+        """지금까지 쌓인 쓰기를 모두 커밋한다."""
+        with self._flush_lock:
+            with self._cond:
+                items = list(self._pending.items())
+                self._pending.clear()
+            for start in range(0, len(items), self.max_batch):
+                self._commit(items[start:start + self.max_batch])
+
+    def _commit(self, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        if not items:
+            return
+        started_at = time.perf_counter()
+        try:
+            # 클라이언트 지연 초기화가 실패해도 버퍼에서 이미 꺼낸 쓰기를 잃지 않도록 재시도 경로로 보낸다.
+            db = self._db_provider()
+            collection = db.collection(self._collection)
+            batch = db.batch()
+            for doc_id, payload in items:
+                batch.set(collection.document(doc_id), payload, merge=True)
+            batch.commit()
+        except Exception:  # pylint: disable=broad-except
+            WRITE_BEHIND_COMMIT_SECONDS.observe(time.perf_counter() - started_at, outcome="error")
+            logger.exception("Write-behind batch commit failed (%d writes)", len(items))
+            self._requeue(items)
+            return
+        WRITE_BEHIND_COMMIT_SECONDS.observe(time.perf_counter() - started_at, outcome="ok")
+        WRITE_BEHIND_BATCH_SIZE.observe(len(items))
+
+        with self._cond:
+            self.committed += len(items)
+            self.commits += 1
+            for doc_id, _ in items:
+                self._attempts.pop(doc_id, None)
+        logger.info("Write-behind committed %d app records to Firestore.", len(items))
+
+    def _requeue(self, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        with self._cond:
+            for doc_id, payload in items:
+                attempts = self._attempts.get(doc_id, 0) + 1
+                if attempts >= self.max_attempts:
+                    self._attempts.pop(doc_id, None)
+                    self.failed += 1
+                    logger.error("Dropping write for %s after %d failed commits.", doc_id, attempts)
+                    continue
+                self._attempts[doc_id] = attempts
+                # 실패한 뒤 들어온 더 새로운 값이 있으면 그 값을 우선한다.
+                newer = self._pending.get(doc_id)
+                self._pending[doc_id] = {**payload, **newer} if newer else payload
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                # 첫 쓰기가 들어온 뒤 flush_interval 동안(또는 배치가 찰 때까지) 더 모은다.
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._pending) < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            try:
+                self.flush()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Write-behind flush failed")
+                time.sleep(self.flush_interval)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """백그라운드 스레드를 멈추고 남은 쓰기를 모두 커밋한다."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        for _ in range(self.max_attempts):
+            self.flush()
+            with self._cond:
+                if not self._pending:
+                    break
+        logger.info("Write-behind buffer drained (%d committed, %d failed).", self.committed, self.failed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "enqueued": self.enqueued,
+                "committed": self.committed,
+                "commits": self.commits,
+                "failed": self.failed,
+            }